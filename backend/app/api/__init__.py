@@ -1,4 +1,4 @@
 # Package marker for API
-from . import users, properties, marketplace, webhooks
+from . import users, properties, marketplace, webhooks, debug
 
-__all__ = ["users", "properties", "marketplace", "webhooks"]
+__all__ = ["users", "properties", "marketplace", "webhooks", "debug"]
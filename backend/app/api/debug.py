@@ -0,0 +1,47 @@
+"""
+Domira Backend - Debug API
+Download request profiles captured with the X-Profile header (debug mode only)
+"""
+from fastapi import APIRouter, HTTPException, Query, Response, status
+from fastapi.responses import PlainTextResponse
+from app.services.profiling import SORT_KEYS, get_profile, list_profiles, render_profile
+
+router = APIRouter()
+
+
+@router.get("/profiles")
+async def get_profiles() -> list[dict]:
+    """List stored request profiles, newest first"""
+    return list_profiles()
+
+
+@router.get("/profiles/{profile_id}")
+async def download_profile(
+    profile_id: str,
+    format: str = Query("text", pattern="^(text|pstats)$"),
+    sort: str = Query("cumulative", description=f"Sort key for the text report: {', '.join(SORT_KEYS)}"),
+    limit: int = Query(40, ge=1, le=500, description="Functions to list in the text report")
+) -> Response:
+    """
+    Get a captured profile as a pstats text report, or as a .prof file
+    (format=pstats) for snakeviz or `python -m pstats`
+    """
+    profile = get_profile(profile_id)
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found or expired"
+        )
+    if sort not in SORT_KEYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown sort key '{sort}', expected one of: {', '.join(SORT_KEYS)}"
+        )
+    
+    if format == "pstats":
+        return Response(
+            profile["stats"],
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": f'attachment; filename="{profile_id}.prof"'}
+        )
+    return PlainTextResponse(render_profile(profile, sort, limit))
@@ -2,11 +2,19 @@
 Domira Backend - Marketplace API
 Secondary marketplace for trading property fractions
 """
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from app.models.schemas import Listing, ListingCreate, BuyOrder, ListingStatus
-from app.api.properties import properties_db
+from app.api.properties import properties_db, transfer_holdings
+from app.api.users import users_db
+from app.services.portfolio import portfolio_ledger
+from app.services.trade_tape import trade_tape
+from app.services.versions import make_etag, not_modified, versions
+from app.services.coherence import coherence
+from app.services.rate_limit import RateLimit, rpc_slots
+from app.services.expiry import ExpiryQueue, to_timestamp
 from typing import Optional
-from datetime import datetime
+from datetime import datetime, timezone
+import time
 import uuid
 
 router = APIRouter()
@@ -14,13 +22,28 @@ router = APIRouter()
 # In-memory store for MVP (replace with database)
 listings_db: dict[str, dict] = {}
 
+# Active listings with an expires_at, by deadline (swept by the app lifespan task)
+listing_expiry = ExpiryQueue()
+
+# Admission control on write routes (429 + Retry-After when exceeded)
+listing_limit = RateLimit("marketplace.listings")
+buy_limit = RateLimit("marketplace.buy", slots=rpc_slots)
+
 
 @router.get("/listings", response_model=list[Listing])
 async def list_active_listings(
+    request: Request,
+    response: Response,
     property_id: Optional[str] = None,
     max_price: Optional[float] = None
-) -> list[Listing]:
+):
     """List all active secondary market listings"""
+    etag = make_etag("listings", versions.collection("listings"), request.url.query.encode())
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    response.headers["ETag"] = etag
+    
     listings = [l for l in listings_db.values() if l["status"] == ListingStatus.ACTIVE]
     
     if property_id:
@@ -31,7 +54,7 @@ async def list_active_listings(
     return [Listing(**l) for l in listings]
 
 
-@router.post("/listings", response_model=Listing, status_code=status.HTTP_201_CREATED)
+@router.post("/listings", response_model=Listing, status_code=status.HTTP_201_CREATED, dependencies=[Depends(listing_limit)])
 async def create_listing(listing_data: ListingCreate) -> Listing:
     """Create a new secondary market listing"""
     # Verify property exists
@@ -45,6 +68,16 @@ async def create_listing(listing_data: ListingCreate) -> Listing:
     listing_id = str(uuid.uuid4())
     now = datetime.utcnow()
     
+    expires_at = listing_data.expires_at
+    if expires_at is not None:
+        if expires_at.tzinfo is not None:
+            expires_at = expires_at.astimezone(timezone.utc).replace(tzinfo=None)
+        if expires_at <= now:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="expires_at must be in the future"
+            )
+    
     listing_dict = {
         "id": listing_id,
         "seller_id": "mock-seller-id",  # Would come from auth
@@ -54,10 +87,11 @@ async def create_listing(listing_data: ListingCreate) -> Listing:
         "price_per_fraction": listing_data.price_per_fraction,
         "total_price": listing_data.fractions * listing_data.price_per_fraction,
         "status": ListingStatus.ACTIVE,
-        "created_at": now
+        "created_at": now,
+        "expires_at": expires_at
     }
     
-    listings_db[listing_id] = listing_dict
+    coherence.write("listings.upsert", listing_dict)
     return Listing(**listing_dict)
 
 
@@ -72,7 +106,7 @@ async def get_listing(listing_id: str) -> Listing:
     return Listing(**listings_db[listing_id])
 
 
-@router.post("/buy", status_code=status.HTTP_200_OK)
+@router.post("/buy", status_code=status.HTTP_200_OK, dependencies=[Depends(buy_limit)])
 async def execute_buy_order(order: BuyOrder) -> dict:
     """
     Execute a buy order on a secondary market listing
@@ -92,12 +126,43 @@ async def execute_buy_order(order: BuyOrder) -> dict:
             detail="Listing is no longer active"
         )
     
+    # Past its deadline but not swept yet
+    if listing.get("expires_at") and to_timestamp(listing["expires_at"]) <= time.time():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Listing has expired"
+        )
+    
     if order.fractions > listing["fractions"]:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Only {listing['fractions']} fractions available"
         )
     
+    # Reject orders that would breach the 20% cap before anything goes on-chain.
+    # The contract caps per wallet, so the buyer must have one registered.
+    buyer_id = order.buyer_id
+    buyer = users_db.get(buyer_id)
+    if buyer is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Buyer not found"
+        )
+    wallet = buyer.get("wallet_address")
+    if not wallet:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Buyer must register a wallet before buying"
+        )
+    prop = properties_db.get(listing["property_id"])
+    if prop is not None:
+        violation = portfolio_ledger.check_max_holding(prop, wallet, order.fractions)
+        if violation:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=violation
+            )
+    
     # Calculate purchase
     total_cost = order.fractions * listing["price_per_fraction"]
     
@@ -106,9 +171,26 @@ async def execute_buy_order(order: BuyOrder) -> dict:
     if listing["fractions"] == 0:
         listing["status"] = ListingStatus.SOLD
     listing["total_price"] = listing["fractions"] * listing["price_per_fraction"]
+    coherence.write("listings.upsert", listing)
+    
+    # Update buyer/seller portfolios (and with them the balances the cap check reads)
+    now = time.time()
+    if prop is not None:
+        transfer_holdings(prop, listing["seller_id"], buyer_id, order.fractions, now)
+    trade = trade_tape.record(
+        listing["property_id"],
+        listing["price_per_fraction"],
+        order.fractions,
+        listing_id=order.listing_id,
+        buyer_id=buyer_id,
+        seller_id=listing["seller_id"],
+        timestamp=now
+    )
+    coherence.publish("marketplace.fill", trade)
     
     return {
         "message": "Purchase successful",
+        "buyer_id": buyer_id,
         "fractions_bought": order.fractions,
         "total_cost": total_cost,
         "listing_id": order.listing_id,
@@ -117,7 +199,21 @@ async def execute_buy_order(order: BuyOrder) -> dict:
     }
 
 
-@router.delete("/listings/{listing_id}")
+@router.get("/{property_id}/stats")
+async def get_trade_stats(property_id: str) -> dict:
+    """
+    Get secondary market price statistics for a property
+    Last price, VWAP and rolling 1h/24h/7d OHLC, served from running aggregates
+    """
+    if property_id not in properties_db:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Property not found"
+        )
+    return trade_tape.stats(property_id)
+
+
+@router.delete("/listings/{listing_id}", dependencies=[Depends(listing_limit)])
 async def cancel_listing(listing_id: str) -> dict:
     """Cancel a listing"""
     if listing_id not in listings_db:
@@ -127,4 +223,50 @@ async def cancel_listing(listing_id: str) -> dict:
         )
     
     listings_db[listing_id]["status"] = ListingStatus.CANCELLED
+    coherence.write("listings.upsert", listings_db[listing_id])
     return {"message": "Listing cancelled", "listing_id": listing_id}
+
+
+# ============ Replicated writes (applied locally and by other workers) ============
+
+def apply_listing_upsert(listing: dict):
+    """Store a full listing record, keeping its expiry scheduled while it is active"""
+    listings_db[listing["id"]] = listing
+    if listing["status"] == ListingStatus.ACTIVE and listing.get("expires_at"):
+        listing_expiry.schedule(listing["id"], to_timestamp(listing["expires_at"]))
+    else:
+        listing_expiry.cancel(listing["id"])
+    versions.bump("listings", listing["id"])
+
+
+def expire_due_listings(now: Optional[float] = None) -> int:
+    """Mark active listings past their expires_at as EXPIRED; O(expired) per call"""
+    expired = 0
+    for listing_id in listing_expiry.pop_due(time.time() if now is None else now):
+        listing = listings_db.get(listing_id)
+        if listing is None or listing["status"] != ListingStatus.ACTIVE:
+            continue
+        listing["status"] = ListingStatus.EXPIRED
+        coherence.write("listings.upsert", listing)
+        expired += 1
+    return expired
+
+
+def apply_fill(trade: dict):
+    """Replay another worker's fill into the portfolio ledger and trade tape"""
+    prop = properties_db.get(trade["property_id"])
+    if prop is not None and trade["buyer_id"] is not None:
+        transfer_holdings(prop, trade["seller_id"], trade["buyer_id"], trade["fractions"], trade["timestamp"])
+    trade_tape.record(
+        trade["property_id"],
+        trade["price_per_fraction"],
+        trade["fractions"],
+        listing_id=trade["listing_id"],
+        buyer_id=trade["buyer_id"],
+        seller_id=trade["seller_id"],
+        timestamp=trade["timestamp"]
+    )
+
+
+coherence.register("listings.upsert", apply_listing_upsert, idempotent=True)
+coherence.register("marketplace.fill", apply_fill)
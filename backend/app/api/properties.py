@@ -1,27 +1,90 @@
 """
 Domira Backend - Properties API
 """
-from fastapi import APIRouter, HTTPException, status
-from app.models.schemas import Property, PropertyCreate, PropertyPassport
-from app.services.property_passport import generate_property_passport
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from app.models.schemas import (
+    KYCStatus, OfferingCreate, OfferingSubscription, Property, PropertyCreate, PropertyPassport, RentalDistribution
+)
+from app.api.users import users_db
+from app.services.registry_providers import fetch_property_passport, registry_passport_cache
+from app.services.property_passport import revalue_passports
+from app.services.location_index import PropertyLocationIndex
+from app.services.portfolio import portfolio_ledger
+from app.services.versions import make_etag, not_modified, versions
+from app.services.coherence import coherence
+from app.services.rate_limit import RateLimit, rpc_slots
+from app.web3.contract import MintBatchError, get_max_holding, mint_batch
+from app.services.offering import CLOSED, OPEN, PrimaryOffering, offerings
+from app.services.expiry import to_timestamp
+from app.services.property_import import import_properties, iter_text_lines
+from app.services.distribution import (
+    distribution_cache, get_wallet_distribution, record_holder_transfer, register_properties, set_monthly_rent
+)
 from typing import Optional
 from datetime import datetime
 import uuid
 
+from pydantic_core import to_json
+
 router = APIRouter()
 
 # In-memory store for MVP (replace with database)
 properties_db: dict[str, dict] = {}
 
+# Postal-code prefix / neighborhood index over properties_db, maintained on insert
+location_index = PropertyLocationIndex()
+
+# Holder identity per user in distribution snapshots: the wallet registered at
+# the user's first transfer (else the user id), so a later wallet change cannot
+# split one holding across two histories
+holder_ids: dict[str, str] = {}
+
+# Fields a sparse listing may select; the nested passport is only added via expand
+LISTING_FIELDS = tuple(field for field in Property.model_fields if field != "passport")
+EXPANDABLE = ("passport",)
+
+# Admission control on write routes (429 + Retry-After when exceeded)
+create_limit = RateLimit("properties.create")
+bulk_limit = RateLimit("properties.bulk", client_rate=0.1, client_burst=2)
+token_limit = RateLimit("properties.token", slots=rpc_slots)
+subscription_limit = RateLimit("properties.offering.subscribe")
+offering_limit = RateLimit("properties.offering", slots=rpc_slots)
+rent_limit = RateLimit("properties.rent")
+revaluation_limit = RateLimit("properties.woz_revaluation", client_rate=0.1, client_burst=2)
+
 
 @router.get("/", response_model=list[Property])
 async def list_properties(
+    request: Request,
+    response: Response,
     city: Optional[str] = None,
     min_price: Optional[float] = None,
-    max_price: Optional[float] = None
-) -> list[Property]:
-    """List all available properties with optional filters"""
-    properties = list(properties_db.values())
+    max_price: Optional[float] = None,
+    postal_prefix: Optional[str] = Query(None, description="Postal code or prefix, e.g. 1315 or 1315 NT"),
+    neighborhood: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,name,asking_price"),
+    expand: Optional[str] = Query(None, description="Nested objects to include: passport")
+):
+    """
+    List all available properties with optional filters
+    With fields/expand the stored rows are projected and serialized directly,
+    skipping model validation and the passport unless it is expanded
+    """
+    # The ETag only depends on the collection version and the query
+    etag = make_etag("properties", versions.collection("properties"), request.url.query.encode())
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    response.headers["ETag"] = etag
+    
+    if postal_prefix is not None or neighborhood is not None:
+        try:
+            property_ids = location_index.match(postal_prefix, neighborhood)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        properties = [properties_db[pid] for pid in property_ids]
+    else:
+        properties = list(properties_db.values())
     
     if city:
         properties = [p for p in properties if p["city"].lower() == city.lower()]
@@ -30,55 +93,87 @@ async def list_properties(
     if max_price:
         properties = [p for p in properties if p["asking_price"] <= max_price]
     
-    return [Property(**p) for p in properties]
+    if fields is None and expand is None:
+        return [Property(**p) for p in properties]
+    
+    selected = parse_field_list(fields, LISTING_FIELDS, "field") if fields else list(LISTING_FIELDS)
+    if expand:
+        selected += [name for name in parse_field_list(expand, EXPANDABLE, "expansion") if name not in selected]
+    
+    rows = [{name: p.get(name) for name in selected} for p in properties]
+    return Response(content=to_json(rows), media_type="application/json", headers={"ETag": etag})
+
+
+def parse_field_list(value: str, allowed: tuple[str, ...], kind: str) -> list[str]:
+    """Parse a comma-separated field list, rejecting unknown names"""
+    names = list(dict.fromkeys(name.strip() for name in value.split(",") if name.strip()))
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown {kind}(s): {', '.join(unknown)}. Allowed: {', '.join(allowed)}"
+        )
+    return names
 
 
-@router.post("/", response_model=Property, status_code=status.HTTP_201_CREATED)
+@router.post("/", response_model=Property, status_code=status.HTTP_201_CREATED, dependencies=[Depends(create_limit)])
 async def create_property(property_data: PropertyCreate) -> Property:
     """Create a new property listing"""
-    property_id = str(uuid.uuid4())
-    now = datetime.utcnow()
-    
-    # Generate property passport
-    passport = generate_property_passport(
+    # Fetch property passport from Kadaster/BAG/PDOK concurrently
+    passport = await fetch_property_passport(
         address=property_data.address,
         city=property_data.city
     )
     
-    property_dict = {
-        "id": property_id,
-        "name": property_data.name,
-        "description": property_data.description,
-        "address": property_data.address,
-        "city": property_data.city,
-        "asking_price": property_data.asking_price,
-        "total_fractions": property_data.total_fractions,
-        "available_fractions": property_data.total_fractions,
-        "price_per_fraction": property_data.price_per_fraction,
-        "expected_yield": property_data.expected_yield,
-        "token_id": None,  # Set after on-chain creation
-        "manager_address": "0x0000000000000000000000000000000000000000",
-        "passport": passport.model_dump(),
-        "created_at": now
-    }
-    
-    properties_db[property_id] = property_dict
+    property_dict = build_property_record(property_data, passport, datetime.utcnow())
+    insert_properties([property_dict])
     return Property(**property_dict)
 
 
+@router.post("/bulk", dependencies=[Depends(bulk_limit)])
+async def bulk_import_properties(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(csv|jsonl)$")
+) -> dict:
+    """
+    Bulk import properties from a streamed CSV or JSONL body of PropertyCreate rows
+    Rows are validated and enriched in chunks; invalid rows are reported, not fatal
+    """
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "csv" if "csv" in content_type else "jsonl"
+    
+    return await import_properties(iter_text_lines(request.stream()), format, insert=insert_imported_properties)
+
+
+@router.post("/woz-revaluation", dependencies=[Depends(revaluation_limit)])
+async def revalue_woz(
+    woz_year: int = Query(..., ge=2000, le=2100),
+    current_year: Optional[int] = Query(None, description="Year building age is measured against (default: woz_year + 1)")
+) -> dict:
+    """Revalue every stored passport for a newly published WOZ year"""
+    return coherence.write("properties.revalue", {"woz_year": woz_year, "current_year": current_year})
+
+
 @router.get("/{property_id}", response_model=Property)
-async def get_property(property_id: str) -> Property:
+async def get_property(property_id: str, request: Request, response: Response):
     """Get property details by ID"""
     if property_id not in properties_db:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Property not found"
         )
+    
+    etag = make_etag("property", property_id, versions.entity("properties", property_id))
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    response.headers["ETag"] = etag
     return Property(**properties_db[property_id])
 
 
 @router.get("/{property_id}/passport", response_model=PropertyPassport)
-async def get_property_passport(property_id: str) -> PropertyPassport:
+async def get_property_passport(property_id: str, request: Request, response: Response):
     """Get property passport (Kadaster/BAG/PDOK data)"""
     if property_id not in properties_db:
         raise HTTPException(
@@ -86,6 +181,12 @@ async def get_property_passport(property_id: str) -> PropertyPassport:
             detail="Property not found"
         )
     
+    etag = make_etag("passport", property_id, versions.entity("properties", property_id))
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    response.headers["ETag"] = etag
+    
     prop = properties_db[property_id]
     if not prop.get("passport"):
         raise HTTPException(
@@ -96,7 +197,7 @@ async def get_property_passport(property_id: str) -> PropertyPassport:
     return PropertyPassport(**prop["passport"])
 
 
-@router.patch("/{property_id}/token")
+@router.patch("/{property_id}/token", dependencies=[Depends(token_limit)])
 async def set_token_id(property_id: str, token_id: int) -> dict:
     """Set on-chain token ID after minting"""
     if property_id not in properties_db:
@@ -106,12 +207,406 @@ async def set_token_id(property_id: str, token_id: int) -> dict:
         )
     
     properties_db[property_id]["token_id"] = token_id
+    coherence.write("properties.upsert", [properties_db[property_id]])
+    
+    # Cache the on-chain cap used by the pre-trade holding check
+    max_holding = await get_max_holding(token_id)
+    if max_holding:
+        coherence.write("properties.max_holding", {"property_id": property_id, "max_holding": max_holding})
+    
     return {"message": "Token ID set", "token_id": token_id}
 
 
+@router.post("/{property_id}/offering", status_code=status.HTTP_201_CREATED, dependencies=[Depends(offering_limit)])
+async def open_offering(property_id: str, offering: OfferingCreate) -> dict:
+    """Open a primary offering window; subscriptions are allocated when it closes"""
+    prop = properties_db.get(property_id)
+    if prop is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Property not found"
+        )
+    if property_id in offerings and offerings[property_id].status == OPEN:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="An offering is already open for this property"
+        )
+    if property_id in offerings and offerings[property_id].mint_pending:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="The previous offering still has unminted allocations, retry with POST /properties/{id}/offering/mint"
+        )
+    _require_token_id(prop)
+    
+    fractions = prop["available_fractions"] if offering.fractions is None else offering.fractions
+    if not 0 < fractions <= prop["available_fractions"]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Offering must be between 1 and {prop['available_fractions']} fractions"
+        )
+    
+    payload = {
+        "property_id": property_id,
+        "fractions": fractions,
+        "price_per_fraction": offering.price_per_fraction or prop["price_per_fraction"],
+        "opened_at": datetime.utcnow()
+    }
+    coherence.write("offering.open", payload)
+    return offerings[property_id].summary()
+
+
+@router.get("/{property_id}/offering")
+async def get_offering(property_id: str) -> dict:
+    """Offering status, subscription totals and (once closed) the allocation report"""
+    return _get_offering(property_id).summary()
+
+
+@router.post("/{property_id}/offering/subscriptions", dependencies=[Depends(subscription_limit)])
+async def subscribe_to_offering(property_id: str, subscription: OfferingSubscription) -> dict:
+    """
+    Subscribe to (or change, or with 0 withdraw) a request in an open offering
+    Requests above the wallet's holding cap are clipped at allocation
+    """
+    offering = _get_offering(property_id)
+    if offering.status != OPEN:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Offering is closed"
+        )
+    user = users_db.get(subscription.user_id)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    if user["kyc_status"] != KYCStatus.VERIFIED or not user.get("wallet_address"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User must complete KYC and register a wallet before subscribing"
+        )
+    
+    payload = {
+        "property_id": property_id,
+        "user_id": subscription.user_id,
+        "wallet": user["wallet_address"],
+        "fractions": subscription.fractions
+    }
+    coherence.write("offering.subscribe", payload)
+    return {"property_id": property_id, "user_id": subscription.user_id, "fractions": subscription.fractions}
+
+
+@router.post("/{property_id}/offering/close", dependencies=[Depends(offering_limit)])
+async def close_offering(property_id: str) -> dict:
+    """
+    Close the offering and allocate it: pro-rata with largest-remainder rounding,
+    each wallet capped at getMaxHolding (users sharing a wallet share its cap),
+    then mint every allocation in one batch. The allocation stands if minting
+    fails; the unsent mints stay pending for POST /{property_id}/offering/mint
+    """
+    offering = _get_offering(property_id)
+    if offering.status != OPEN:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Offering is already closed"
+        )
+    prop = properties_db[property_id]
+    _require_token_id(prop)
+    
+    # getMaxHolding is per wallet: what every user on a subscribing wallet holds
+    held = {
+        wallet: portfolio_ledger.wallet_balance(wallet, property_id)
+        for wallet in {wallet.lower() for wallet in offering.wallets.values()}
+    }
+    user_ids, amounts = offering.allocate(portfolio_ledger.max_holding(prop), held)
+    
+    payload = {
+        "property_id": property_id,
+        "user_ids": user_ids,
+        "amounts": amounts.tolist(),
+        "report": offering.report,
+        "timestamp": to_timestamp(offering.closed_at)
+    }
+    coherence.write("offering.allocate", payload)
+    allocated = offering.report["fractions_allocated"]
+    if allocated:
+        update_available_fractions(property_id, -allocated)
+    
+    return await _mint_pending(prop, offering)
+
+
+@router.post("/{property_id}/offering/mint", dependencies=[Depends(offering_limit)])
+async def retry_offering_mint(property_id: str) -> dict:
+    """Mint the allocations of a closed offering that a failed close left unminted"""
+    offering = _get_offering(property_id)
+    if offering.status == OPEN:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Offering is still open"
+        )
+    prop = properties_db[property_id]
+    _require_token_id(prop)
+    return await _mint_pending(prop, offering)
+
+
+@router.get("/{property_id}/offering/allocations/{user_id}")
+async def get_offering_allocation(property_id: str, user_id: str) -> dict:
+    """A subscriber's request and allocation"""
+    offering = _get_offering(property_id)
+    if user_id not in offering.subscriptions:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No subscription for this user"
+        )
+    return {
+        "property_id": property_id,
+        "user_id": user_id,
+        "status": offering.status,
+        "requested": offering.subscriptions[user_id],
+        "allocated": offering.allocations.get(user_id, 0) if offering.status != OPEN else None
+    }
+
+
+async def _mint_pending(prop: dict, offering: PrimaryOffering) -> dict:
+    """
+    Send the offering's pending mints; whatever was sent is recorded even when
+    the batch fails part-way, so a retry resumes with the next allocation
+    """
+    if not offering.mint_pending:
+        return offering.summary()
+    if offering.minting:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A mint batch for this offering is already in flight"
+        )
+    
+    offering.minting = True
+    try:
+        tx_hashes = await mint_batch(prop["token_id"], offering.mint_pending)
+    except MintBatchError as e:
+        if e.tx_hashes:
+            coherence.write("offering.minted", {"property_id": prop["id"], "tx_hashes": e.tx_hashes})
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=(
+                f"Allocation recorded but minting failed with {len(offering.mint_pending)} mints pending, "
+                f"retry with POST /properties/{prop['id']}/offering/mint: {e}"
+            )
+        )
+    finally:
+        offering.minting = False
+    if tx_hashes:
+        coherence.write("offering.minted", {"property_id": prop["id"], "tx_hashes": tx_hashes})
+    return offering.summary()
+
+
+def _require_token_id(prop: dict):
+    """Offerings mint into the property's token; refuse until it is known"""
+    if prop.get("token_id") is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Property has no on-chain token yet, set it with PATCH /properties/{id}/token first"
+        )
+
+
+def _get_offering(property_id: str) -> PrimaryOffering:
+    offering = offerings.get(property_id)
+    if offering is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No offering for this property"
+        )
+    return offering
+
+
+@router.get("/{property_id}/distributions/{period}", response_model=RentalDistribution)
+async def get_rental_distribution(property_id: str, period: str) -> Response:
+    """
+    Get the rental distribution for a period (YYYY-MM)
+    Served from a cache that is only rebuilt when holdings or rent change
+    """
+    try:
+        entry = distribution_cache.get(property_id, period)
+    except KeyError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Property not found"
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    return Response(content=entry["body"], media_type="application/json")
+
+
+@router.get("/{property_id}/distributions/{period}/{wallet_address}")
+async def get_wallet_rental_distribution(property_id: str, period: str, wallet_address: str) -> dict:
+    """Get a single wallet's expected payout for a period"""
+    try:
+        distribution = get_wallet_distribution(property_id, period, wallet_address)
+    except KeyError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Property not found"
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    if distribution is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No distribution for this wallet"
+        )
+    return distribution
+
+
+@router.patch("/{property_id}/rent", dependencies=[Depends(rent_limit)])
+async def set_property_rent(property_id: str, monthly_rent: float = Query(..., gt=0, allow_inf_nan=False)) -> dict:
+    """Set monthly rent used for distributions"""
+    try:
+        coherence.write("distribution.rent", {"property_id": property_id, "monthly_rent": monthly_rent})
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Property not found"
+        )
+    return {"message": "Monthly rent set", "monthly_rent": monthly_rent}
+
+
+def build_property_record(property_data: PropertyCreate, passport: PropertyPassport, now: datetime) -> dict:
+    """Build the stored property dict for a new property"""
+    return {
+        "id": str(uuid.uuid4()),
+        "name": property_data.name,
+        "description": property_data.description,
+        "address": property_data.address,
+        "city": property_data.city,
+        "asking_price": property_data.asking_price,
+        "total_fractions": property_data.total_fractions,
+        "available_fractions": property_data.total_fractions,
+        "price_per_fraction": property_data.price_per_fraction,
+        "expected_yield": property_data.expected_yield,
+        "token_id": None,  # Set after on-chain creation
+        "manager_address": "0x0000000000000000000000000000000000000000",
+        "passport": passport.model_dump(),
+        "created_at": now
+    }
+
+
+def insert_properties(records: list[dict]) -> list[str]:
+    """Insert new property records in bulk (internal use)"""
+    coherence.write("properties.upsert", records)
+    return [record["id"] for record in records]
+
+
+def insert_imported_properties(rows: list[tuple[PropertyCreate, PropertyPassport]], now: datetime) -> list[str]:
+    """Insert one validated, enriched import chunk (internal use)"""
+    return insert_properties([build_property_record(data, passport, now) for data, passport in rows])
+
+
+def transfer_holdings(prop: dict, from_user: Optional[str], to_user: str, fractions: int, timestamp: float):
+    """Record a fill or allocation in the portfolio ledger and the distribution holder history (internal use)"""
+    debited = portfolio_ledger.record_transfer(prop, from_user, to_user, fractions)
+    record_holder_transfer(
+        prop["id"],
+        _holder_id(from_user) if from_user is not None else None,
+        _holder_id(to_user),
+        fractions,
+        debited,
+        int(timestamp)
+    )
+
+
+def _holder_id(user_id: str) -> str:
+    holder = holder_ids.get(user_id)
+    if holder is None:
+        user = users_db.get(user_id)
+        holder = holder_ids[user_id] = (user or {}).get("wallet_address") or user_id
+    return holder
+
+
 def update_available_fractions(property_id: str, change: int) -> Optional[dict]:
     """Update available fractions (internal use)"""
     if property_id in properties_db:
         properties_db[property_id]["available_fractions"] += change
+        coherence.write("properties.upsert", [properties_db[property_id]])
         return properties_db[property_id]
     return None
+
+
+# ============ Replicated writes (applied locally and by other workers) ============
+
+def apply_property_upserts(records: list[dict]):
+    """Store full property records and update the location index and versions"""
+    properties_db.update((record["id"], record) for record in records)
+    location_index.add_many(records)
+    register_properties(records)
+    for record in records:
+        versions.bump("properties", record["id"])
+
+
+def apply_woz_revaluation(payload: dict) -> dict:
+    """Revalue every stored passport for a WOZ year"""
+    passports = [p["passport"] for p in properties_db.values() if p.get("passport")]
+    report = revalue_passports(passports, payload["woz_year"], payload["current_year"])
+    registry_passport_cache.clear()
+    versions.bump_all("properties")
+    return report
+
+
+def apply_max_holding(payload: dict):
+    """Cache an on-chain max holding for the pre-trade check"""
+    portfolio_ledger.set_max_holding(payload["property_id"], payload["max_holding"])
+
+
+def apply_monthly_rent(payload: dict):
+    """Set a property's rent (invalidates its cached distributions)"""
+    set_monthly_rent(payload["property_id"], payload["monthly_rent"])
+
+
+def apply_offering_open(payload: dict):
+    """Start a new offering window for a property"""
+    offerings[payload["property_id"]] = PrimaryOffering(
+        payload["property_id"], payload["fractions"], payload["price_per_fraction"], payload["opened_at"]
+    )
+
+
+def apply_offering_subscription(payload: dict):
+    """Set (or withdraw) a user's subscription"""
+    offering = offerings.get(payload["property_id"])
+    if offering is not None and offering.status == OPEN:
+        offering.subscribe(payload["user_id"], payload["wallet"], payload["fractions"])
+
+
+def apply_offering_allocation(payload: dict):
+    """Close an offering with its allocation and credit every allocated subscriber"""
+    prop = properties_db.get(payload["property_id"])
+    offering = offerings.get(payload["property_id"])
+    if offering is not None and offering.status == OPEN:
+        # Replicated close: adopt the allocating worker's result
+        offering.allocations = dict(zip(payload["user_ids"], payload["amounts"]))
+        offering.report = payload["report"]
+        offering.status = CLOSED
+        offering.closed_at = datetime.utcfromtimestamp(payload["timestamp"])
+    if offering is not None:
+        offering.mint_pending = [
+            (offering.wallets[user_id], amount) for user_id, amount in zip(payload["user_ids"], payload["amounts"])
+        ]
+    if prop is not None:
+        for user_id, amount in zip(payload["user_ids"], payload["amounts"]):
+            transfer_holdings(prop, None, user_id, amount, payload["timestamp"])
+
+
+def apply_offering_minted(payload: dict):
+    """Record mint transactions sent for an offering's pending allocations"""
+    offering = offerings.get(payload["property_id"])
+    if offering is not None:
+        offering.record_minted(payload["tx_hashes"])
+
+
+coherence.register("properties.upsert", apply_property_upserts, idempotent=True)
+coherence.register("properties.revalue", apply_woz_revaluation)
+coherence.register("properties.max_holding", apply_max_holding, idempotent=True)
+coherence.register("distribution.rent", apply_monthly_rent, idempotent=True)
+coherence.register("offering.open", apply_offering_open)
+coherence.register("offering.subscribe", apply_offering_subscription, idempotent=True)
+coherence.register("offering.allocate", apply_offering_allocation)
+coherence.register("offering.minted", apply_offering_minted)
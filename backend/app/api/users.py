@@ -1,19 +1,29 @@
 """
 Domira Backend - Users API
 """
-from fastapi import APIRouter, HTTPException, status
-from app.models.schemas import User, UserCreate, KYCStatus
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from app.models.schemas import User, UserCreate, KYCStatus, Portfolio
+from app.services.portfolio import portfolio_ledger
+from app.services.coherence import coherence
+from app.services.rate_limit import RateLimit
+from app.services.user_import import import_users, iter_json_array
 from typing import Optional
 from datetime import datetime
 import uuid
 
+from pydantic_core import to_json
+
 router = APIRouter()
 
 # In-memory store for MVP (replace with database)
 users_db: dict[str, dict] = {}
 
+# Admission control on write routes (429 + Retry-After when exceeded)
+user_write_limit = RateLimit("users.write")
+user_bulk_limit = RateLimit("users.bulk", client_rate=0.1, client_burst=2)
+
 
-@router.post("/", response_model=User, status_code=status.HTTP_201_CREATED)
+@router.post("/", response_model=User, status_code=status.HTTP_201_CREATED, dependencies=[Depends(user_write_limit)])
 async def create_user(user: UserCreate) -> User:
     """Create a new user account"""
     user_id = str(uuid.uuid4())
@@ -29,10 +39,27 @@ async def create_user(user: UserCreate) -> User:
         "updated_at": now
     }
     
-    users_db[user_id] = user_data
+    coherence.write("users.upsert", user_data)
     return User(**user_data)
 
 
+@router.post("/bulk", dependencies=[Depends(user_bulk_limit)])
+async def bulk_create_users(request: Request) -> Response:
+    """
+    Onboard users in bulk from a streamed JSON array of UserCreate rows
+    Emails and wallets already registered (or repeated in the batch) are reported per row
+    """
+    try:
+        result = await import_users(iter_json_array(request.stream()), users_db.values(), insert=insert_users)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    # Per-row results can run to hundreds of thousands of entries: skip jsonable_encoder
+    return Response(to_json(result), media_type="application/json")
+
+
 @router.get("/{user_id}", response_model=User)
 async def get_user(user_id: str) -> User:
     """Get user profile by ID"""
@@ -61,7 +88,18 @@ async def get_kyc_status(user_id: str) -> dict:
     }
 
 
-@router.patch("/{user_id}/wallet")
+@router.get("/{user_id}/portfolio", response_model=Portfolio)
+async def get_portfolio(user_id: str) -> Portfolio:
+    """Get user's holdings, value and monthly yield (maintained on each trade)"""
+    if user_id not in users_db:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    return Portfolio(**portfolio_ledger.portfolio(user_id))
+
+
+@router.patch("/{user_id}/wallet", dependencies=[Depends(user_write_limit)])
 async def update_wallet(user_id: str, wallet_address: str) -> dict:
     """Update user's wallet address"""
     if user_id not in users_db:
@@ -70,8 +108,8 @@ async def update_wallet(user_id: str, wallet_address: str) -> dict:
             detail="User not found"
         )
     
-    users_db[user_id]["wallet_address"] = wallet_address
-    users_db[user_id]["updated_at"] = datetime.utcnow()
+    user = {**users_db[user_id], "wallet_address": wallet_address, "updated_at": datetime.utcnow()}
+    coherence.write("users.upsert", user)
     
     return {"message": "Wallet address updated", "wallet_address": wallet_address}
 
@@ -81,6 +119,7 @@ def update_user_kyc_status(user_id: str, status: KYCStatus) -> Optional[dict]:
     if user_id in users_db:
         users_db[user_id]["kyc_status"] = status
         users_db[user_id]["updated_at"] = datetime.utcnow()
+        coherence.publish("users.upsert", users_db[user_id])
         return users_db[user_id]
     return None
 
@@ -91,3 +130,37 @@ def get_user_by_wallet(wallet_address: str) -> Optional[dict]:
         if user.get("wallet_address") == wallet_address:
             return user
     return None
+
+
+def insert_users(rows: list[UserCreate], user_ids: list[str], now: datetime):
+    """Insert validated users in bulk with pre-generated ids (internal use)"""
+    records = [
+        {
+            "id": user_id,
+            "email": user.email,
+            "full_name": user.full_name,
+            "wallet_address": user.wallet_address,
+            "kyc_status": KYCStatus.PENDING,
+            "created_at": now,
+            "updated_at": now
+        }
+        for user, user_id in zip(rows, user_ids)
+    ]
+    coherence.write("users.upsert_many", records)
+
+
+def apply_user_upsert(user: dict):
+    """Store a full user record (replicated from this or another worker)"""
+    users_db[user["id"]] = user
+    portfolio_ledger.set_wallet(user["id"], user.get("wallet_address"))
+
+
+def apply_user_upserts(users: list[dict]):
+    """Store full user records in bulk"""
+    users_db.update((user["id"], user) for user in users)
+    for user in users:
+        portfolio_ledger.set_wallet(user["id"], user.get("wallet_address"))
+
+
+coherence.register("users.upsert", apply_user_upsert, idempotent=True)
+coherence.register("users.upsert_many", apply_user_upserts, idempotent=True)
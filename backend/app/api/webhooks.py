@@ -2,23 +2,35 @@
 Domira Backend - Stripe Webhooks API
 Handles Stripe Identity verification events
 """
-from fastapi import APIRouter, Request, HTTPException, Header
+from fastapi import APIRouter, Depends, Request, HTTPException, Header
 from app.config import get_settings
 from app.models.schemas import KYCStatus
 from app.api.users import update_user_kyc_status, get_user_by_wallet
 from app.web3.contract import whitelist_address
-import stripe
+from app.services.metrics import time_external
+from app.services.rate_limit import RateLimit, rpc_slots, stripe_slots
 import logging
 
 router = APIRouter()
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
-# Configure Stripe
-stripe.api_key = settings.stripe_api_key
+# Admission control (429 + Retry-After when exceeded); Stripe delivers every
+# webhook from the same few addresses and retries on 429, so only the route-wide
+# bucket and the RPC pool apply there
+webhook_limit = RateLimit("webhooks.stripe", per_client=False, slots=rpc_slots)
+session_limit = RateLimit("webhooks.verification_session", slots=stripe_slots)
 
 
-@router.post("/stripe")
+def get_stripe():
+    """Import and configure the Stripe SDK on first use (keeps it off the cold-start path)"""
+    import stripe
+    
+    stripe.api_key = settings.stripe_api_key
+    return stripe
+
+
+@router.post("/stripe", dependencies=[Depends(webhook_limit)])
 async def stripe_webhook(
     request: Request,
     stripe_signature: str = Header(None, alias="Stripe-Signature")
@@ -35,10 +47,12 @@ async def stripe_webhook(
     
     # Verify webhook signature in production
     if settings.stripe_webhook_secret:
+        stripe = get_stripe()
         try:
-            event = stripe.Webhook.construct_event(
-                payload, stripe_signature, settings.stripe_webhook_secret
-            )
+            with time_external("stripe", "Webhook.construct_event"):
+                event = stripe.Webhook.construct_event(
+                    payload, stripe_signature, settings.stripe_webhook_secret
+                )
         except ValueError as e:
             logger.error(f"Invalid payload: {e}")
             raise HTTPException(status_code=400, detail="Invalid payload")
@@ -128,7 +142,7 @@ async def handle_verification_failed(data: dict) -> dict:
     return {"status": "failed", "user_id": user_id}
 
 
-@router.post("/create-verification-session")
+@router.post("/create-verification-session", dependencies=[Depends(session_limit)])
 async def create_verification_session(user_id: str, wallet_address: str) -> dict:
     """
     Create a new Stripe Identity verification session for a user
@@ -142,20 +156,22 @@ async def create_verification_session(user_id: str, wallet_address: str) -> dict
             "status": "mock_mode"
         }
     
+    stripe = get_stripe()
     try:
-        session = stripe.identity.VerificationSession.create(
-            type="document",
-            metadata={
-                "user_id": user_id,
-                "wallet_address": wallet_address
-            },
-            options={
-                "document": {
-                    "require_matching_selfie": True,
-                    "allowed_types": ["passport", "driving_license", "id_card"]
+        with time_external("stripe", "identity.VerificationSession.create"):
+            session = stripe.identity.VerificationSession.create(
+                type="document",
+                metadata={
+                    "user_id": user_id,
+                    "wallet_address": wallet_address
+                },
+                options={
+                    "document": {
+                        "require_matching_selfie": True,
+                        "allowed_types": ["passport", "driving_license", "id_card"]
+                    }
                 }
-            }
-        )
+            )
         
         return {
             "session_id": session.id,
@@ -12,6 +12,9 @@ class Settings(BaseSettings):
     app_name: str = "Domira API"
     debug: bool = False
     api_v1_prefix: str = "/api/v1"
+    preload_integrations: bool = False  # import web3/stripe at startup instead of first use
+    listing_sweep_interval: float = 1.0  # seconds between listing expiry sweeps
+    coherence_journal: str = ""  # shared event journal for multi-worker deployments (empty = single worker)
     
     # Database
     database_url: str = "sqlite+aiosqlite:///./domira.db"
@@ -25,6 +28,25 @@ class Settings(BaseSettings):
     contract_address: str = ""
     admin_private_key: str = ""
     
+    # Dutch registries (empty URL = mock data)
+    kadaster_api_url: str = ""
+    bag_api_url: str = ""
+    pdok_api_url: str = ""
+    kadaster_timeout: float = 2.0
+    bag_timeout: float = 1.0
+    pdok_timeout: float = 1.5
+    registry_max_connections: int = 50
+    
+    # Admission control on write routes (per worker; see app/services/rate_limit.py)
+    rate_limit_enabled: bool = True
+    write_rate_per_client: float = 2.0  # sustained requests/s per client on each write route
+    write_burst_per_client: int = 10
+    write_rate_per_route: float = 50.0  # sustained requests/s per write route, all clients
+    write_burst_per_route: int = 100
+    trusted_proxy_hops: int = 0  # proxies in front that append to X-Forwarded-For (Cloud Run: 1)
+    rpc_max_concurrency: int = 8  # requests in flight on routes that call the RPC node
+    stripe_max_concurrency: int = 8  # requests in flight on routes that call Stripe
+    
     # CORS
     cors_origins: list[str] = ["http://localhost:3000"]
     
@@ -1,20 +1,50 @@
 """
 Domira Backend - FastAPI Application
 """
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import PlainTextResponse
 
 from app.config import get_settings
-from app.api import users, properties, marketplace, webhooks
+from app.api import users, properties, marketplace, webhooks, debug
+from app.services.registry_providers import close_http_client
+from app.services.metrics import MetricsMiddleware, registry
+from app.services.coherence import CoherenceMiddleware, JournalFileBus, coherence
+from app.services.profiling import ProfilingMiddleware
+from app.services.expiry import PeriodicSweeper
+from app.web3 import contract
 
 settings = get_settings()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup/shutdown"""
+    if settings.preload_integrations:
+        contract.warm_up()
+        webhooks.get_stripe()
+    if settings.coherence_journal:
+        # Replay writes made by other workers (and earlier runs) before serving
+        coherence.configure(JournalFileBus(settings.coherence_journal))
+        coherence.sync()
+    listing_sweeper = PeriodicSweeper("listing-expiry", marketplace.expire_due_listings, settings.listing_sweep_interval)
+    listing_sweeper.start()
+    yield
+    await listing_sweeper.stop()
+    coherence.close()
+    await close_http_client()
+
+
 app = FastAPI(
     title=settings.app_name,
     description="Domira - Fractional Real Estate Marketplace API",
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # CORS Middleware
@@ -26,11 +56,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Opt-in per-request cProfile capture (X-Profile: 1); not installed outside debug mode
+if settings.debug:
+    app.add_middleware(ProfilingMiddleware)
+
+# Apply other workers' writes before each request (no-op without COHERENCE_JOURNAL)
+app.add_middleware(CoherenceMiddleware)
+
+# Compress larger responses (catalog lists) for clients that accept gzip
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+# Per-route latency, in-flight and payload size metrics (outermost, so it times everything)
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(users.router, prefix=f"{settings.api_v1_prefix}/users", tags=["Users"])
 app.include_router(properties.router, prefix=f"{settings.api_v1_prefix}/properties", tags=["Properties"])
 app.include_router(marketplace.router, prefix=f"{settings.api_v1_prefix}/marketplace", tags=["Marketplace"])
 app.include_router(webhooks.router, prefix=f"{settings.api_v1_prefix}/webhooks", tags=["Webhooks"])
+if settings.debug:
+    app.include_router(debug.router, prefix=f"{settings.api_v1_prefix}/debug", tags=["Debug"])
 
 
 @app.get("/health")
@@ -39,6 +84,12 @@ async def health_check():
     return {"status": "healthy", "service": "domira-api"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics (request latency histograms, RPC/Stripe timers)"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/")
 async def root():
     """Root endpoint"""
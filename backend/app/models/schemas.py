@@ -20,6 +20,7 @@ class ListingStatus(str, Enum):
     ACTIVE = "active"
     SOLD = "sold"
     CANCELLED = "cancelled"
+    EXPIRED = "expired"
 
 
 # ============ User Models ============
@@ -57,6 +58,7 @@ class PropertyPassport(BaseModel):
     address: str = Field(..., description="Full address")
     postal_code: str = Field(..., description="Postal code")
     city: str = Field(..., description="City")
+    neighborhood: Optional[str] = Field(None, description="Wijk")
     building_year: int = Field(..., description="Construction year")
     floor_area: float = Field(..., description="Floor area in m²")
     building_type: str = Field(..., description="Type of building")
@@ -101,6 +103,7 @@ class ListingCreate(BaseModel):
     property_id: str = Field(..., description="Property ID to list")
     fractions: int = Field(..., description="Number of fractions to sell")
     price_per_fraction: float = Field(..., description="Asking price per fraction")
+    expires_at: Optional[datetime] = Field(None, description="When the listing expires (default: never)")
 
 
 class Listing(BaseModel):
@@ -113,6 +116,7 @@ class Listing(BaseModel):
     total_price: float
     status: ListingStatus
     created_at: datetime
+    expires_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -120,7 +124,20 @@ class Listing(BaseModel):
 
 class BuyOrder(BaseModel):
     listing_id: str = Field(..., description="Listing ID to buy from")
-    fractions: int = Field(..., description="Number of fractions to buy")
+    fractions: int = Field(..., gt=0, description="Number of fractions to buy")
+    buyer_id: str = Field(..., description="Buying user ID (would come from auth); must have a wallet")
+
+
+# ============ Primary Offering Models ============
+
+class OfferingCreate(BaseModel):
+    fractions: Optional[int] = Field(None, description="Fractions on offer (default: all available)")
+    price_per_fraction: Optional[float] = Field(None, description="Offer price (default: the property's price per fraction)")
+
+
+class OfferingSubscription(BaseModel):
+    user_id: str = Field(..., description="Subscribing user ID (would come from auth)")
+    fractions: int = Field(..., ge=0, description="Fractions requested (0 withdraws the subscription)")
 
 
 # ============ Portfolio Models ============
@@ -128,7 +145,7 @@ class BuyOrder(BaseModel):
 class PortfolioHolding(BaseModel):
     property_id: str
     property_name: str
-    token_id: int
+    token_id: Optional[int] = None
     fractions_held: int
     total_fractions: int
     percentage_held: float
@@ -0,0 +1,79 @@
+"""
+Domira Backend - In-Process Caches
+LRU cache with per-entry TTL and hit/miss counters
+"""
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+import time
+
+
+class LRUTTLCache:
+    """
+    Bounded LRU cache whose entries also expire after ttl_seconds.
+
+    Lookups and inserts are O(1); expired entries are dropped lazily when they
+    are read or pushed out by the LRU bound.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: Optional[float] = 3600.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None on a miss or expired entry"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at and expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        """Insert or refresh an entry, evicting the least recently used if full"""
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else 0.0
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        """Drop a single entry if present"""
+        self._entries.pop(key, None)
+
+    def values(self) -> list[Any]:
+        """Unexpired values, least recently used first (leaves LRU order and counters alone)"""
+        now = time.monotonic()
+        return [value for expires_at, value in self._entries.values() if not expires_at or expires_at > now]
+    
+    def clear(self):
+        """Drop all entries (counters are kept)"""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
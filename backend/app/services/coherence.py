@@ -0,0 +1,202 @@
+"""
+Domira Backend - Cross-Worker Coherence
+Broadcasts writes between uvicorn worker processes so each keeps a hot,
+in-process copy of the stores and caches that still sees other workers' writes
+
+Each write is published as an event on a bus; every worker drains the bus at
+the start of each request and applies the events it has not seen. The bundled
+JournalFileBus is an append-only file shared by the workers on one host: a
+stand-in for Redis pub/sub or Postgres LISTEN/NOTIFY that needs no service.
+"""
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+import fcntl
+import json
+import logging
+import os
+import uuid
+
+from pydantic_core import to_json
+
+from app.services.versions import versions
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Any], Any]
+
+# First line of every journal; its id is the version epoch shared by the workers
+JOURNAL_HEADER = "journal.open"
+
+
+class JournalFileBus:
+    """
+    Append-only JSON-lines journal shared by all workers.
+    
+    Publishing is one O_APPEND write per event under an exclusive flock, so
+    concurrent writers never interleave lines and each event's byte offset,
+    known to the writer before it appends, is its sequence number on every
+    worker. Polling with nothing new costs one fstat. A worker that starts
+    later replays the journal from the beginning, which also gives it the
+    current state.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+        self._offset = 0
+        self._partial = b""
+        self._partial_offset = 0
+        with self.appending() as offset:
+            if offset == 0:
+                self.append({"kind": JOURNAL_HEADER, "id": uuid.uuid4().hex[:8]})
+        header = json.loads(os.pread(self._fd, 4096, 0).split(b"\n", 1)[0])
+        self.journal_id = header.get("id") or f"{os.fstat(self._fd).st_ino:x}"
+    
+    @contextmanager
+    def appending(self) -> Iterator[int]:
+        """Hold the append lock; yields the offset the next append() lands at"""
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            yield os.fstat(self._fd).st_size
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+    
+    def append(self, event: dict):
+        """Write one event (call inside appending())"""
+        os.write(self._fd, to_json(event) + b"\n")
+    
+    def publish(self, event: dict) -> int:
+        """Append one event; returns its offset"""
+        with self.appending() as offset:
+            self.append(event)
+        return offset
+    
+    def poll(self) -> list[tuple[int, dict]]:
+        """(offset, event) pairs appended since the last poll (including this worker's own)"""
+        size = os.fstat(self._fd).st_size
+        if size <= self._offset:
+            return []
+        data = os.pread(self._fd, size - self._offset, self._offset)
+        self._offset += len(data)
+        buffer = self._partial + data
+        events = []
+        start = 0
+        end = buffer.find(b"\n")
+        while end >= 0:
+            if end > start:
+                events.append((self._partial_offset + start, json.loads(buffer[start:end])))
+            start = end + 1
+            end = buffer.find(b"\n", start)
+        # Incomplete trailing line, finished by a later write
+        self._partial = buffer[start:]
+        self._partial_offset += start
+        return events
+    
+    def close(self):
+        os.close(self._fd)
+
+
+class CoherenceLayer:
+    """
+    Event fan-out between workers.
+    
+    Writers either write(kind, payload), which runs the registered handler
+    locally and broadcasts the event, or apply a change themselves and then
+    publish(kind, payload). Every worker runs the registered handler for each
+    event in journal order. Idempotent events ("upserts": the full new record)
+    are applied everywhere, the writer included, so concurrent writes to one
+    entity converge on the last one in the journal. Non-idempotent events
+    (deltas such as a fill) are skipped by the worker that already applied
+    them.
+    
+    Version bumps made by a handler are stamped with the event's journal
+    offset (see VersionCounters), so ETags agree across workers and restarts.
+    Changes that bump versions must therefore go through write().
+    """
+    
+    def __init__(self):
+        self.worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.bus: Optional[JournalFileBus] = None
+        self._handlers: dict[str, tuple[Handler, bool]] = {}
+        self.applied = 0
+    
+    @property
+    def enabled(self) -> bool:
+        return self.bus is not None
+    
+    def register(self, kind: str, handler: Handler, idempotent: bool = False):
+        """Handle events of `kind`; idempotent handlers also see this worker's own events"""
+        self._handlers[kind] = (handler, idempotent)
+    
+    def configure(self, bus: Optional[JournalFileBus]):
+        """Attach a bus (None disables coherence, e.g. single-worker deployments)"""
+        self.bus = bus
+        if bus is not None:
+            versions.epoch = bus.journal_id
+    
+    def publish(self, kind: str, payload: Any):
+        """Broadcast a change this worker has already applied locally"""
+        if self.bus is not None:
+            self.bus.publish(self._event(kind, payload))
+    
+    def write(self, kind: str, payload: Any) -> Any:
+        """
+        Apply a change through its registered handler and broadcast it.
+        
+        With a bus, the journal stays locked from reserving the event's offset
+        until it is appended, so the local apply is stamped with the same
+        sequence the other workers will use. Returns the handler's result.
+        """
+        apply, _ = self._handlers[kind]
+        if self.bus is None:
+            with versions.stamped(versions.next_sequence()):
+                return apply(payload)
+        with self.bus.appending() as offset:
+            with versions.stamped(offset):
+                result = apply(payload)
+            self.bus.append(self._event(kind, payload))
+        return result
+    
+    def _event(self, kind: str, payload: Any) -> dict:
+        return {"kind": kind, "worker": self.worker_id, "payload": payload}
+    
+    def sync(self) -> int:
+        """Apply pending events from the bus; returns how many were applied"""
+        if self.bus is None:
+            return 0
+        applied = 0
+        for offset, event in self.bus.poll():
+            handler = self._handlers.get(event["kind"])
+            if handler is None:
+                continue
+            apply, idempotent = handler
+            if event["worker"] == self.worker_id and not idempotent:
+                continue
+            try:
+                with versions.stamped(offset):
+                    apply(event["payload"])
+                applied += 1
+            except Exception:
+                logger.exception(f"Failed to apply {event['kind']} event from worker {event['worker']}")
+        self.applied += applied
+        return applied
+    
+    def close(self):
+        if self.bus is not None:
+            self.bus.close()
+            self.bus = None
+
+
+coherence = CoherenceLayer()
+
+
+class CoherenceMiddleware:
+    """Drain the bus before each request so it sees every write published so far"""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and coherence.enabled:
+            coherence.sync()
+        await self.app(scope, receive, send)
@@ -0,0 +1,407 @@
+"""
+Domira Backend - Rental Distribution Engine
+Vectorized pro-rata split of rental income over token holders in integer cents
+"""
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+
+from app.models.schemas import RentalDistribution
+from app.services.holder_snapshots import ZERO_ADDRESS, HolderSnapshotStore, period_bounds
+
+INT64_MAX = np.iinfo(np.int64).max
+
+
+def to_cents(amount: float) -> int:
+    """Convert a EUR amount to integer cents"""
+    return int(round(amount * 100))
+
+
+def split_management_fee(gross_cents: int, fee_percent: float) -> tuple[int, int]:
+    """Split gross income into (management fee, net income), both in cents"""
+    fee_cents = int(round(gross_cents * fee_percent / 100))
+    return fee_cents, gross_cents - fee_cents
+
+
+def allocate_cents(weights: np.ndarray, net_cents: int, total_weight: int) -> np.ndarray:
+    """
+    Split net_cents pro-rata over integer holder weights.
+
+    Every holder gets the floor of its exact share, then the leftover cents go
+    to the largest remainders (ties broken by position), so the result sums to
+    exactly floor(net_cents * sum(weights) / total_weight).
+
+    Args:
+        weights: Integer weight per holder (fractions held)
+        net_cents: Distributable income in cents
+        total_weight: Weight representing 100% of the income (total fractions)
+
+    Returns:
+        int64 array of cents per holder, aligned with weights
+    """
+    weights = np.asarray(weights, dtype=np.int64)
+    if total_weight <= 0:
+        raise ValueError("Total weight must be positive")
+    if weights.size == 0:
+        return np.zeros(0, dtype=np.int64)
+    if weights.min() < 0:
+        raise ValueError("Holder weights must be non-negative")
+
+    held = int(weights.sum())
+    if held > total_weight:
+        raise ValueError(f"Holders own {held} of {total_weight} fractions")
+
+    if net_cents and int(weights.max()) > INT64_MAX // abs(net_cents):
+        # Products would overflow int64, fall back to exact Python integers
+        # (np.divmod has no object loop, so floor-divide and take the remainder separately)
+        scaled = weights.astype(object) * net_cents
+        amounts, remainders = scaled // total_weight, scaled % total_weight
+    else:
+        amounts, remainders = np.divmod(weights * net_cents, total_weight)
+    amounts = amounts.astype(np.int64)
+    remainders = remainders.astype(np.int64)
+
+    leftover = net_cents * held // total_weight - int(amounts.sum())
+    if leftover > 0:
+        winners = np.argsort(-remainders, kind="stable")[:leftover]
+        amounts[winners] += 1
+    return amounts
+
+
+# Mock data for demonstration
+MOCK_PROPERTIES = {
+    "prop-001": {
+        "name": "Stationsplein Apartments",
+        "token_id": 0,
+        "total_fractions": 1000,
+        "monthly_rent": 12500.00,  # EUR
+        "management_fee_percent": 15.0
+    },
+    "prop-002": {
+        "name": "Weerwater Residences",
+        "token_id": 1,
+        "total_fractions": 500,
+        "monthly_rent": 8000.00,
+        "management_fee_percent": 12.0
+    }
+}
+
+# Mock token holders (would come from on-chain data)
+MOCK_HOLDERS = {
+    0: [  # token_id 0
+        {"wallet": "0x1234...abcd", "fractions": 200},
+        {"wallet": "0x5678...efgh", "fractions": 150},
+        {"wallet": "0x9abc...ijkl", "fractions": 100},
+        {"wallet": "0xdef0...mnop", "fractions": 50},
+        {"wallet": "0x1111...pool", "fractions": 500},  # Liquidity pool
+    ],
+    1: [  # token_id 1
+        {"wallet": "0x2222...aaaa", "fractions": 100},
+        {"wallet": "0x3333...bbbb", "fractions": 100},
+        {"wallet": "0x4444...cccc", "fractions": 75},
+        {"wallet": "0x5555...dddd", "fractions": 225},
+    ]
+}
+
+# Management fee for properties created through the API until one is configured
+DEFAULT_MANAGEMENT_FEE_PERCENT = 15.0
+
+# Distribution terms per property: the mock properties, plus every stored
+# property registered through register_properties()
+property_terms: dict[str, dict] = {
+    property_id: {**terms, "holder_key": terms["token_id"]} for property_id, terms in MOCK_PROPERTIES.items()
+}
+
+# Holder history used for period snapshots; the mock holders are minted at the epoch.
+# Mock histories are keyed by token id (as in transfer CSVs), API properties by property id.
+snapshot_store = HolderSnapshotStore()
+for _token_id, _holders in MOCK_HOLDERS.items():
+    snapshot_store.record_mints(_token_id, _holders)
+
+# Bumped on every rent change so cached distributions built on the old rent go stale
+_rent_versions: dict[str, int] = {}
+
+
+def register_properties(records: list[dict]):
+    """
+    Make stored property records distributable (called on every property upsert).
+
+    Name, token and supply follow the record. Rent set through set_monthly_rent
+    is kept; until then it defaults to the expected yield on the asking price.
+    """
+    for record in records:
+        terms = property_terms.get(record["id"])
+        if terms is None:
+            property_terms[record["id"]] = {
+                "name": record["name"],
+                "token_id": record.get("token_id"),
+                "total_fractions": record["total_fractions"],
+                "monthly_rent": round(record["asking_price"] * record["expected_yield"] / 1200, 2),
+                "management_fee_percent": DEFAULT_MANAGEMENT_FEE_PERCENT,
+                "holder_key": record["id"]
+            }
+            continue
+        changed = {
+            "name": record["name"],
+            "token_id": record.get("token_id"),
+            "total_fractions": record["total_fractions"]
+        }
+        if any(terms[key] != value for key, value in changed.items()):
+            terms.update(changed)
+            distribution_cache.invalidate(record["id"])
+
+
+def record_holder_transfer(
+    property_id: str,
+    sender: Optional[str],
+    receiver: str,
+    fractions: int,
+    debited: int,
+    timestamp: int
+):
+    """
+    Append a ledger transfer to a property's holder history.
+
+    `debited` is what the sender actually gave up (see PortfolioLedger.record_transfer);
+    the rest is issuance and is recorded as a mint, so histories never go negative.
+    """
+    terms = property_terms.get(property_id)
+    if terms is None:
+        return
+    transfers = []
+    if sender is not None and debited:
+        transfers.append((timestamp, sender, receiver, debited))
+    if fractions > debited:
+        transfers.append((timestamp, ZERO_ADDRESS, receiver, fractions - debited))
+    snapshot_store.add_transfers(terms["holder_key"], transfers)
+
+
+def set_monthly_rent(property_id: str, monthly_rent: float) -> dict:
+    """Update a property's monthly rent (invalidates its cached distributions)"""
+    if property_id not in property_terms:
+        raise ValueError(f"Property {property_id} not found")
+    property_terms[property_id]["monthly_rent"] = monthly_rent
+    _rent_versions[property_id] = _rent_versions.get(property_id, 0) + 1
+    distribution_cache.invalidate(property_id)
+    return property_terms[property_id]
+
+
+def compute_distribution(
+    property_id: str,
+    period: str,
+    gross_rent: Optional[float] = None
+) -> tuple[dict, dict]:
+    """
+    Calculate rental distribution for a property without building per-holder rows.
+
+    Args:
+        property_id: Property identifier
+        period: Distribution period (YYYY-MM format)
+        gross_rent: Override monthly rent (optional)
+
+    Returns:
+        (summary, rows) where summary is the report without the per-holder
+        breakdown and rows holds aligned holder arrays plus the payout order
+    """
+    if property_id not in property_terms:
+        raise ValueError(f"Property {property_id} not found")
+
+    prop = property_terms[property_id]
+    token_id = prop["token_id"]
+
+    # Get gross rental income
+    gross_cents = to_cents(gross_rent or prop["monthly_rent"])
+
+    # Calculate management fee and net income for distribution, in cents
+    fee_cents, net_cents = split_management_fee(gross_cents, prop["management_fee_percent"])
+
+    # Income per fraction
+    income_per_fraction = net_cents / 100 / prop["total_fractions"]
+
+    # Get time-weighted holdings for the period and split net income in one vectorized pass
+    wallets, weights, seconds = snapshot_store.time_weighted_holdings(prop["holder_key"], period)
+    amounts = allocate_cents(weights, net_cents, prop["total_fractions"] * max(seconds, 1))
+
+    # Average fractions held over the period; whole numbers when nobody traded mid-period
+    if seconds and np.all(weights % seconds == 0):
+        fractions = weights // seconds
+    else:
+        fractions = np.round(weights / max(seconds, 1), 4)
+
+    # Sort by amount descending
+    order = np.argsort(-amounts, kind="stable")
+
+    summary = {
+        "property_id": property_id,
+        "property_name": prop["name"],
+        "token_id": token_id,
+        "period": period,
+        "generated_at": datetime.utcnow().isoformat(),
+        "financial_summary": {
+            "gross_rental_income": gross_cents / 100,
+            "management_fee_percent": prop["management_fee_percent"],
+            "management_fee_amount": fee_cents / 100,
+            "net_distributable_income": net_cents / 100,
+            "income_per_fraction": round(income_per_fraction, 4)
+        },
+        "distribution_summary": {
+            "total_fractions": prop["total_fractions"],
+            "holder_count": len(wallets),
+            "total_distributed": int(amounts.sum()) / 100
+        }
+    }
+    rows = {
+        "wallets": wallets,
+        "fractions": fractions,
+        "amounts": amounts,
+        "order": order
+    }
+    return summary, rows
+
+
+def iter_distribution_rows(rows: dict, total_fractions: int, chunk_size: int = 65536):
+    """
+    Yield payout rows in chunks of (wallet, fractions, percentage, amount_cents) tuples.
+
+    Only one chunk of Python objects is alive at a time, so callers that write
+    each chunk out before asking for the next keep memory flat.
+    """
+    wallets = rows["wallets"]
+    order = rows["order"]
+    for start in range(0, len(order), chunk_size):
+        idx = order[start:start + chunk_size]
+        fractions = rows["fractions"][idx]
+        percentages = fractions * (100 / total_fractions)
+        yield list(zip(
+            [wallets[i] for i in idx.tolist()],
+            fractions.tolist(),
+            percentages.tolist(),
+            rows["amounts"][idx].tolist()
+        ))
+
+
+def calculate_distribution(
+    property_id: str,
+    period: str,
+    gross_rent: Optional[float] = None
+) -> dict:
+    """
+    Calculate rental distribution for a property.
+
+    Args:
+        property_id: Property identifier
+        period: Distribution period (YYYY-MM format)
+        gross_rent: Override monthly rent (optional)
+
+    Returns:
+        Distribution report with breakdown per holder
+    """
+    report, rows = compute_distribution(property_id, period, gross_rent)
+    return attach_distributions(report, rows)
+
+
+def attach_distributions(report: dict, rows: dict) -> dict:
+    """Materialize the per-holder breakdown into report["distributions"]"""
+    total_fractions = report["distribution_summary"]["total_fractions"]
+    report["distributions"] = [
+        {
+            "wallet_address": wallet,
+            "fractions": fractions,
+            "percentage": percentage,
+            "amount": cents / 100
+        }
+        for chunk in iter_distribution_rows(rows, total_fractions)
+        for wallet, fractions, percentage, cents in chunk
+    ]
+    return report
+
+
+class DistributionCache:
+    """
+    Computed distributions keyed by (property, period).
+
+    Each entry is tagged with the holder-snapshot and rent versions it was built
+    from. A lookup only recomputes when one of those versions moved; otherwise it
+    serves the pre-rendered JSON body and wallet index built on first use.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, str], dict] = OrderedDict()
+
+    def get(self, property_id: str, period: str) -> dict:
+        """
+        Return the cache entry for a distribution, computing it on first use.
+
+        Entry keys: "version", "body" (RentalDistribution JSON bytes), "summary",
+        "rows" and "wallet_index" (wallet -> position in rows).
+        """
+        if property_id not in property_terms:
+            raise KeyError(property_id)
+        period_bounds(period)  # validate before touching the cache
+
+        key = (property_id, period)
+        version = (
+            snapshot_store.token_version(property_terms[property_id]["holder_key"]),
+            _rent_versions.get(property_id, 0)
+        )
+        entry = self._entries.get(key)
+        if entry is None or entry["version"] != version:
+            entry = self._build(property_id, period, version)
+            self._entries[key] = entry
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        self._entries.move_to_end(key)
+        return entry
+
+    def invalidate(self, property_id: Optional[str] = None):
+        """Drop cached entries for one property, or all of them"""
+        if property_id is None:
+            self._entries.clear()
+            return
+        for key in [k for k in self._entries if k[0] == property_id]:
+            del self._entries[key]
+
+    def _build(self, property_id: str, period: str, version: tuple[int, int]) -> dict:
+        summary, rows = compute_distribution(property_id, period)
+        report = attach_distributions(dict(summary), rows)
+        financial = summary["financial_summary"]
+        body = RentalDistribution(
+            property_id=property_id,
+            property_name=summary["property_name"],
+            period=period,
+            gross_rental_income=financial["gross_rental_income"],
+            management_fee=financial["management_fee_amount"],
+            net_income=financial["net_distributable_income"],
+            distributions=report["distributions"]
+        ).model_dump_json().encode()
+        return {
+            "version": version,
+            "body": body,
+            "summary": summary,
+            "rows": rows,
+            "wallet_index": {wallet: i for i, wallet in enumerate(rows["wallets"])}
+        }
+
+
+distribution_cache = DistributionCache()
+
+
+def get_wallet_distribution(property_id: str, period: str, wallet_address: str) -> Optional[dict]:
+    """Look up one wallet's payout from the cached distribution"""
+    entry = distribution_cache.get(property_id, period)
+    i = entry["wallet_index"].get(wallet_address)
+    if i is None:
+        return None
+    rows = entry["rows"]
+    fractions = rows["fractions"][i].item()
+    return {
+        "property_id": property_id,
+        "period": period,
+        "wallet_address": wallet_address,
+        "fractions": fractions,
+        "percentage": fractions * 100 / entry["summary"]["distribution_summary"]["total_fractions"],
+        "amount": int(rows["amounts"][i]) / 100
+    }
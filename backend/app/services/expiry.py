@@ -0,0 +1,95 @@
+"""
+Domira Backend - Expiry Scheduling
+Deadline min-heap with lazy cancellation and the background task that sweeps
+it, so expiring N due entries costs O(N log n) per tick instead of a scan
+over everything that could expire
+"""
+from datetime import datetime
+from typing import Callable, Optional, Union
+import asyncio
+import heapq
+import logging
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def to_timestamp(value: Union[datetime, str]) -> float:
+    """Unix timestamp of a naive-UTC datetime (or its ISO string, as replicated over the journal)"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return (value - EPOCH).total_seconds()
+
+
+class ExpiryQueue:
+    """
+    Keys ordered by deadline.
+    
+    Cancelling or rescheduling only updates the deadline map; the stale heap
+    entry is skipped when it surfaces, and the heap is rebuilt once stale
+    entries outnumber live ones.
+    """
+    
+    def __init__(self):
+        self._heap: list[tuple[float, str]] = []
+        self._deadlines: dict[str, float] = {}
+    
+    def __len__(self) -> int:
+        return len(self._deadlines)
+    
+    def schedule(self, key: str, deadline: float):
+        if self._deadlines.get(key) == deadline:
+            return
+        self._deadlines[key] = deadline
+        heapq.heappush(self._heap, (deadline, key))
+    
+    def cancel(self, key: str):
+        if self._deadlines.pop(key, None) is not None and len(self._heap) > 2 * len(self._deadlines) + 1024:
+            self._heap = [(deadline, key) for key, deadline in self._deadlines.items()]
+            heapq.heapify(self._heap)
+    
+    def pop_due(self, now: float) -> list[str]:
+        """Remove and return every key whose deadline is <= now, earliest first"""
+        due = []
+        heap = self._heap
+        deadlines = self._deadlines
+        while heap and heap[0][0] <= now:
+            deadline, key = heapq.heappop(heap)
+            if deadlines.get(key) == deadline:
+                del deadlines[key]
+                due.append(key)
+        return due
+
+
+class PeriodicSweeper:
+    """Background task calling sweep() every `interval` seconds (started from the app lifespan)"""
+    
+    def __init__(self, name: str, sweep: Callable[[], int], interval: float):
+        self.name = name
+        self.sweep = sweep
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+    
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=f"sweeper:{self.name}")
+    
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                swept = self.sweep()
+                if swept:
+                    logger.info(f"{self.name}: expired {swept}")
+            except Exception:
+                logger.exception(f"{self.name} sweep failed")
@@ -0,0 +1,190 @@
+"""
+Domira Backend - Holder Snapshot Store
+Time-weighted token holdings per period, built from on-chain transfer history
+"""
+from datetime import datetime, timezone
+from typing import Iterable, Optional, Sequence
+import calendar
+import csv
+
+import numpy as np
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+
+def period_bounds(period: str) -> tuple[int, int]:
+    """Return [start, end) unix timestamps (UTC) for a YYYY-MM period"""
+    try:
+        start = datetime.strptime(period, "%Y-%m").replace(tzinfo=timezone.utc)
+    except ValueError:
+        raise ValueError(f"Invalid period '{period}', expected YYYY-MM")
+    year, month = (start.year + 1, 1) if start.month == 12 else (start.year, start.month + 1)
+    return calendar.timegm(start.timetuple()), calendar.timegm((year, month, 1, 0, 0, 0))
+
+
+class _TokenHistory:
+    """
+    Columnar transfer log for a single token id.
+
+    The timestamp, sender, receiver and amount columns share one buffer that
+    doubles in capacity when full, so recording transfers one at a time (every
+    fill and allocation) is amortized O(1) instead of copying the whole
+    history; the column attributes are views of the filled part.
+    """
+
+    def __init__(self, capacity: int = 16):
+        self.wallet_ids: dict[str, int] = {ZERO_ADDRESS: 0}
+        self.wallets: list[str] = [ZERO_ADDRESS]
+        self.size = 0
+        self._columns = np.zeros((4, capacity), dtype=np.int64)
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self._columns[0, :self.size]
+
+    @property
+    def senders(self) -> np.ndarray:
+        return self._columns[1, :self.size]
+
+    @property
+    def receivers(self) -> np.ndarray:
+        return self._columns[2, :self.size]
+
+    @property
+    def amounts(self) -> np.ndarray:
+        return self._columns[3, :self.size]
+
+    def intern(self, wallets: Sequence[str]) -> np.ndarray:
+        """Map wallet addresses to dense integer ids, registering new ones"""
+        ids = self.wallet_ids
+        # dict.fromkeys keeps first-seen order, so ids are stable across runs
+        for wallet in dict.fromkeys(wallets):
+            if wallet not in ids:
+                ids[wallet] = len(self.wallets)
+                self.wallets.append(wallet)
+        return np.array([ids[w] for w in wallets], dtype=np.int64)
+
+    def append(self, timestamps: np.ndarray, senders: np.ndarray, receivers: np.ndarray, amounts: np.ndarray):
+        count = timestamps.size
+        if count == 0:
+            return
+        in_order = self.size == 0 or timestamps[0] >= self._columns[0, self.size - 1]
+        end = self.size + count
+        if end > self._columns.shape[1]:
+            columns = np.zeros((4, max(end, 2 * self._columns.shape[1])), dtype=np.int64)
+            columns[:, :self.size] = self._columns[:, :self.size]
+            self._columns = columns
+        self._columns[:, self.size:end] = (timestamps, senders, receivers, amounts)
+        self.size = end
+        if not (in_order and np.all(timestamps[1:] >= timestamps[:-1])):
+            # Late or unsorted batch: restore time order, keeping same-second events stable
+            live = self._columns[:, :end]
+            live[:] = live[:, np.argsort(live[0], kind="stable")]
+
+
+class HolderSnapshotStore:
+    """
+    Transfer history per token, answering time-weighted holdings for a period.
+
+    A wallet's time-weighted holding over [start, end) is its opening balance
+    plus every in-period transfer weighted by the time left in the period:
+
+        weight = T * opening + sum(+/- amount * (end - t))      T = end - start
+
+    Weights are kept in integer fraction-seconds, so they can be split exactly
+    with allocate_cents using total_fractions * T as the total weight.
+    """
+
+    def __init__(self):
+        self._tokens: dict[int, _TokenHistory] = {}
+        self._token_versions: dict[int, int] = {}
+        self.version = 0
+
+    def has_history(self, token_id: int) -> bool:
+        return token_id in self._tokens
+
+    def token_version(self, token_id: int) -> int:
+        """Counter bumped whenever a token's transfer history changes"""
+        return self._token_versions.get(token_id, 0)
+
+    def add_transfers(self, token_id: int, transfers: Iterable[tuple[int, str, str, int]]):
+        """
+        Append (timestamp, from, to, amount) transfer events for a token.
+
+        Mints come from ZERO_ADDRESS and burns go to it.
+        """
+        columns = list(zip(*transfers))
+        if columns:
+            self.add_transfer_columns(token_id, *columns)
+
+    def add_transfer_columns(
+        self,
+        token_id: int,
+        timestamps: Sequence[int],
+        senders: Sequence[str],
+        receivers: Sequence[str],
+        amounts: Sequence[int]
+    ):
+        """Append transfer events given as parallel columns (fast path for bulk loads)"""
+        history = self._tokens.setdefault(token_id, _TokenHistory())
+        history.append(
+            np.asarray(timestamps, dtype=np.int64),
+            history.intern(senders),
+            history.intern(receivers),
+            np.asarray(amounts, dtype=np.int64)
+        )
+        self._token_versions[token_id] = self.token_version(token_id) + 1
+        self.version += 1
+
+    def record_mints(self, token_id: int, holders: list[dict], timestamp: int = 0):
+        """Record static {wallet, fractions} balances as mints at `timestamp`"""
+        self.add_transfers(token_id, ((timestamp, ZERO_ADDRESS, h["wallet"], h["fractions"]) for h in holders))
+
+    def load_csv(self, path: str):
+        """Load transfer events from a CSV with token_id,timestamp,from,to,amount columns"""
+        batches: dict[int, tuple[list, list, list, list]] = {}
+        with open(path, newline="") as f:
+            for row in csv.DictReader(f):
+                columns = batches.get(int(row["token_id"]))
+                if columns is None:
+                    columns = batches[int(row["token_id"])] = ([], [], [], [])
+                columns[0].append(int(row["timestamp"]))
+                columns[1].append(row["from"])
+                columns[2].append(row["to"])
+                columns[3].append(int(row["amount"]))
+        for token_id, columns in batches.items():
+            self.add_transfer_columns(token_id, *columns)
+
+    def time_weighted_holdings(self, token_id: int, period: str) -> tuple[list[str], np.ndarray, int]:
+        """
+        Compute time-weighted holdings for every wallet over a YYYY-MM period.
+
+        Returns:
+            (wallets, weights, period_seconds) where weights are fraction-seconds
+            aligned with wallets; dividing by period_seconds gives the average
+            number of fractions held. Wallets with zero weight are dropped.
+        """
+        history: Optional[_TokenHistory] = self._tokens.get(token_id)
+        if history is None:
+            return [], np.zeros(0, dtype=np.int64), 0
+
+        start, end = period_bounds(period)
+        seconds = end - start
+        opening = int(np.searchsorted(history.timestamps, start, side="left"))
+        closing = int(np.searchsorted(history.timestamps, end, side="left"))
+
+        # Everything before the period counts for the full period; in-period
+        # events count for the time remaining until the period ends
+        contribution = history.amounts[:closing].copy()
+        contribution[:opening] *= seconds
+        contribution[opening:] *= end - history.timestamps[opening:closing]
+
+        weights = np.zeros(len(history.wallets), dtype=np.int64)
+        np.add.at(weights, history.receivers[:closing], contribution)
+        np.subtract.at(weights, history.senders[:closing], contribution)
+        weights[0] = 0  # ZERO_ADDRESS is the mint/burn counterparty, not a holder
+
+        if weights.min() < 0:
+            raise ValueError(f"Transfer history for token {token_id} has negative balances")
+        holder_ids = np.flatnonzero(weights)
+        return [history.wallets[i] for i in holder_ids.tolist()], weights[holder_ids], seconds
@@ -0,0 +1,84 @@
+"""
+Domira Backend - Property Location Index
+Postal-code prefix and neighborhood lookups for property search
+"""
+from typing import Iterable, Optional
+import re
+
+# Dutch postal codes: 4 digits + 2 letters (e.g. 1315 NT)
+_POSTAL_PREFIX_RE = re.compile(r"^\d{1,4}([A-Z]{1,2})?$")
+_POSTAL_CODE_RE = re.compile(r"^\d{4}[A-Z]{2}$")
+
+
+def normalize_postal_code(postal_code: str) -> str:
+    """Strip spaces and uppercase, so '1315 nt' and '1315NT' index alike"""
+    return "".join(postal_code.split()).upper()
+
+
+def normalize_postal_prefix(prefix: str) -> str:
+    """Normalize a postal-code prefix query ('1315', '1315 N', '1315 NT')"""
+    normalized = normalize_postal_code(prefix)
+    if not _POSTAL_PREFIX_RE.match(normalized):
+        raise ValueError(f"Invalid postal code prefix '{prefix}'")
+    return normalized
+
+
+def normalize_neighborhood(neighborhood: str) -> str:
+    """Case- and whitespace-insensitive neighborhood key"""
+    return " ".join(neighborhood.casefold().split())
+
+
+class PropertyLocationIndex:
+    """
+    Inverted indexes from postal-code prefix and neighborhood to property ids.
+    
+    Every prefix of a normalized postal code (1, 13, ..., 1315NT) is indexed on
+    insert, so a prefix query is one dict lookup plus the matching ids rather
+    than a scan of all properties. Posting lists are dicts, keeping ids in
+    insertion order.
+    """
+    
+    def __init__(self):
+        self.postal: dict[str, dict[str, None]] = {}
+        self.neighborhoods: dict[str, dict[str, None]] = {}
+    
+    def add(self, property_id: str, postal_code: Optional[str], neighborhood: Optional[str]):
+        """Index one property by its passport location"""
+        if postal_code:
+            code = normalize_postal_code(postal_code)
+            if _POSTAL_CODE_RE.match(code):
+                for length in range(1, len(code) + 1):
+                    self.postal.setdefault(code[:length], {})[property_id] = None
+        if neighborhood:
+            self.neighborhoods.setdefault(normalize_neighborhood(neighborhood), {})[property_id] = None
+    
+    def match(self, postal_prefix: Optional[str] = None, neighborhood: Optional[str] = None) -> list[str]:
+        """
+        Property ids matching every given filter, in insertion order.
+        
+        Raises:
+            ValueError: If postal_prefix is not a valid postal-code prefix
+        """
+        postings = []
+        if postal_prefix is not None:
+            postings.append(self.postal.get(normalize_postal_prefix(postal_prefix), {}))
+        if neighborhood is not None:
+            postings.append(self.neighborhoods.get(normalize_neighborhood(neighborhood), {}))
+        if not postings:
+            raise ValueError("No location filter given")
+        
+        # Walk the shortest posting list and probe the others
+        postings.sort(key=len)
+        smallest, others = postings[0], postings[1:]
+        return [pid for pid in smallest if all(pid in other for other in others)]
+    
+    def clear(self):
+        """Drop every posting"""
+        self.postal.clear()
+        self.neighborhoods.clear()
+    
+    def add_many(self, records: Iterable[dict]):
+        """Index stored property records that carry a passport"""
+        for record in records:
+            passport = record.get("passport") or {}
+            self.add(record["id"], passport.get("postal_code"), passport.get("neighborhood"))
@@ -0,0 +1,213 @@
+"""
+Domira Backend - Metrics
+In-process counters, gauges and histograms with Prometheus text exposition,
+plus the ASGI timing middleware and external-call timers that feed them
+"""
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Sequence
+import time
+
+# Latency buckets in seconds (Prometheus client defaults plus a sub-ms bucket)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (128, 512, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """Monotonic counter per label set"""
+    
+    kind = "counter"
+    
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.values: dict[tuple, float] = {}
+    
+    def inc(self, labels: tuple = (), amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+    
+    def render(self) -> list[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {value}" for labels, value in self.values.items()]
+
+
+class Gauge(Counter):
+    """Value per label set that can go up and down"""
+    
+    kind = "gauge"
+    
+    def dec(self, labels: tuple = (), amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) - amount
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram per label set.
+    
+    observe() is one bisect plus three increments; buckets are only made
+    cumulative when rendered.
+    """
+    
+    kind = "histogram"
+    
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self.series: dict[tuple, list] = {}  # labels -> [bucket counts (+Inf last), sum, count]
+    
+    def observe(self, labels: tuple, value: float):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+    
+    def render(self) -> list[str]:
+        lines = []
+        for labels, (counts, total, count) in self.series.items():
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += bucket_count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics rendered together in Prometheus text format (0.0.4)"""
+    
+    def __init__(self):
+        self.metrics: dict[str, Counter | Gauge | Histogram] = {}
+    
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+    
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_requests = registry.register(Counter(
+    "domira_http_requests_total", "HTTP requests by route and status", ("method", "route", "status")
+))
+http_latency = registry.register(Histogram(
+    "domira_http_request_duration_seconds", "HTTP request latency by route", ("method", "route")
+))
+http_in_flight = registry.register(Gauge(
+    "domira_http_requests_in_flight", "HTTP requests currently being served"
+))
+http_request_size = registry.register(Histogram(
+    "domira_http_request_size_bytes", "HTTP request body size by route", ("method", "route"), SIZE_BUCKETS
+))
+http_response_size = registry.register(Histogram(
+    "domira_http_response_size_bytes", "HTTP response body size by route", ("method", "route"), SIZE_BUCKETS
+))
+external_latency = registry.register(Histogram(
+    "domira_external_call_duration_seconds", "Latency of blockchain RPC and Stripe calls", ("service", "operation")
+))
+external_errors = registry.register(Counter(
+    "domira_external_call_errors_total", "Failed blockchain RPC and Stripe calls", ("service", "operation")
+))
+
+
+@contextmanager
+def time_external(service: str, operation: str):
+    """Time an outbound call (service is "rpc" or "stripe"), counting failures"""
+    labels = (service, operation)
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        external_errors.inc(labels)
+        raise
+    finally:
+        external_latency.observe(labels, time.perf_counter() - start)
+
+
+def route_template(scope: dict) -> str:
+    """
+    Matched route as a template (/api/v1/properties/{property_id}), rebuilt
+    from the request path and path params so ids do not explode the label set
+    """
+    if "endpoint" not in scope:
+        return "unmatched"
+    params = scope.get("path_params")
+    if not params:
+        return scope["path"]
+    names_by_value: dict[str, list[str]] = {}
+    for name, value in params.items():
+        names_by_value.setdefault(str(value), []).append(name)
+    segments = scope["path"].split("/")
+    for i, segment in enumerate(segments):
+        names = names_by_value.get(segment)
+        if names:
+            segments[i] = "{" + names.pop(0) + "}"
+    return "/".join(segments)
+
+
+class MetricsMiddleware:
+    """Pure ASGI timing middleware (no BaseHTTPMiddleware task overhead)"""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        status = 500
+        request_bytes = 0
+        response_bytes = 0
+        
+        async def counting_receive():
+            nonlocal request_bytes
+            message = await receive()
+            request_bytes += len(message.get("body", b""))
+            return message
+        
+        async def counting_send(message):
+            nonlocal status, response_bytes
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+        
+        http_in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, counting_receive, counting_send)
+        finally:
+            elapsed = time.perf_counter() - start
+            http_in_flight.dec()
+            
+            path = route_template(scope)
+            labels = (scope["method"], path)
+            http_requests.inc((scope["method"], path, str(status)))
+            http_latency.observe(labels, elapsed)
+            http_request_size.observe(labels, request_bytes)
+            http_response_size.observe(labels, response_bytes)
@@ -0,0 +1,193 @@
+"""
+Domira Backend - Primary Offerings
+Subscription collection for a property's primary sale and the allocation run
+at close: pro-rata, largest-remainder, capped per wallet at getMaxHolding
+(subscriptions from users sharing a wallet count against one cap)
+"""
+from datetime import datetime
+from typing import Optional
+import time
+
+import numpy as np
+
+from app.services.distribution import allocate_cents
+
+OPEN = "open"
+CLOSED = "closed"
+
+
+def allocate_pro_rata(requested: np.ndarray, caps: np.ndarray, supply: int) -> np.ndarray:
+    """
+    Allocate `supply` fractions over subscriptions in one vectorized pass.
+    
+    Each request is first clipped to its wallet's remaining cap. If the clipped
+    demand fits, everyone is filled; otherwise supply is split pro-rata by
+    clipped demand with allocate_cents' largest-remainder rounding (ties go to
+    the earlier subscription). A pro-rata share never exceeds the clipped
+    demand, so no wallet ends above its cap and the result sums to `supply`.
+    
+    Args:
+        requested: Fractions requested per subscription
+        caps: Fractions each subscriber may still receive (max holding minus balance)
+        supply: Fractions on offer
+    
+    Returns:
+        int64 array of fractions allocated per subscription
+    """
+    demand = np.minimum(np.asarray(requested, dtype=np.int64), np.maximum(np.asarray(caps, dtype=np.int64), 0))
+    total = int(demand.sum())
+    if total <= supply:
+        return demand
+    return allocate_cents(demand, supply, total)
+
+
+def allocate_by_wallet(requested: np.ndarray, wallet_index: np.ndarray, wallet_caps: np.ndarray, supply: int) -> np.ndarray:
+    """
+    Allocate with getMaxHolding applied per wallet rather than per subscription.
+    
+    Subscriptions sharing a wallet are pooled into one request and the pooled
+    requests are allocated with allocate_pro_rata, so no wallet ends above its
+    cap. A shared wallet's allocation is then split back over its subscriptions
+    pro-rata to their requests (largest remainder, earlier subscription first).
+    
+    Args:
+        requested: Fractions requested per subscription
+        wallet_index: Wallet of each subscription, as an index into wallet_caps
+        wallet_caps: Fractions each wallet may still receive (max holding minus balance)
+        supply: Fractions on offer
+    
+    Returns:
+        int64 array of fractions allocated per subscription
+    """
+    requested = np.asarray(requested, dtype=np.int64)
+    wallet_index = np.asarray(wallet_index, dtype=np.int64)
+    wallet_requested = np.zeros(len(wallet_caps), dtype=np.int64)
+    np.add.at(wallet_requested, wallet_index, requested)
+    wallet_allocated = allocate_pro_rata(wallet_requested, wallet_caps, supply)
+    
+    allocated = wallet_allocated[wallet_index]
+    shared = np.bincount(wallet_index, minlength=len(wallet_caps)) > 1
+    rows = np.flatnonzero(shared[wallet_index])
+    if rows.size:
+        rows = rows[np.argsort(wallet_index[rows], kind="stable")]
+        starts = np.flatnonzero(np.diff(wallet_index[rows], prepend=-1))
+        for members in np.split(rows, starts[1:]):
+            wallet = int(wallet_index[members[0]])
+            allocated[members] = allocate_cents(
+                requested[members], int(wallet_allocated[wallet]), int(wallet_requested[wallet])
+            )
+    return allocated
+
+
+class PrimaryOffering:
+    """
+    One property's offering window.
+    
+    Subscriptions are a user -> fractions dict, so re-subscribing replaces the
+    earlier request but keeps its place in line (the tie-break order).
+    """
+    
+    def __init__(self, property_id: str, fractions: int, price_per_fraction: float, opened_at: datetime):
+        self.property_id = property_id
+        self.fractions = fractions
+        self.price_per_fraction = price_per_fraction
+        self.opened_at = opened_at
+        self.closed_at: Optional[datetime] = None
+        self.status = OPEN
+        self.subscriptions: dict[str, int] = {}
+        self.wallets: dict[str, str] = {}
+        self.allocations: dict[str, int] = {}
+        self.report: Optional[dict] = None
+        # (wallet, fractions) still to mint after close, and the mint transactions sent so far
+        self.mint_pending: list[tuple[str, int]] = []
+        self.mint_tx_hashes: list[str] = []
+        self.minting = False  # a batch is in flight from this worker
+    
+    def subscribe(self, user_id: str, wallet: str, fractions: int):
+        if self.status != OPEN:
+            raise ValueError("Offering is closed")
+        if fractions <= 0:
+            self.subscriptions.pop(user_id, None)
+            self.wallets.pop(user_id, None)
+            return
+        self.subscriptions[user_id] = fractions
+        self.wallets[user_id] = wallet
+    
+    def allocate(self, max_holding: int, held: dict[str, int]) -> tuple[list[str], np.ndarray]:
+        """
+        Run the allocation and close the offering.
+        
+        Args:
+            max_holding: Per-wallet cap (getMaxHolding)
+            held: Fractions each subscribing wallet (lowercase address) already holds
+        
+        Returns:
+            (user_ids, allocated) for subscribers that received fractions
+        """
+        start = time.perf_counter()
+        users = list(self.subscriptions)
+        requested = np.fromiter(self.subscriptions.values(), dtype=np.int64, count=len(users))
+        wallet_ids: dict[str, int] = {}
+        wallet_index = np.fromiter(
+            (wallet_ids.setdefault(self.wallets[user_id].lower(), len(wallet_ids)) for user_id in users),
+            dtype=np.int64,
+            count=len(users)
+        )
+        wallet_caps = np.fromiter(
+            (max_holding - held.get(wallet, 0) for wallet in wallet_ids),
+            dtype=np.int64,
+            count=len(wallet_ids)
+        )
+        allocated = allocate_by_wallet(requested, wallet_index, wallet_caps, self.fractions)
+        
+        winners = np.flatnonzero(allocated)
+        winner_users = [users[i] for i in winners.tolist()]
+        winner_amounts = allocated[winners]
+        self.allocations = dict(zip(winner_users, winner_amounts.tolist()))
+        self.status = CLOSED
+        self.closed_at = datetime.utcnow()
+        
+        wallet_requested = np.zeros(len(wallet_ids), dtype=np.int64)
+        np.add.at(wallet_requested, wallet_index, requested)
+        capped = wallet_requested > wallet_caps
+        subscribed = int(requested.sum())
+        self.report = {
+            "fractions_offered": self.fractions,
+            "fractions_subscribed": subscribed,
+            "fractions_allocated": int(allocated.sum()),
+            "subscribers": len(users),
+            "wallets": len(wallet_ids),
+            "allocated_subscribers": len(winner_users),
+            "capped_subscribers": int(np.count_nonzero(capped[wallet_index])),
+            "capped_wallets": int(np.count_nonzero(capped)),
+            "oversubscription": round(subscribed / self.fractions, 4) if self.fractions else None,
+            "allocation_seconds": time.perf_counter() - start
+        }
+        return winner_users, winner_amounts
+    
+    def record_minted(self, tx_hashes: list[str]):
+        """Mark the first len(tx_hashes) pending mints as sent"""
+        self.mint_tx_hashes.extend(tx_hashes)
+        self.mint_pending = self.mint_pending[len(tx_hashes):]
+    
+    def summary(self) -> dict:
+        summary = {
+            "property_id": self.property_id,
+            "status": self.status,
+            "price_per_fraction": self.price_per_fraction,
+            "opened_at": self.opened_at,
+            "closed_at": self.closed_at,
+            "fractions_offered": self.fractions,
+            "subscribers": len(self.subscriptions),
+            "fractions_subscribed": sum(self.subscriptions.values())
+        }
+        if self.report:
+            summary.update(self.report)
+        if self.status == CLOSED:
+            summary["mint_transactions"] = len(self.mint_tx_hashes)
+            summary["mint_pending"] = len(self.mint_pending)
+        return summary
+
+
+# Offerings by property id (in-memory for MVP)
+offerings: dict[str, PrimaryOffering] = {}
@@ -0,0 +1,211 @@
+"""
+Domira Backend - Portfolio Ledger
+Per-user holdings with running value and yield totals, updated on each fill
+"""
+from typing import Optional
+
+# A single property above this share of portfolio value triggers a warning
+CONCENTRATION_WARNING_PERCENT = 50.0
+
+# Mirrors SPVPropertyToken.MAX_HOLDING_PERCENTAGE / BASIS_POINTS
+MAX_HOLDING_PERCENTAGE = 20
+BASIS_POINTS = 100
+
+
+class PortfolioLedger:
+    """
+    Holdings per user, with aggregates kept up to date on every transfer.
+    
+    Values are tracked in integer cents, and totals are adjusted by the delta
+    of the one holding that changed, so they never drift and a portfolio read
+    never rescans trades. The largest holding is tracked alongside the totals,
+    so the diversification warning needs no extra pass either.
+    
+    The contract caps holdings per wallet, so balances are also kept per
+    (lowercase) wallet address: the sum over every user registered on it.
+    """
+    
+    def __init__(self):
+        self._users: dict[str, dict] = {}
+        self._max_holdings: dict[str, int] = {}
+        self._wallets: dict[str, str] = {}
+        self._wallet_balances: dict[str, dict[str, int]] = {}
+    
+    def _account(self, user_id: str) -> dict:
+        account = self._users.get(user_id)
+        if account is None:
+            account = self._users[user_id] = {
+                "holdings": {},
+                "value_cents": 0,
+                "yield_cents": 0,
+                "largest": None
+            }
+        return account
+    
+    def balance(self, user_id: str, property_id: str) -> int:
+        """Fractions of a property held by a user"""
+        account = self._users.get(user_id)
+        if account is None or property_id not in account["holdings"]:
+            return 0
+        return account["holdings"][property_id]["fractions_held"]
+    
+    def wallet_balance(self, wallet: str, property_id: str) -> int:
+        """Fractions of a property held by every user on a wallet"""
+        return self._wallet_balances.get(wallet.lower(), {}).get(property_id, 0)
+    
+    def set_wallet(self, user_id: str, wallet: Optional[str]):
+        """Register a user's wallet, moving their balances over from the previous one"""
+        wallet = wallet.lower() if wallet else None
+        previous = self._wallets.get(user_id)
+        if wallet == previous:
+            return
+        account = self._users.get(user_id)
+        for property_id, holding in (account["holdings"] if account else {}).items():
+            if previous is not None:
+                self._credit_wallet(previous, property_id, -holding["fractions_held"])
+            if wallet is not None:
+                self._credit_wallet(wallet, property_id, holding["fractions_held"])
+        if wallet is None:
+            self._wallets.pop(user_id, None)
+        else:
+            self._wallets[user_id] = wallet
+    
+    def _credit_wallet(self, wallet: str, property_id: str, change: int):
+        balances = self._wallet_balances.setdefault(wallet, {})
+        fractions = balances.get(property_id, 0) + change
+        if fractions > 0:
+            balances[property_id] = fractions
+        else:
+            balances.pop(property_id, None)
+    
+    def max_holding(self, prop: dict) -> int:
+        """Per-wallet cap for a property, as getMaxHolding computes it on-chain (cached)"""
+        cap = self._max_holdings.get(prop["id"])
+        if cap is None:
+            cap = self._max_holdings[prop["id"]] = prop["total_fractions"] * MAX_HOLDING_PERCENTAGE // BASIS_POINTS
+        return cap
+    
+    def set_max_holding(self, property_id: str, max_holding: int):
+        """Override the cached cap with the value read from the contract"""
+        self._max_holdings[property_id] = max_holding
+    
+    def check_max_holding(self, prop: dict, wallet: str, fractions: int) -> Optional[str]:
+        """
+        Pre-trade mirror of the contract's _checkMaxHolding.
+        
+        Returns None if the wallet may receive `fractions` more of the property,
+        otherwise the reason the transfer would revert.
+        """
+        max_holding = self.max_holding(prop)
+        current = self.wallet_balance(wallet, prop["id"])
+        if current + fractions > max_holding:
+            return (
+                f"Exceeds max holding: wallet holds {current}, buying {fractions}, "
+                f"max {max_holding} ({MAX_HOLDING_PERCENTAGE}% of supply)"
+            )
+        return None
+    
+    def record_transfer(
+        self,
+        prop: dict,
+        from_user: Optional[str],
+        to_user: Optional[str],
+        fractions: int
+    ) -> int:
+        """
+        Apply a transfer of `fractions` of a property between users.
+        
+        Senders the ledger holds no balance for (primary issuance, mock
+        sellers) are not debited. Pass None for an external counterparty.
+        
+        Returns:
+            Fractions actually debited from the sender
+        """
+        if fractions <= 0:
+            raise ValueError("Transfer must move a positive number of fractions")
+        debit = 0
+        if from_user is not None:
+            debit = min(fractions, self.balance(from_user, prop["id"]))
+            if debit:
+                self._adjust(from_user, prop, -debit)
+        if to_user is not None:
+            self._adjust(to_user, prop, fractions)
+        return debit
+    
+    def _adjust(self, user_id: str, prop: dict, change: int):
+        account = self._account(user_id)
+        holdings = account["holdings"]
+        property_id = prop["id"]
+        
+        holding = holdings.get(property_id)
+        old_fractions, old_value, old_yield = (
+            (holding["fractions_held"], holding["value_cents"], holding["yield_cents"]) if holding else (0, 0, 0)
+        )
+        fractions = old_fractions + change
+        
+        if fractions <= 0:
+            holdings.pop(property_id, None)
+            new_value = new_yield = 0
+        else:
+            new_value = round(fractions * prop["price_per_fraction"] * 100)
+            new_yield = round(new_value * prop["expected_yield"] / 1200)
+            holdings[property_id] = {
+                "property_id": property_id,
+                "property_name": prop["name"],
+                "token_id": prop.get("token_id"),
+                "fractions_held": fractions,
+                "total_fractions": prop["total_fractions"],
+                "value_cents": new_value,
+                "yield_cents": new_yield
+            }
+        
+        wallet = self._wallets.get(user_id)
+        if wallet is not None:
+            self._credit_wallet(wallet, property_id, max(fractions, 0) - old_fractions)
+        
+        account["value_cents"] += new_value - old_value
+        account["yield_cents"] += new_yield - old_yield
+        
+        largest = account["largest"]
+        if largest == property_id and new_value < old_value:
+            # The top holding shrank; only this user's holdings need a look
+            account["largest"] = max(holdings, key=lambda pid: holdings[pid]["value_cents"], default=None)
+        elif largest is None or largest not in holdings or new_value > holdings[largest]["value_cents"]:
+            account["largest"] = property_id if property_id in holdings else largest
+    
+    def portfolio(self, user_id: str) -> dict:
+        """Portfolio dict (matching the Portfolio schema) from the running aggregates"""
+        account = self._users.get(user_id) or {"holdings": {}, "value_cents": 0, "yield_cents": 0, "largest": None}
+        
+        warning = None
+        largest = account["largest"]
+        if largest is not None and account["value_cents"] and len(account["holdings"]) > 1:
+            top = account["holdings"][largest]
+            share = top["value_cents"] * 100 / account["value_cents"]
+            if share > CONCENTRATION_WARNING_PERCENT:
+                warning = f"{share:.0f}% of portfolio value is in {top['property_name']}"
+        elif len(account["holdings"]) == 1:
+            warning = "All holdings are in a single property"
+        
+        return {
+            "user_id": user_id,
+            "total_value": account["value_cents"] / 100,
+            "monthly_yield": account["yield_cents"] / 100,
+            "holdings": [
+                {
+                    "property_id": h["property_id"],
+                    "property_name": h["property_name"],
+                    "token_id": h["token_id"],
+                    "fractions_held": h["fractions_held"],
+                    "total_fractions": h["total_fractions"],
+                    "percentage_held": round(h["fractions_held"] * 100 / h["total_fractions"], 4),
+                    "current_value": h["value_cents"] / 100,
+                    "monthly_yield": h["yield_cents"] / 100
+                }
+                for h in account["holdings"].values()
+            ],
+            "diversification_warning": warning
+        }
+
+
+portfolio_ledger = PortfolioLedger()
@@ -0,0 +1,119 @@
+"""
+Domira Backend - On-Demand Request Profiling
+Deterministic cProfile capture of single requests that opt in with the
+X-Profile header, stored for download as text or a .prof file
+
+Only installed when Settings.debug is on, so requests in production pay nothing
+"""
+from io import StringIO
+from typing import Optional
+import cProfile
+import marshal
+import pstats
+import time
+import uuid
+
+from app.services.cache import LRUTTLCache
+from app.services.metrics import route_template
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+SORT_KEYS = ("cumulative", "tottime", "calls")
+
+# Recent captures; each holds the marshalled stats plus request metadata
+profile_store = LRUTTLCache(max_entries=50, ttl_seconds=3600)
+
+_active = False
+
+
+def render_profile(profile: dict, sort: str = "cumulative", limit: int = 40) -> str:
+    """pstats text report for a stored profile"""
+    stream = StringIO()
+    stats = pstats.Stats(_StatsSource(profile["stats"]), stream=stream)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    header = (
+        f"{profile['method']} {profile['path']} -> {profile['status']} "
+        f"in {profile['duration_ms']:.1f} ms (route {profile['route']})\n"
+    )
+    return header + stream.getvalue()
+
+
+class _StatsSource:
+    """Adapter so pstats.Stats can load stats from memory instead of a file"""
+    
+    def __init__(self, stats_bytes: bytes):
+        self.stats = marshal.loads(stats_bytes)
+    
+    def create_stats(self):
+        pass
+
+
+class ProfilingMiddleware:
+    """
+    Profile requests that send `X-Profile: 1`.
+    
+    The response carries X-Profile-Id; the capture is then available from
+    GET /api/v1/debug/profiles/{id}. cProfile hooks the whole thread, so other
+    requests running concurrently on the event loop show up in the profile too,
+    and only one request is profiled at a time (others are served normally).
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        global _active
+        if scope["type"] != "http" or _active or not _wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+        
+        profile_id = uuid.uuid4().hex[:16]
+        status = 500
+        
+        async def tagging_send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = [*message.get("headers", []), (PROFILE_ID_HEADER, profile_id.encode())]
+            await send(message)
+        
+        _active = True
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, tagging_send)
+        finally:
+            profiler.disable()
+            duration = time.perf_counter() - start
+            _active = False
+            profiler.create_stats()
+            profile_store.set(profile_id, {
+                "id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"] + (f"?{scope['query_string'].decode()}" if scope.get("query_string") else ""),
+                "route": route_template(scope),
+                "status": status,
+                "duration_ms": duration * 1000,
+                "captured_at": time.time(),
+                "stats": marshal.dumps(profiler.stats)
+            })
+
+
+def _wants_profile(scope) -> bool:
+    for name, value in scope["headers"]:
+        if name == PROFILE_HEADER:
+            return value not in (b"", b"0", b"false")
+    return False
+
+
+def get_profile(profile_id: str) -> Optional[dict]:
+    return profile_store.get(profile_id)
+
+
+def list_profiles() -> list[dict]:
+    """Metadata of stored captures, newest first"""
+    return [
+        {key: value for key, value in profile.items() if key != "stats"}
+        for profile in sorted(profile_store.values(), key=lambda p: p["captured_at"], reverse=True)
+    ]
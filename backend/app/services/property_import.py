@@ -0,0 +1,139 @@
+"""
+Domira Backend - Bulk Property Import
+Streams CSV/JSONL PropertyCreate rows through chunked validation, concurrent
+passport enrichment and bulk insertion, collecting per-row errors
+"""
+from datetime import datetime
+from typing import AsyncIterator, Callable
+import asyncio
+import csv
+import json
+
+from pydantic import ValidationError
+
+from app.models.schemas import PropertyCreate, PropertyPassport
+from app.services.registry_providers import fetch_property_passport
+
+DEFAULT_CHUNK_SIZE = 1000
+DEFAULT_CONCURRENCY = 32
+
+
+async def iter_text_lines(chunks: AsyncIterator[bytes], encoding: str = "utf-8") -> AsyncIterator[str]:
+    """Split a stream of byte chunks into text lines without buffering the whole body"""
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line.decode(encoding).rstrip("\r")
+    if pending:
+        yield pending.decode(encoding).rstrip("\r")
+
+
+async def iter_records(lines: AsyncIterator[str], fmt: str) -> AsyncIterator[tuple[int, object]]:
+    """
+    Yield (row_number, dict) per record, or (row_number, error message) for rows
+    that cannot be parsed. CSV records may span lines inside quoted fields.
+    """
+    if fmt == "jsonl":
+        row_number = 0
+        async for line in lines:
+            if not line.strip():
+                continue
+            row_number += 1
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield row_number, f"Invalid JSON: {e}"
+                continue
+            yield row_number, record if isinstance(record, dict) else "Row is not a JSON object"
+        return
+
+    if fmt != "csv":
+        raise ValueError(f"Unsupported import format '{fmt}'")
+
+    header = None
+    row_number = 0
+    pending = ""
+    async for line in lines:
+        pending = f"{pending}\n{line}" if pending else line
+        if pending.count('"') % 2:
+            continue  # inside a quoted field that continues on the next line
+        record, pending = pending, ""
+        if not record.strip():
+            continue
+        values = next(csv.reader([record]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        row_number += 1
+        if len(values) != len(header):
+            yield row_number, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        yield row_number, {k: v for k, v in zip(header, values) if v != ""}
+    if pending:
+        yield row_number + 1, "Unterminated quoted field"
+
+
+def _format_validation_error(e: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors())
+
+
+async def _enrich(rows: list[PropertyCreate], concurrency: asyncio.Semaphore) -> list:
+    """Fetch passports for a chunk with bounded parallelism"""
+    async def one(data: PropertyCreate):
+        async with concurrency:
+            return await fetch_property_passport(address=data.address, city=data.city)
+
+    return await asyncio.gather(*(one(data) for data in rows), return_exceptions=True)
+
+
+async def import_properties(
+    lines: AsyncIterator[str],
+    fmt: str,
+    insert: Callable[[list[tuple[PropertyCreate, PropertyPassport]], datetime], list[str]],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    concurrency: int = DEFAULT_CONCURRENCY
+) -> dict:
+    """
+    Import PropertyCreate rows from CSV or JSONL lines.
+
+    Rows are validated and enriched chunk by chunk, so memory stays bounded by
+    chunk_size. Each valid, enriched chunk is passed to insert() in one call.
+
+    Returns:
+        {"imported", "failed", "property_ids", "errors": [{"row", "error"}]}
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    result = {"imported": 0, "failed": 0, "property_ids": [], "errors": []}
+
+    async def flush(chunk: list[tuple[int, PropertyCreate]]):
+        passports = await _enrich([data for _, data in chunk], semaphore)
+        rows = []
+        for (row_number, data), passport in zip(chunk, passports):
+            if isinstance(passport, Exception):
+                result["errors"].append({"row": row_number, "error": f"Passport lookup failed: {passport}"})
+            else:
+                rows.append((data, passport))
+        ids = insert(rows, datetime.utcnow()) if rows else []
+        result["property_ids"].extend(ids)
+
+    chunk: list[tuple[int, PropertyCreate]] = []
+    async for row_number, record in iter_records(lines, fmt):
+        if isinstance(record, str):
+            result["errors"].append({"row": row_number, "error": record})
+            continue
+        try:
+            chunk.append((row_number, PropertyCreate.model_validate(record)))
+        except ValidationError as e:
+            result["errors"].append({"row": row_number, "error": _format_validation_error(e)})
+            continue
+        if len(chunk) >= chunk_size:
+            await flush(chunk)
+            chunk = []
+    if chunk:
+        await flush(chunk)
+
+    result["imported"] = len(result["property_ids"])
+    result["failed"] = len(result["errors"])
+    return result
@@ -2,8 +2,15 @@
 Domira Backend - Property Passport Service
 Mocks Dutch property data from Kadaster, BAG, and PDOK
 """
+from typing import Optional
 from app.models.schemas import PropertyPassport
+from app.services.cache import LRUTTLCache
+import hashlib
 import random
+import re
+import time
+
+import numpy as np
 
 
 # Mock Almere addresses for demo
@@ -22,78 +29,188 @@ BUILDING_TYPES = ["apartment", "townhouse", "detached", "semi-detached", "studio
 ENERGY_LABELS = ["A++", "A+", "A", "B", "C", "D", "E", "F", "G"]
 USAGE_PURPOSES = ["residential", "mixed-use", "commercial"]
 
+BASE_PRICE_PER_SQM = 4500  # EUR per m² in Almere
+ENERGY_MULTIPLIERS = {
+    "A++": 1.15, "A+": 1.12, "A": 1.10, "B": 1.05,
+    "C": 1.00, "D": 0.95, "E": 0.90, "F": 0.85, "G": 0.80
+}
+
+# Latest published WOZ year; valuations use the age of the building in the year after
+_woz_year = 2025
+
+# Passports are deterministic per address, so they can be served from memory
+passport_cache = LRUTTLCache(max_entries=10_000, ttl_seconds=24 * 3600)
+
+_NON_WORD = re.compile(r"[^\w]+")
+
 
-def generate_cadastral_number() -> str:
+def normalize_passport_key(address: str, postal_code: str = None, city: str = "Almere") -> tuple[str, str, str]:
+    """Normalize (address, postal_code, city) so formatting differences map to one passport"""
+    return (
+        " ".join(_NON_WORD.sub(" ", address.casefold()).split()),
+        (postal_code or "").replace(" ", "").upper(),
+        " ".join(city.casefold().split())
+    )
+
+
+def generate_cadastral_number(rng: random.Random = random) -> str:
     """Generate a mock Dutch cadastral number (Kadastrale aanduiding)"""
-    section = random.choice(["A", "B", "C", "D", "E"])
-    plot = random.randint(1000, 9999)
+    section = rng.choice(["A", "B", "C", "D", "E"])
+    plot = rng.randint(1000, 9999)
     return f"ALM-{section}-{plot}"
 
 
-def calculate_woz_value(floor_area: float, energy_label: str, building_year: int) -> float:
+def get_woz_year() -> int:
+    """WOZ year stamped on newly generated passports"""
+    return _woz_year
+
+
+def calculate_woz_value(floor_area: float, energy_label: str, building_year: int, current_year: int = 2026) -> float:
     """Calculate mock WOZ value based on property characteristics"""
-    base_price_per_sqm = 4500  # EUR per m² in Almere
-    
-    # Energy label multiplier
-    energy_multipliers = {
-        "A++": 1.15, "A+": 1.12, "A": 1.10, "B": 1.05,
-        "C": 1.00, "D": 0.95, "E": 0.90, "F": 0.85, "G": 0.80
-    }
-    
     # Age factor (newer = higher value)
-    current_year = 2026
     age = current_year - building_year
     age_factor = max(0.7, 1 - (age * 0.005))  # 0.5% decrease per year, min 70%
     
-    woz = floor_area * base_price_per_sqm * energy_multipliers.get(energy_label, 1.0) * age_factor
+    woz = floor_area * BASE_PRICE_PER_SQM * ENERGY_MULTIPLIERS.get(energy_label, 1.0) * age_factor
     return round(woz, 2)
 
 
+def calculate_woz_values(
+    floor_areas: np.ndarray,
+    energy_labels: list[str],
+    building_years: np.ndarray,
+    current_year: int
+) -> np.ndarray:
+    """Vectorized calculate_woz_value over aligned property columns"""
+    multiplier_of = {label: i for i, label in enumerate(ENERGY_MULTIPLIERS)}
+    # Unknown labels map to the trailing 1.0 multiplier, like the scalar .get default
+    multipliers = np.array([*ENERGY_MULTIPLIERS.values(), 1.0])
+    label_idx = np.fromiter(
+        (multiplier_of.get(label, len(multiplier_of)) for label in energy_labels),
+        dtype=np.intp,
+        count=len(energy_labels)
+    )
+    
+    age = current_year - np.asarray(building_years, dtype=np.int64)
+    age_factor = np.maximum(0.7, 1 - age * 0.005)
+    woz = np.asarray(floor_areas, dtype=np.float64) * BASE_PRICE_PER_SQM * multipliers[label_idx] * age_factor
+    return np.round(woz, 2)
+
+
+def revalue_passports(passports: list[dict], woz_year: int, current_year: Optional[int] = None) -> dict:
+    """
+    Revalue stored passport dicts in place for a newly published WOZ year.
+    
+    Columns are pulled out once, valued in a single NumPy pass and written
+    back with one update per passport. Cached passports are dropped so new
+    lookups pick up the new year.
+    
+    Returns:
+        Count and per-stage timings in seconds
+    """
+    global _woz_year
+    current_year = woz_year + 1 if current_year is None else current_year
+    
+    start = time.perf_counter()
+    count = len(passports)
+    floor_areas = np.fromiter((p["floor_area"] for p in passports), dtype=np.float64, count=count)
+    building_years = np.fromiter((p["building_year"] for p in passports), dtype=np.int64, count=count)
+    energy_labels = [p["energy_label"] for p in passports]
+    extracted = time.perf_counter()
+    
+    values = calculate_woz_values(floor_areas, energy_labels, building_years, current_year)
+    computed = time.perf_counter()
+    
+    for passport, value in zip(passports, values.tolist()):
+        passport["woz_value"] = value
+        passport["woz_year"] = woz_year
+    written = time.perf_counter()
+    
+    _woz_year = woz_year
+    passport_cache.clear()
+    
+    return {
+        "revalued": count,
+        "woz_year": woz_year,
+        "total_woz_value": round(float(values.sum()), 2),
+        "timings": {
+            "extract_seconds": extracted - start,
+            "compute_seconds": computed - extracted,
+            "write_seconds": written - computed
+        }
+    }
+
+
 def generate_property_passport(
     address: str,
     postal_code: str = None,
     city: str = "Almere"
 ) -> PropertyPassport:
     """
-    Generate a mock Property Passport with data simulating:
+    Get the Property Passport for an address, simulating:
     - Kadaster: Ownership and cadastral data
     - BAG: Building address and usage data
     - PDOK: Energy labels and WOZ valuation
+    
+    The mock data is seeded from the normalized address, so repeated lookups
+    agree and known addresses are answered from passport_cache.
     """
-    # Pick a random Almere address if not specific enough
-    mock_addr = random.choice(ALMERE_ADDRESSES)
+    key = normalize_passport_key(address, postal_code, city)
+    passport = passport_cache.get(key)
+    if passport is None:
+        passport = _build_property_passport(key, address, postal_code, city)
+        passport_cache.set(key, passport)
+    elif passport.address != address:
+        passport = passport.model_copy(update={"address": address})
+    return passport
+
+
+def _build_property_passport(
+    key: tuple[str, str, str],
+    address: str,
+    postal_code: str = None,
+    city: str = "Almere"
+) -> PropertyPassport:
+    """Generate mock passport data from a random generator seeded by the address key"""
+    seed = hashlib.sha256("|".join(key).encode()).digest()
+    rng = random.Random(int.from_bytes(seed[:8], "big"))
+    
+    # Pick a mock Almere address if not specific enough
+    mock_addr = rng.choice(ALMERE_ADDRESSES)
     
     if not postal_code:
         postal_code = mock_addr["postal"]
     
     # Generate property characteristics
-    building_year = random.randint(1980, 2024)
-    floor_area = random.uniform(45, 180)
-    building_type = random.choice(BUILDING_TYPES)
-    energy_label = random.choice(ENERGY_LABELS[:4])  # Almere tends to have newer buildings
+    building_year = rng.randint(1980, 2024)
+    floor_area = rng.uniform(45, 180)
+    building_type = rng.choice(BUILDING_TYPES)
+    energy_label = rng.choice(ENERGY_LABELS[:4])  # Almere tends to have newer buildings
     
     # Calculate WOZ
-    woz_value = calculate_woz_value(floor_area, energy_label, building_year)
+    woz_year = get_woz_year()
+    woz_value = calculate_woz_value(floor_area, energy_label, building_year, current_year=woz_year + 1)
     
     return PropertyPassport(
         # Kadaster data
-        cadastral_number=generate_cadastral_number(),
+        cadastral_number=generate_cadastral_number(rng),
         ownership_status="Eigendom",
-        mortgage_info=random.choice([None, "ABN AMRO Bank N.V.", "ING Bank N.V.", "Rabobank"]),
+        mortgage_info=rng.choice([None, "ABN AMRO Bank N.V.", "ING Bank N.V.", "Rabobank"]),
         
         # BAG data
         address=address,
         postal_code=postal_code,
         city=city,
+        neighborhood=mock_addr["neighborhood"],
         building_year=building_year,
         floor_area=round(floor_area, 1),
         building_type=building_type,
-        usage_purpose=random.choice(USAGE_PURPOSES),
+        usage_purpose=rng.choice(USAGE_PURPOSES),
         
         # PDOK data
         energy_label=energy_label,
         woz_value=woz_value,
-        woz_year=2025
+        woz_year=woz_year
     )
 
 
@@ -0,0 +1,189 @@
+"""
+Domira Backend - Admission Control
+Token-bucket rate limits per client and per route, and concurrency caps on the
+routes that call the blockchain RPC or Stripe, so write storms are shed with a
+429 instead of exhausting upstream quotas or slowing down the read paths
+
+Limits are kept per worker process; with N workers the effective limit is N
+times the configured one.
+"""
+from collections import OrderedDict
+from math import ceil
+from typing import Optional
+import time
+
+from fastapi import HTTPException, Request, status
+
+from app.config import get_settings
+from app.services.metrics import Counter, Gauge, registry
+
+settings = get_settings()
+
+rate_limited = registry.register(Counter(
+    "domira_rate_limited_total", "Requests rejected by admission control", ("route", "reason")
+))
+slots_in_use = registry.register(Gauge(
+    "domira_external_slots_in_use", "Requests holding an RPC/Stripe concurrency slot", ("pool",)
+))
+
+
+class TokenBucket:
+    """`rate` tokens per second up to `capacity` (the burst); starts full"""
+    
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+    
+    def __init__(self, rate: float, capacity: int, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = now
+    
+    def take(self, now: float) -> float:
+        """Take one token; returns 0 when admitted, otherwise seconds until one is available"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+    
+    def refund(self):
+        """Give back a token taken for a request that was rejected further on"""
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+
+class ConcurrencyLimit:
+    """
+    Cap on requests in flight against one upstream (RPC node, Stripe).
+    
+    Full pools reject immediately rather than queueing: a queued request still
+    holds a connection and a worker slot, which is the latency we want to
+    keep away from the read paths.
+    """
+    
+    def __init__(self, pool: str, limit: int):
+        self.pool = pool
+        self.limit = limit
+        self.in_use = 0
+    
+    def try_acquire(self) -> bool:
+        if self.in_use >= self.limit:
+            return False
+        self.in_use += 1
+        slots_in_use.inc((self.pool,))
+        return True
+    
+    def release(self):
+        self.in_use -= 1
+        slots_in_use.dec((self.pool,))
+
+
+rpc_slots = ConcurrencyLimit("rpc", settings.rpc_max_concurrency)
+stripe_slots = ConcurrencyLimit("stripe", settings.stripe_max_concurrency)
+
+
+def too_many_requests(route: str, reason: str, retry_after: float) -> HTTPException:
+    rate_limited.inc((route, reason))
+    seconds = max(1, ceil(retry_after))
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=f"Too many requests ({reason}), retry in {seconds}s",
+        headers={"Retry-After": str(seconds)}
+    )
+
+
+def client_key(request: Request, hops: Optional[int] = None) -> str:
+    """
+    Client address the rate limits are keyed on.
+    
+    Behind `trusted_proxy_hops` proxies the socket peer is the last proxy, so
+    the key is the X-Forwarded-For entry the outermost trusted proxy appended.
+    Entries to the left of it are client-supplied and never used; a request
+    that did not come through all the proxies falls back to its peer address.
+    """
+    hops = settings.trusted_proxy_hops if hops is None else hops
+    if hops > 0:
+        forwarded = [
+            host.strip()
+            for header in request.headers.getlist("x-forwarded-for")
+            for host in header.split(",")
+        ]
+        if len(forwarded) >= hops and forwarded[-hops]:
+            return forwarded[-hops]
+    return request.client.host if request.client else "unknown"
+
+
+class RateLimit:
+    """
+    Admission control for one route, used as a route dependency:
+    
+        @router.post("/buy", dependencies=[Depends(buy_limit)])
+    
+    A request must get a token from its client's bucket and from the route's
+    shared bucket, then a slot from the route's upstream pool if it has one.
+    Per-client buckets are kept in an LRU bounded by max_clients; an evicted
+    client simply starts again with a full bucket.
+    """
+    
+    def __init__(
+        self,
+        route: str,
+        client_rate: Optional[float] = None,
+        client_burst: Optional[int] = None,
+        route_rate: Optional[float] = None,
+        route_burst: Optional[int] = None,
+        slots: Optional[ConcurrencyLimit] = None,
+        per_client: bool = True,
+        max_clients: int = 10_000
+    ):
+        self.route = route
+        self.client_rate = client_rate or settings.write_rate_per_client
+        self.client_burst = client_burst or settings.write_burst_per_client
+        self.per_client = per_client
+        self.route_bucket = TokenBucket(
+            route_rate or settings.write_rate_per_route,
+            route_burst or settings.write_burst_per_route,
+            time.monotonic()
+        )
+        self.slots = slots
+        self.max_clients = max_clients
+        self._clients: OrderedDict[str, TokenBucket] = OrderedDict()
+    
+    def _client_bucket(self, client: str, now: float) -> TokenBucket:
+        bucket = self._clients.get(client)
+        if bucket is None:
+            bucket = self._clients[client] = TokenBucket(self.client_rate, self.client_burst, now)
+            if len(self._clients) > self.max_clients:
+                self._clients.popitem(last=False)
+        else:
+            self._clients.move_to_end(client)
+        return bucket
+    
+    def admit(self, client: str, now: Optional[float] = None):
+        """Take the client and route tokens, raising 429 when either bucket is empty"""
+        now = time.monotonic() if now is None else now
+        client_bucket = self._client_bucket(client, now) if self.per_client else None
+        if client_bucket is not None:
+            wait = client_bucket.take(now)
+            if wait:
+                raise too_many_requests(self.route, "client_rate", wait)
+        wait = self.route_bucket.take(now)
+        if wait:
+            if client_bucket is not None:
+                client_bucket.refund()
+            raise too_many_requests(self.route, "route_rate", wait)
+    
+    async def __call__(self, request: Request):
+        if not settings.rate_limit_enabled:
+            yield
+            return
+        self.admit(client_key(request))
+        if self.slots is None:
+            yield
+            return
+        if not self.slots.try_acquire():
+            raise too_many_requests(self.route, f"{self.slots.pool}_concurrency", 1)
+        try:
+            yield
+        finally:
+            self.slots.release()
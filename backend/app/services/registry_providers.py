@@ -0,0 +1,180 @@
+"""
+Domira Backend - Dutch Registry Providers
+Concurrent Kadaster/BAG/PDOK lookups over one shared HTTP client, with
+per-source timeouts and mock fallbacks for sources that fail, time out or
+return invalid data
+"""
+from typing import Optional
+import asyncio
+import logging
+
+import httpx
+from pydantic import ValidationError
+
+from app.config import get_settings
+from app.models.schemas import PropertyPassport
+from app.services.cache import LRUTTLCache
+from app.services.property_passport import generate_property_passport, normalize_passport_key
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Passports fully answered by the registries; partial results are never cached
+registry_passport_cache = LRUTTLCache(max_entries=10_000, ttl_seconds=24 * 3600)
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Shared connection pool for all registry requests"""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.registry_max_connections,
+                max_keepalive_connections=settings.registry_max_connections
+            )
+        )
+    return _http_client
+
+
+async def close_http_client():
+    """Close the shared pool (application shutdown)"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+class RegistryProvider:
+    """
+    One passport data source.
+
+    Subclasses declare the PropertyPassport fields they own; the default fetch
+    GETs base_url with the address as query parameters and reads those fields
+    from the JSON body. Override params()/parse() for a different wire format.
+    """
+
+    name: str = ""
+    fields: tuple[str, ...] = ()
+
+    def __init__(self, base_url: str, timeout: float):
+        self.base_url = base_url
+        self.timeout = timeout
+
+    def params(self, address: str, postal_code: Optional[str], city: str) -> dict:
+        params = {"address": address, "city": city}
+        if postal_code:
+            params["postal_code"] = postal_code
+        return params
+
+    def parse(self, data: dict) -> dict:
+        return {field: data[field] for field in self.fields if field in data}
+
+    async def fetch(self, client: httpx.AsyncClient, address: str, postal_code: Optional[str], city: str) -> dict:
+        response = await client.get(
+            self.base_url,
+            params=self.params(address, postal_code, city),
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return self.parse(response.json())
+
+
+class KadasterProvider(RegistryProvider):
+    """Kadaster: ownership and cadastral data"""
+    name = "kadaster"
+    fields = ("cadastral_number", "ownership_status", "mortgage_info")
+
+
+class BAGProvider(RegistryProvider):
+    """BAG: building address and usage data"""
+    name = "bag"
+    fields = ("postal_code", "city", "neighborhood", "building_year", "floor_area", "building_type", "usage_purpose")
+
+
+class PDOKProvider(RegistryProvider):
+    """PDOK: energy label and WOZ valuation"""
+    name = "pdok"
+    fields = ("energy_label", "woz_value", "woz_year")
+
+
+def get_providers() -> list[RegistryProvider]:
+    """Providers with a configured base URL; unconfigured sources use mock data"""
+    configured = [
+        (KadasterProvider, settings.kadaster_api_url, settings.kadaster_timeout),
+        (BAGProvider, settings.bag_api_url, settings.bag_timeout),
+        (PDOKProvider, settings.pdok_api_url, settings.pdok_timeout),
+    ]
+    return [cls(url, timeout) for cls, url, timeout in configured if url]
+
+
+async def _fetch_or_fallback(
+    provider: RegistryProvider,
+    client: httpx.AsyncClient,
+    address: str,
+    postal_code: Optional[str],
+    city: str,
+    fallback: dict
+) -> Optional[dict]:
+    """
+    Run one provider under its timeout; None means use the fallback fields.
+
+    The source's fields are checked against the PropertyPassport types (over
+    the fallback passport, so only its own fields can fail) and returned
+    coerced; a source answering with wrong types is treated as failed.
+    """
+    try:
+        result = await asyncio.wait_for(provider.fetch(client, address, postal_code, city), provider.timeout)
+    except asyncio.TimeoutError:
+        logger.warning(f"{provider.name} lookup timed out after {provider.timeout}s for {address}")
+        return None
+    except (httpx.HTTPError, ValueError, TypeError) as e:
+        logger.warning(f"{provider.name} lookup failed for {address}: {e}")
+        return None
+
+    try:
+        passport = PropertyPassport(**{**fallback, **result})
+    except ValidationError as e:
+        invalid = ", ".join(".".join(str(part) for part in error["loc"]) for error in e.errors())
+        logger.warning(f"{provider.name} returned invalid fields for {address}: {invalid}")
+        return None
+    return {field: getattr(passport, field) for field in result}
+
+
+async def fetch_property_passport(
+    address: str,
+    postal_code: str = None,
+    city: str = "Almere",
+    providers: Optional[list[RegistryProvider]] = None
+) -> PropertyPassport:
+    """
+    Build a Property Passport from Kadaster, BAG and PDOK concurrently.
+
+    Total latency is the slowest source (bounded by its timeout), not the sum.
+    Sources that fail, time out or return invalid fields fall back to the
+    deterministic mock fields.
+    """
+    providers = get_providers() if providers is None else providers
+    if not providers:
+        return generate_property_passport(address, postal_code, city)
+
+    key = normalize_passport_key(address, postal_code, city)
+    cached = registry_passport_cache.get(key)
+    if cached is not None:
+        return cached
+
+    client = get_http_client()
+    merged = generate_property_passport(address, postal_code, city).model_dump()
+    results = await asyncio.gather(*(
+        _fetch_or_fallback(provider, client, address, postal_code, city, merged) for provider in providers
+    ))
+
+    for result in results:
+        if result:
+            merged.update(result)
+    passport = PropertyPassport(**merged)
+
+    if all(result is not None for result in results):
+        registry_passport_cache.set(key, passport)
+    return passport
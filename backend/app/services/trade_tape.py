@@ -0,0 +1,171 @@
+"""
+Domira Backend - Trade Tape
+Append-only record of secondary-market fills with rolling per-property
+last price, VWAP and 1h/24h/7d OHLC candles
+"""
+from datetime import datetime, timezone
+from typing import Optional
+import time
+
+# (window name, bucket seconds, bucket count): each window is a ring of sub-candles
+WINDOWS = (
+    ("1h", 60, 60),
+    ("24h", 15 * 60, 96),
+    ("7d", 3600, 168),
+)
+
+# Bucket slots
+_BUCKET, _OPEN, _HIGH, _LOW, _CLOSE, _VOLUME, _NOTIONAL, _TRADES = range(8)
+
+
+class CandleRing:
+    """
+    Fixed ring of sub-candles covering one rolling window.
+    
+    A fill lands in the slot for its bucket number (overwriting a slot left
+    over from a previous lap), so updates are O(1). Reading the window merges
+    at most `size` buckets, however many trades there were. The window
+    is bucket-aligned: it covers the current bucket plus the size - 1
+    before it.
+    """
+    
+    def __init__(self, bucket_seconds: int, size: int):
+        self.bucket_seconds = bucket_seconds
+        self.size = size
+        self.slots: list[Optional[list]] = [None] * size
+    
+    def add(self, timestamp: float, price: float, fractions: int):
+        bucket = int(timestamp // self.bucket_seconds)
+        i = bucket % self.size
+        slot = self.slots[i]
+        if slot is None or slot[_BUCKET] != bucket:
+            self.slots[i] = [bucket, price, price, price, price, fractions, price * fractions, 1]
+            return
+        if price > slot[_HIGH]:
+            slot[_HIGH] = price
+        if price < slot[_LOW]:
+            slot[_LOW] = price
+        slot[_CLOSE] = price
+        slot[_VOLUME] += fractions
+        slot[_NOTIONAL] += price * fractions
+        slot[_TRADES] += 1
+    
+    def candle(self, now: float) -> Optional[dict]:
+        """OHLC, volume and VWAP over the window ending at `now`, or None without trades"""
+        current = int(now // self.bucket_seconds)
+        merged = None
+        for bucket in range(current - self.size + 1, current + 1):
+            slot = self.slots[bucket % self.size]
+            if slot is None or slot[_BUCKET] != bucket:
+                continue
+            if merged is None:
+                merged = list(slot)
+                continue
+            merged[_HIGH] = max(merged[_HIGH], slot[_HIGH])
+            merged[_LOW] = min(merged[_LOW], slot[_LOW])
+            merged[_CLOSE] = slot[_CLOSE]
+            merged[_VOLUME] += slot[_VOLUME]
+            merged[_NOTIONAL] += slot[_NOTIONAL]
+            merged[_TRADES] += slot[_TRADES]
+        if merged is None:
+            return None
+        return {
+            "open": merged[_OPEN],
+            "high": merged[_HIGH],
+            "low": merged[_LOW],
+            "close": merged[_CLOSE],
+            "volume": merged[_VOLUME],
+            "vwap": round(merged[_NOTIONAL] / merged[_VOLUME], 4),
+            "trades": merged[_TRADES]
+        }
+
+
+class PropertyTradeStats:
+    """Running aggregates for one property's fills"""
+    
+    def __init__(self):
+        self.trade_count = 0
+        self.volume = 0
+        self.notional = 0.0
+        self.last_price: Optional[float] = None
+        self.last_trade_at: Optional[float] = None
+        self.rings = {name: CandleRing(seconds, size) for name, seconds, size in WINDOWS}
+    
+    def add(self, timestamp: float, price: float, fractions: int):
+        self.trade_count += 1
+        self.volume += fractions
+        self.notional += price * fractions
+        self.last_price = price
+        self.last_trade_at = timestamp
+        for ring in self.rings.values():
+            ring.add(timestamp, price, fractions)
+
+
+class TradeTape:
+    """
+    Append-only fill log plus per-property rolling statistics.
+    
+    Every fill is appended to the tape and folded into its property's
+    aggregates in the same call; stats are read from the aggregates only.
+    """
+    
+    def __init__(self):
+        self.trades: list[dict] = []
+        self._stats: dict[str, PropertyTradeStats] = {}
+    
+    def record(
+        self,
+        property_id: str,
+        price_per_fraction: float,
+        fractions: int,
+        listing_id: Optional[str] = None,
+        buyer_id: Optional[str] = None,
+        seller_id: Optional[str] = None,
+        timestamp: Optional[float] = None
+    ) -> dict:
+        """Append a fill and update the property's aggregates"""
+        timestamp = time.time() if timestamp is None else timestamp
+        trade = {
+            "sequence": len(self.trades),
+            "property_id": property_id,
+            "listing_id": listing_id,
+            "buyer_id": buyer_id,
+            "seller_id": seller_id,
+            "price_per_fraction": price_per_fraction,
+            "fractions": fractions,
+            "timestamp": timestamp
+        }
+        self.trades.append(trade)
+        
+        stats = self._stats.get(property_id)
+        if stats is None:
+            stats = self._stats[property_id] = PropertyTradeStats()
+        stats.add(timestamp, price_per_fraction, fractions)
+        return trade
+    
+    def stats(self, property_id: str, now: Optional[float] = None) -> dict:
+        """Last price, all-time VWAP and rolling window candles for a property"""
+        now = time.time() if now is None else now
+        stats = self._stats.get(property_id)
+        if stats is None:
+            return {
+                "property_id": property_id,
+                "trade_count": 0,
+                "volume": 0,
+                "last_price": None,
+                "last_trade_at": None,
+                "vwap": None,
+                "windows": {name: None for name, _, _ in WINDOWS}
+            }
+        return {
+            "property_id": property_id,
+            "trade_count": stats.trade_count,
+            "volume": stats.volume,
+            "last_price": stats.last_price,
+            "last_trade_at": datetime.fromtimestamp(stats.last_trade_at, tz=timezone.utc).isoformat(),
+            "vwap": round(stats.notional / stats.volume, 4),
+            "windows": {name: ring.candle(now) for name, ring in stats.rings.items()}
+        }
+
+
+trade_tape = TradeTape()
@@ -0,0 +1,206 @@
+"""
+Domira Backend - Bulk User Onboarding
+Streams a JSON array of UserCreate rows through chunked validation, email and
+wallet de-duplication and bulk insertion, collecting per-row errors
+"""
+from datetime import datetime
+from typing import AsyncIterator, Callable, Iterable, Optional
+import codecs
+import json
+import os
+
+from pydantic import ValidationError
+
+from app.models.schemas import UserCreate
+from app.services.property_import import _format_validation_error
+
+DEFAULT_CHUNK_SIZE = 5000
+MAX_ROW_CHARS = 1 << 20  # larger elements are treated as malformed instead of buffered
+
+_WHITESPACE = " \t\n\r"
+_VARIANT = "89ab" * 4  # RFC 4122 variant nibble for each random nibble value
+
+
+def uuid4_strings(count: int) -> list[str]:
+    """
+    `count` random version-4 UUID strings, formatted like str(uuid.uuid4()).
+    
+    One os.urandom call and string slicing per id, instead of building a UUID
+    object per user.
+    """
+    h = os.urandom(16 * count).hex()
+    return [
+        f"{h[i:i + 8]}-{h[i + 8:i + 12]}-4{h[i + 13:i + 16]}-{_VARIANT[int(h[i + 16], 16)]}{h[i + 17:i + 20]}-{h[i + 20:i + 32]}"
+        for i in range(0, 32 * count, 32)
+    ]
+
+
+async def iter_json_array(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, object]]:
+    """
+    Yield (row_number, dict) for each element of a streamed top-level JSON array,
+    or (row_number, error message) for elements that are not objects.
+    
+    Elements are decoded as soon as they are complete, so memory is bounded by
+    the largest element rather than the body. A syntax error inside the array
+    yields an error for that row and ends the stream, since the parser cannot
+    find the next element boundary.
+    
+    Raises:
+        ValueError: The body is not a JSON array
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    pos = 0
+    row_number = 0
+    state = "open"  # open -> first/value <-> separator -> done
+    
+    async def fill() -> bool:
+        nonlocal buffer, pos
+        async for chunk in chunks:
+            text = utf8.decode(chunk)
+            if text:
+                buffer = buffer[pos:] + text
+                pos = 0
+                return True
+        tail = utf8.decode(b"", final=True)
+        if tail:
+            buffer = buffer[pos:] + tail
+            pos = 0
+            return True
+        return False
+    
+    chunks = chunks.__aiter__()
+    while state != "done":
+        while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+            pos += 1
+        if pos >= len(buffer):
+            if await fill():
+                continue
+            if state == "open":
+                raise ValueError("Expected a JSON array, got an empty body")
+            yield row_number + 1, "Unexpected end of body: the JSON array is not closed"
+            return
+        
+        char = buffer[pos]
+        if state == "open":
+            if char != "[":
+                raise ValueError("Expected a JSON array")
+            pos += 1
+            state = "first"
+        elif state in ("first", "value"):
+            if char == "]" and state == "first":
+                pos += 1
+                state = "done"
+                continue
+            try:
+                element, end = decoder.raw_decode(buffer, pos)
+            except ValueError as e:
+                # Possibly an element split across chunks: read more and retry
+                if len(buffer) - pos < MAX_ROW_CHARS and await fill():
+                    continue
+                yield row_number + 1, f"Invalid JSON: {e}"
+                return
+            if end == len(buffer) and isinstance(element, (int, float)) and await fill():
+                continue  # a number may continue in the next chunk
+            pos = end
+            row_number += 1
+            yield row_number, element if isinstance(element, dict) else "Row is not a JSON object"
+            state = "separator"
+        else:
+            if char == ",":
+                pos += 1
+                state = "value"
+            elif char == "]":
+                pos += 1
+                state = "done"
+            else:
+                yield row_number + 1, f"Expected ',' or ']' after row {row_number}"
+                return
+
+
+def normalize_email(email: str) -> str:
+    return email.strip().lower()
+
+
+def normalize_wallet(wallet: Optional[str]) -> Optional[str]:
+    return wallet.strip().lower() if wallet else None
+
+
+class UserDeduplicator:
+    """
+    Emails and wallets already taken, built in one pass over the existing store
+    and extended with every row accepted during the import
+    """
+    
+    def __init__(self, existing: Iterable[dict]):
+        self.emails: set[str] = set()
+        self.wallets: set[str] = set()
+        for user in existing:
+            self.emails.add(normalize_email(user["email"]))
+            if user.get("wallet_address"):
+                self.wallets.add(normalize_wallet(user["wallet_address"]))
+    
+    def claim(self, user: UserCreate) -> Optional[str]:
+        """Reserve a row's email and wallet; returns an error if either is taken"""
+        email = normalize_email(user.email)
+        wallet = normalize_wallet(user.wallet_address)
+        if email in self.emails:
+            return f"Duplicate email {user.email}"
+        if wallet and wallet in self.wallets:
+            return f"Duplicate wallet {user.wallet_address}"
+        self.emails.add(email)
+        if wallet:
+            self.wallets.add(wallet)
+        return None
+
+
+async def import_users(
+    elements: AsyncIterator[tuple[int, object]],
+    existing: Iterable[dict],
+    insert: Callable[[list[UserCreate], list[str], datetime], None],
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> dict:
+    """
+    Import UserCreate rows from (row_number, element) pairs.
+    
+    Rows are validated and de-duplicated as they arrive (against `existing` and
+    earlier rows of the same import) and passed to insert() one chunk at a time
+    with pre-generated ids and a single timestamp.
+    
+    Returns:
+        {"imported", "failed", "users": [{"row", "id"}], "errors": [{"row", "error"}]}
+    """
+    dedupe = UserDeduplicator(existing)
+    result = {"imported": 0, "failed": 0, "users": [], "errors": []}
+    validate = UserCreate.model_validate
+    
+    def flush(chunk: list[tuple[int, UserCreate]]):
+        ids = uuid4_strings(len(chunk))
+        insert([data for _, data in chunk], ids, datetime.utcnow())
+        result["users"].extend({"row": row_number, "id": user_id} for (row_number, _), user_id in zip(chunk, ids))
+    
+    chunk: list[tuple[int, UserCreate]] = []
+    async for row_number, element in elements:
+        if isinstance(element, str):
+            result["errors"].append({"row": row_number, "error": element})
+            continue
+        try:
+            data = validate(element)
+        except ValidationError as e:
+            result["errors"].append({"row": row_number, "error": _format_validation_error(e)})
+            continue
+        duplicate = dedupe.claim(data)
+        if duplicate:
+            result["errors"].append({"row": row_number, "error": duplicate})
+            continue
+        chunk.append((row_number, data))
+        if len(chunk) >= chunk_size:
+            flush(chunk)
+            chunk = []
+    if chunk:
+        flush(chunk)
+    
+    result["imported"] = len(result["users"])
+    result["failed"] = len(result["errors"])
+    return result
@@ -0,0 +1,102 @@
+"""
+Domira Backend - Version Counters
+Per-collection and per-entity write sequence numbers, used to build ETags
+without hashing response bodies
+"""
+from contextlib import contextmanager
+from typing import Hashable, Iterator, Optional
+import uuid
+import zlib
+
+from fastapi import Request, Response, status
+
+
+class VersionCounters:
+    """
+    Sequence number of the last write to each collection and entity.
+    
+    Writes are stamped with a sequence: the position of their event in the
+    coherence journal when one is configured, so every worker derives the
+    same version for the same content however often it applies the event,
+    otherwise a per-process counter. `epoch` names the sequence space (the
+    journal, or this process' boot) and is part of every ETag, so versions
+    from a restarted process or another journal never match.
+    
+    bump(collection, id) stamps both the collection and the entity.
+    bump_all(collection) is for bulk rewrites (e.g. a revaluation) and stamps
+    the collection's generation, which is part of every entity version, so
+    no per-entity loop is needed.
+    """
+    
+    def __init__(self):
+        self.epoch = uuid.uuid4().hex[:8]
+        self._counter = 0
+        self._stamp: Optional[int] = None
+        self._collections: dict[str, int] = {}
+        self._generations: dict[str, int] = {}
+        self._entities: dict[tuple[str, Hashable], int] = {}
+    
+    def next_sequence(self) -> int:
+        """Next per-process sequence (writes made without a journal)"""
+        self._counter += 1
+        return self._counter
+    
+    @contextmanager
+    def stamped(self, sequence: int) -> Iterator[None]:
+        """Stamp every bump made inside the block with `sequence`"""
+        previous, self._stamp = self._stamp, sequence
+        try:
+            yield
+        finally:
+            self._stamp = previous
+    
+    def _sequence(self) -> int:
+        return self.next_sequence() if self._stamp is None else self._stamp
+    
+    def bump(self, collection: str, entity_id: Optional[Hashable] = None):
+        """Record a write to a collection (and one of its entities)"""
+        sequence = self._sequence()
+        self._collections[collection] = max(self._collections.get(collection, 0), sequence)
+        if entity_id is not None:
+            key = (collection, entity_id)
+            self._entities[key] = max(self._entities.get(key, 0), sequence)
+    
+    def bump_all(self, collection: str):
+        """Record a write that touched every entity in a collection"""
+        sequence = self._sequence()
+        self._generations[collection] = max(self._generations.get(collection, 0), sequence)
+        self._collections[collection] = max(self._collections.get(collection, 0), sequence)
+    
+    def collection(self, collection: str) -> int:
+        return self._collections.get(collection, 0)
+    
+    def entity(self, collection: str, entity_id: Hashable) -> str:
+        return f"{self._generations.get(collection, 0)}.{self._entities.get((collection, entity_id), 0)}"
+
+
+versions = VersionCounters()
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag from the version epoch and version parts (query strings are folded into a CRC)"""
+    return '"' + "-".join(
+        f"{zlib.crc32(part):08x}" if isinstance(part, bytes) else str(part) for part in (versions.epoch, *parts)
+    ) + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if an If-None-Match header value covers the current ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag.removeprefix("W/") in candidates
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """A 304 response if the client already holds `etag`, else None"""
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return None
@@ -1,13 +1,21 @@
 """
 Domira Backend - Web3 Contract Service
 Interacts with SPVPropertyToken contract via Web3.py
+
+web3 is imported inside the functions that talk to the chain: it is the
+slowest import in the app and most requests (and every cold start) never
+need it. Call warm_up() to pay the import ahead of the first transaction.
 """
-from web3 import Web3, AsyncWeb3
-from web3.middleware import ExtraDataToPOAMiddleware
+from typing import TYPE_CHECKING
 from app.config import get_settings
+from app.services.metrics import time_external
+import asyncio
 import json
 import logging
 
+if TYPE_CHECKING:
+    from web3 import Web3
+
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
@@ -79,8 +87,16 @@ CONTRACT_ABI = [
 ]
 
 
-def get_web3() -> Web3:
+def warm_up():
+    """Import web3 now instead of on the first chain call"""
+    import web3.middleware  # noqa: F401
+
+
+def get_web3() -> "Web3":
     """Get Web3 instance connected to configured RPC"""
+    from web3 import Web3
+    from web3.middleware import ExtraDataToPOAMiddleware
+    
     w3 = Web3(Web3.HTTPProvider(settings.eth_rpc_url))
     # Add PoA middleware for testnets like Sepolia
     w3.middleware_onion.inject(ExtraDataToPOAMiddleware, layer=0)
@@ -89,6 +105,8 @@ def get_web3() -> Web3:
 
 def get_contract():
     """Get contract instance"""
+    from web3 import Web3
+    
     w3 = get_web3()
     if not settings.contract_address:
         raise ValueError("Contract address not configured")
@@ -115,24 +133,27 @@ async def whitelist_address(address: str, status: bool = True) -> str:
         logger.warning("Contract not configured, skipping whitelist transaction")
         return "0x" + "0" * 64  # Mock tx hash
     
+    from web3 import Web3
+    
     w3 = get_web3()
     contract = get_contract()
     admin = get_admin_account()
     
-    # Build transaction
-    tx = contract.functions.setWhitelisted(
-        Web3.to_checksum_address(address),
-        status
-    ).build_transaction({
-        'from': admin.address,
-        'nonce': w3.eth.get_transaction_count(admin.address),
-        'gas': 100000,
-        'gasPrice': w3.eth.gas_price
-    })
-    
-    # Sign and send
-    signed_tx = w3.eth.account.sign_transaction(tx, admin.key)
-    tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+    with time_external("rpc", "setWhitelisted"):
+        # Build transaction
+        tx = contract.functions.setWhitelisted(
+            Web3.to_checksum_address(address),
+            status
+        ).build_transaction({
+            'from': admin.address,
+            'nonce': w3.eth.get_transaction_count(admin.address),
+            'gas': 100000,
+            'gasPrice': w3.eth.gas_price
+        })
+        
+        # Sign and send
+        signed_tx = w3.eth.account.sign_transaction(tx, admin.key)
+        tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
     
     logger.info(f"Whitelist transaction sent: {tx_hash.hex()}")
     return tx_hash.hex()
@@ -143,10 +164,13 @@ async def check_whitelist(address: str) -> bool:
     if not settings.contract_address:
         return False
     
+    from web3 import Web3
+    
     contract = get_contract()
-    return contract.functions.isWhitelisted(
-        Web3.to_checksum_address(address)
-    ).call()
+    with time_external("rpc", "isWhitelisted"):
+        return contract.functions.isWhitelisted(
+            Web3.to_checksum_address(address)
+        ).call()
 
 
 async def get_balance(address: str, token_id: int) -> int:
@@ -154,20 +178,89 @@ async def get_balance(address: str, token_id: int) -> int:
     if not settings.contract_address:
         return 0
     
+    from web3 import Web3
+    
     contract = get_contract()
-    return contract.functions.balanceOf(
-        Web3.to_checksum_address(address),
-        token_id
-    ).call()
+    with time_external("rpc", "balanceOf"):
+        return contract.functions.balanceOf(
+            Web3.to_checksum_address(address),
+            token_id
+        ).call()
 
 
 async def get_max_holding(token_id: int) -> int:
-    """Get maximum holding for a token (20% of supply)"""
+    """Get maximum holding for a token (20% of supply); the blocking call runs in a worker thread"""
     if not settings.contract_address:
         return 0
     
+    return await asyncio.to_thread(_call_max_holding, token_id)
+
+
+def _call_max_holding(token_id: int) -> int:
+    contract = get_contract()
+    with time_external("rpc", "getMaxHolding"):
+        return contract.functions.getMaxHolding(token_id).call()
+
+
+class MintBatchError(Exception):
+    """A mint batch failed part-way; tx_hashes are the transactions already sent, in order"""
+    
+    def __init__(self, message: str, tx_hashes: list[str]):
+        super().__init__(message)
+        self.tx_hashes = tx_hashes
+
+
+async def mint_batch(token_id: int, allocations: list[tuple[str, int]]) -> list[str]:
+    """
+    Mint primary-offering allocations as one batch
+    The contract mints to one address per call, so the batch is one signed
+    mintPropertyTokens transaction per wallet on consecutive nonces, all sent
+    before waiting on any receipt. Returns transaction hashes in order (mock
+    hashes when no contract is configured); on a failure raises MintBatchError with the ones already sent, so a retry can
+    resume after them
+    
+    web3's HTTP provider is synchronous, so the batch (up to one transaction
+    per subscriber) is sent from a worker thread to keep the event loop free.
+    """
+    if not settings.contract_address or not settings.admin_private_key:
+        logger.warning(f"Contract not configured, skipping {len(allocations)} mint transactions")
+        return ["0x" + "0" * 64] * len(allocations)  # Mock tx hashes, one per allocation
+    
+    tx_hashes = await asyncio.to_thread(_send_mint_batch, token_id, allocations)
+    logger.info(f"Minted {len(tx_hashes)} offering allocations for token {token_id}")
+    return tx_hashes
+
+
+def _send_mint_batch(token_id: int, allocations: list[tuple[str, int]]) -> list[str]:
+    """Sign and send the batch (blocking; run off the event loop)"""
+    from web3 import Web3
+    
+    w3 = get_web3()
     contract = get_contract()
-    return contract.functions.getMaxHolding(token_id).call()
+    admin = get_admin_account()
+    
+    tx_hashes = []
+    try:
+        with time_external("rpc", "mintPropertyTokens.batch"):
+            nonce = w3.eth.get_transaction_count(admin.address, "pending")
+            gas_price = w3.eth.gas_price
+            for i, (wallet, amount) in enumerate(allocations):
+                tx = contract.functions.mintPropertyTokens(
+                    Web3.to_checksum_address(wallet),
+                    token_id,
+                    amount,
+                    b""
+                ).build_transaction({
+                    'from': admin.address,
+                    'nonce': nonce + i,
+                    'gas': 150000,
+                    'gasPrice': gas_price
+                })
+                signed_tx = w3.eth.account.sign_transaction(tx, admin.key)
+                tx_hashes.append(w3.eth.send_raw_transaction(signed_tx.raw_transaction).hex())
+    except Exception as e:
+        raise MintBatchError(str(e), tx_hashes) from e
+    return tx_hashes
 
 
 async def create_property_on_chain(
@@ -183,26 +276,30 @@ async def create_property_on_chain(
         logger.warning("Contract not configured, returning mock token ID")
         return 0
     
+    from web3 import Web3
+    
     w3 = get_web3()
     contract = get_contract()
     admin = get_admin_account()
     
-    tx = contract.functions.createProperty(
-        Web3.to_checksum_address(manager_address),
-        total_supply,
-        property_uri
-    ).build_transaction({
-        'from': admin.address,
-        'nonce': w3.eth.get_transaction_count(admin.address),
-        'gas': 200000,
-        'gasPrice': w3.eth.gas_price
-    })
-    
-    signed_tx = w3.eth.account.sign_transaction(tx, admin.key)
-    tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+    with time_external("rpc", "createProperty"):
+        tx = contract.functions.createProperty(
+            Web3.to_checksum_address(manager_address),
+            total_supply,
+            property_uri
+        ).build_transaction({
+            'from': admin.address,
+            'nonce': w3.eth.get_transaction_count(admin.address),
+            'gas': 200000,
+            'gasPrice': w3.eth.gas_price
+        })
+        
+        signed_tx = w3.eth.account.sign_transaction(tx, admin.key)
+        tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
     
     # Wait for receipt to get token ID from events
-    receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+    with time_external("rpc", "wait_for_transaction_receipt"):
+        receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
     
     # Parse PropertyCreated event for tokenId
     # In production, decode the event logs
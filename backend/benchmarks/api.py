@@ -0,0 +1,179 @@
+"""
+Domira Backend - API Load Benchmark
+
+Drives the FastAPI app in-process over httpx's ASGI transport (no sockets)
+against a seeded synthetic data set, and reports throughput and p50/p99
+latency per endpoint for every router in app/api.
+
+Usage:
+    python -m benchmarks.api --scale 1000
+    python -m benchmarks.api --scale 100000 --requests 2000 --concurrency 8 --output results.json
+    python -m benchmarks.api --only marketplace
+    python -m benchmarks.api --only buy --concurrency 32 --rate-limits
+"""
+from typing import Callable, Optional
+import argparse
+import asyncio
+import json
+import platform
+import random
+import time
+
+import httpx
+import numpy as np
+
+from app.config import get_settings
+from app.main import app
+from benchmarks.synthetic import populate
+
+# (name, router, method, path builder, JSON body builder); builders get (rng, ids)
+Scenario = tuple[str, str, str, Callable[[random.Random, dict], str], Optional[Callable[[random.Random, dict], dict]]]
+
+SCENARIOS: list[Scenario] = [
+    ("health", "main", "GET", lambda r, ids: "/health", None),
+    ("create_user", "users", "POST", lambda r, ids: "/api/v1/users/",
+     lambda r, ids: {"email": f"bench{r.random()}@example.com", "full_name": "Bench User"}),
+    ("bulk_create_users_100", "users", "POST", lambda r, ids: "/api/v1/users/bulk",
+     lambda r, ids: [{"email": f"bulk{r.random()}@example.com", "full_name": "Bench User"} for _ in range(100)]),
+    ("get_user", "users", "GET", lambda r, ids: f"/api/v1/users/{r.choice(ids['users'])}", None),
+    ("get_kyc_status", "users", "GET", lambda r, ids: f"/api/v1/users/{r.choice(ids['users'])}/kyc-status", None),
+    ("get_portfolio", "users", "GET", lambda r, ids: f"/api/v1/users/{r.choice(ids['users'])}/portfolio", None),
+    ("list_properties_postal", "properties", "GET",
+     lambda r, ids: "/api/v1/properties/?fields=id,name,asking_price&postal_prefix=1315NT", None),
+    ("list_properties_min_price", "properties", "GET",
+     lambda r, ids: f"/api/v1/properties/?fields=id,name&min_price={r.randint(2_000_000, 2_490_000)}", None),
+    ("get_property", "properties", "GET", lambda r, ids: f"/api/v1/properties/{r.choice(ids['properties'])}", None),
+    ("get_passport", "properties", "GET",
+     lambda r, ids: f"/api/v1/properties/{r.choice(ids['properties'])}/passport", None),
+    ("create_property", "properties", "POST", lambda r, ids: "/api/v1/properties/",
+     lambda r, ids: {
+         "name": "Bench Property", "description": "Benchmark", "address": f"Benchstraat {r.randint(1, 10**6)}",
+         "city": "Almere", "asking_price": 500_000, "total_fractions": 10_000,
+         "price_per_fraction": 50, "expected_yield": 5.5
+     }),
+    ("get_distribution", "properties", "GET", lambda r, ids: "/api/v1/properties/prop-001/distributions/2026-01", None),
+    ("list_listings", "marketplace", "GET",
+     lambda r, ids: f"/api/v1/marketplace/listings?property_id={r.choice(ids['properties'])}", None),
+    ("get_listing", "marketplace", "GET",
+     lambda r, ids: f"/api/v1/marketplace/listings/{r.choice(ids['listings'])}", None),
+    ("buy", "marketplace", "POST", lambda r, ids: "/api/v1/marketplace/buy",
+     lambda r, ids: {"listing_id": r.choice(ids["listings"]), "fractions": 1, "buyer_id": r.choice(ids["users"])}),
+    ("trade_stats", "marketplace", "GET",
+     lambda r, ids: f"/api/v1/marketplace/{r.choice(ids['properties'])}/stats", None),
+    ("stripe_webhook", "webhooks", "POST", lambda r, ids: "/api/v1/webhooks/stripe",
+     lambda r, ids: {
+         "type": "identity.verification_session.requires_input",
+         "data": {"object": {"metadata": {"user_id": r.choice(ids["users"])}}}
+     }),
+    ("create_verification_session", "webhooks", "POST",
+     lambda r, ids: f"/api/v1/webhooks/create-verification-session?user_id={r.choice(ids['users'])}&wallet_address=0x0",
+     None),
+]
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    ids: dict,
+    requests: int,
+    concurrency: int,
+    seed: int
+) -> dict:
+    """Fire `requests` calls from `concurrency` workers and collect latencies"""
+    name, router, method, path_for, body_for = scenario
+    rng = random.Random(f"{seed}:{name}")
+    # Build requests up front so generation is not timed
+    calls = [(path_for(rng, ids), body_for(rng, ids) if body_for else None) for _ in range(requests)]
+    latencies = np.zeros(requests)
+    statuses: dict[int, int] = {}
+    next_call = iter(range(requests))
+
+    async def worker():
+        for i in next_call:
+            path, body = calls[i]
+            start = time.perf_counter()
+            response = await client.request(method, path, json=body)
+            latencies[i] = time.perf_counter() - start
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    # One untimed call warms caches and lazy imports
+    path, body = calls[0]
+    await client.request(method, path, json=body)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "name": name,
+        "router": router,
+        "method": method,
+        "requests": requests,
+        "concurrency": concurrency,
+        "throughput_rps": requests / elapsed,
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "p99_ms": float(np.percentile(latencies, 99) * 1000),
+        "mean_ms": float(latencies.mean() * 1000),
+        "status_codes": {str(code): count for code, count in sorted(statuses.items())},
+        "server_errors": sum(count for code, count in statuses.items() if code >= 500)
+    }
+
+
+async def run(scale: int, requests: int, concurrency: int, seed: int, only: Optional[str]) -> dict:
+    """Seed the stores, then run every selected scenario in-process"""
+    started = time.perf_counter()
+    ids = populate(users=scale, properties=scale, listings=scale, seed=seed)
+    seed_seconds = time.perf_counter() - started
+
+    scenarios = [s for s in SCENARIOS if not only or only in (s[0], s[1])]
+    transport = httpx.ASGITransport(app=app)
+    results = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for scenario in scenarios:
+            result = await run_scenario(client, scenario, ids, requests, concurrency, seed)
+            results.append(result)
+            print(
+                f"{result['router']:<12} {result['name']:<28} {result['throughput_rps']:>9.0f} req/s  "
+                f"p50 {result['p50_ms']:>7.2f} ms  p99 {result['p99_ms']:>7.2f} ms  {result['status_codes']}"
+            )
+
+    return {
+        "meta": {
+            "scale": scale,
+            "requests": requests,
+            "concurrency": concurrency,
+            "seed": seed,
+            "seed_seconds": seed_seconds,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        },
+        "scenarios": results
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="In-process load benchmark for the Domira API")
+    parser.add_argument("--scale", type=int, default=1_000,
+                        help="Users, properties and listings to generate (10^3 - 10^6)")
+    parser.add_argument("--requests", type=int, default=500, help="Timed requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=1, help="Concurrent in-flight requests")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for data and request generation")
+    parser.add_argument("--only", help="Run only the scenarios of one router or one scenario name")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--rate-limits", action="store_true",
+                        help="Keep write-route admission control on (off by default: one client would hit it)")
+    args = parser.parse_args()
+    get_settings().rate_limit_enabled = args.rate_limits
+
+    result = asyncio.run(run(args.scale, args.requests, args.concurrency, args.seed, args.only))
+    print(f"Seeded {args.scale:,} users/properties/listings in {result['meta']['seed_seconds']:.1f} s")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"Results saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
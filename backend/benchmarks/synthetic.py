@@ -0,0 +1,136 @@
+"""
+Domira Backend - Synthetic Data Generator
+
+Seeds the in-memory stores with reproducible users, properties (with
+passports) and listings for benchmarks. The same seed and sizes always
+produce the same ids and values.
+"""
+from datetime import datetime
+
+import numpy as np
+
+from app.api.marketplace import listings_db
+from app.api.properties import insert_properties, location_index, properties_db
+from app.api.users import apply_user_upserts, users_db
+from app.models.schemas import KYCStatus, ListingStatus
+from app.services.property_passport import ALMERE_ADDRESSES, BUILDING_TYPES, ENERGY_LABELS
+from app.services.versions import versions
+
+CREATED_AT = datetime(2026, 1, 1)
+
+
+def make_users(count: int, rng: np.random.Generator) -> list[dict]:
+    """Users with deterministic ids, half of them KYC verified"""
+    wallets = rng.integers(0, 2**63, size=count, dtype=np.int64).tolist()
+    verified = (rng.random(count) < 0.5).tolist()
+    return [
+        {
+            "id": f"user-{i:07d}",
+            "email": f"user{i}@example.com",
+            "full_name": f"Investor {i}",
+            "wallet_address": f"0x{wallet:040x}",
+            "kyc_status": KYCStatus.VERIFIED if is_verified else KYCStatus.PENDING,
+            "created_at": CREATED_AT,
+            "updated_at": CREATED_AT
+        }
+        for i, (wallet, is_verified) in enumerate(zip(wallets, verified))
+    ]
+
+
+def make_properties(count: int, rng: np.random.Generator) -> list[dict]:
+    """Properties with passports spread over the mock Almere postal areas"""
+    addresses = rng.integers(0, len(ALMERE_ADDRESSES), size=count).tolist()
+    prices = np.round(rng.uniform(150_000, 2_500_000, size=count), -3).tolist()
+    years = rng.integers(1980, 2025, size=count).tolist()
+    areas = np.round(rng.uniform(45, 180, size=count), 1).tolist()
+    labels = rng.integers(0, 4, size=count).tolist()
+    types = rng.integers(0, len(BUILDING_TYPES), size=count).tolist()
+    yields = np.round(rng.uniform(3.0, 8.0, size=count), 2).tolist()
+
+    records = []
+    for i in range(count):
+        mock_addr = ALMERE_ADDRESSES[addresses[i]]
+        address = f"{mock_addr['street']} {i}"
+        records.append({
+            "id": f"prop-{i:07d}",
+            "name": f"{mock_addr['street']} Residence {i}",
+            "description": f"Synthetic property {i} in {mock_addr['neighborhood']}",
+            "address": address,
+            "city": "Almere",
+            "asking_price": prices[i],
+            "total_fractions": 10_000,
+            "available_fractions": 10_000,
+            "price_per_fraction": prices[i] / 10_000,
+            "expected_yield": yields[i],
+            "token_id": i,
+            "manager_address": "0x0000000000000000000000000000000000000000",
+            "passport": {
+                "cadastral_number": f"ALM-A-{1000 + i % 9000}",
+                "ownership_status": "Eigendom",
+                "mortgage_info": None,
+                "address": address,
+                "postal_code": mock_addr["postal"],
+                "city": "Almere",
+                "neighborhood": mock_addr["neighborhood"],
+                "building_year": years[i],
+                "floor_area": areas[i],
+                "building_type": BUILDING_TYPES[types[i]],
+                "usage_purpose": "residential",
+                "energy_label": ENERGY_LABELS[labels[i]],
+                "woz_value": round(prices[i] * 0.9, 2),
+                "woz_year": 2025
+            },
+            "created_at": CREATED_AT
+        })
+    return records
+
+
+def make_listings(count: int, users: list[dict], properties: list[dict], rng: np.random.Generator) -> list[dict]:
+    """Active listings from random sellers on random properties"""
+    sellers = rng.integers(0, len(users), size=count).tolist()
+    props = rng.integers(0, len(properties), size=count).tolist()
+    premiums = rng.uniform(0.9, 1.2, size=count).tolist()
+    listings = []
+    for i in range(count):
+        prop = properties[props[i]]
+        price = round(prop["price_per_fraction"] * premiums[i], 2)
+        listings.append({
+            "id": f"listing-{i:07d}",
+            "seller_id": users[sellers[i]]["id"],
+            "property_id": prop["id"],
+            "property_name": prop["name"],
+            "fractions": 1_000,
+            "price_per_fraction": price,
+            "total_price": 1_000 * price,
+            "status": ListingStatus.ACTIVE,
+            "created_at": CREATED_AT
+        })
+    return listings
+
+
+def populate(users: int, properties: int, listings: int, seed: int = 42) -> dict:
+    """
+    Replace the in-memory stores with a synthetic data set.
+
+    Returns:
+        Lists of the generated user, property and listing ids
+    """
+    rng = np.random.default_rng(seed)
+    user_rows = make_users(users, rng)
+    property_rows = make_properties(properties, rng)
+    listing_rows = make_listings(listings, user_rows, property_rows, rng)
+
+    users_db.clear()
+    apply_user_upserts(user_rows)
+    properties_db.clear()
+    location_index.clear()
+    insert_properties(property_rows)
+    listings_db.clear()
+    listings_db.update((l["id"], l) for l in listing_rows)
+    versions.bump_all("listings")
+
+    return {
+        "users": [u["id"] for u in user_rows],
+        "properties": [p["id"] for p in property_rows],
+        "listings": [l["id"] for l in listing_rows]
+    }
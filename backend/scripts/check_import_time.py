@@ -0,0 +1,97 @@
+"""
+Domira Backend - Import-Time Budget Check
+
+Imports the FastAPI app in a fresh interpreter under `python -X importtime`
+and fails if the cumulative import time exceeds the budget, or if a module
+that should load lazily (web3, stripe) is imported at startup.
+
+Usage:
+    python -m scripts.check_import_time
+    python -m scripts.check_import_time --budget-ms 700 --top 15
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+# Heavy integrations that must stay off the cold-start path
+LAZY_MODULES = ("web3", "stripe", "eth_account")
+
+# Cumulative import budget for app.main (also enforced by tests/test_import_time.py)
+DEFAULT_BUDGET_MS = 900.0
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$")
+
+
+def profile_imports(target: str) -> list[tuple[str, int, int, int]]:
+    """Run `import target` in a subprocess; return (module, self_us, cumulative_us, depth) rows"""
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=backend_dir)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True,
+        text=True,
+        cwd=backend_dir,
+        env=env
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {target} failed:\n{result.stderr}")
+    
+    rows = []
+    for line in result.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return rows
+
+
+def best_import_time(target: str, runs: int) -> tuple[int, list[tuple[str, int, int, int]]]:
+    """Fastest of `runs` fresh imports: (cumulative_us, rows)"""
+    best = None
+    for _ in range(runs):
+        rows = profile_imports(target)
+        total_us = next(cumulative for module, _, cumulative, _ in rows if module == target)
+        if best is None or total_us < best[0]:
+            best = (total_us, rows)
+    return best
+
+
+def eager_lazy_modules(rows: list[tuple[str, int, int, int]]) -> list[str]:
+    """LAZY_MODULES that were imported anyway"""
+    return sorted({m.split(".")[0] for m, _, _, _ in rows if m.split(".")[0] in LAZY_MODULES})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the app's import time against a budget")
+    parser.add_argument("--target", default="app.main", help="Module to import")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="Cumulative import budget in ms")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters to run (best is used)")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to print")
+    args = parser.parse_args()
+    
+    total_us, rows = best_import_time(args.target, args.runs)
+    
+    print(f"Import time for {args.target}: {total_us / 1000:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    # Direct and second-level imports are where regressions show up
+    nested = sorted((r for r in rows if r[3] in (1, 2)), key=lambda r: r[2], reverse=True)
+    for module, _, cumulative, depth in nested[:args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {'  ' * (depth - 1)}{module}")
+    
+    failures = []
+    eager = eager_lazy_modules(rows)
+    if eager:
+        failures.append(f"Lazy modules imported at startup: {', '.join(eager)}")
+    if total_us / 1000 > args.budget_ms:
+        failures.append(f"Import time {total_us / 1000:.1f} ms exceeds budget of {args.budget_ms:.0f} ms")
+    
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Domira Backend - Bulk Property Import
+
+Streams a CSV or JSONL file of PropertyCreate rows to the bulk import
+endpoint and prints the per-row errors it reports.
+
+Usage:
+    python -m scripts.import_properties --file portfolio.csv
+    python -m scripts.import_properties --file portfolio.jsonl --api-url http://localhost:8000/api/v1
+"""
+import argparse
+import json
+import os
+
+import httpx
+
+CHUNK_SIZE = 256 * 1024
+
+
+def iter_file(path: str):
+    """Read the file in fixed-size chunks so the upload is streamed"""
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            yield chunk
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Bulk import Domira properties from CSV or JSONL"
+    )
+    parser.add_argument(
+        "--file",
+        required=True,
+        help="CSV (with header) or JSONL file of PropertyCreate rows"
+    )
+    parser.add_argument(
+        "--format",
+        choices=["csv", "jsonl"],
+        help="Input format (default: from file extension)"
+    )
+    parser.add_argument(
+        "--api-url",
+        default="http://localhost:8000/api/v1",
+        help="API base URL"
+    )
+    parser.add_argument(
+        "--output",
+        help="Write the full import result (ids and errors) to this JSON file"
+    )
+    
+    args = parser.parse_args()
+    
+    fmt = args.format or ("csv" if os.path.splitext(args.file)[1].lower() == ".csv" else "jsonl")
+    content_type = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    
+    try:
+        response = httpx.post(
+            f"{args.api_url}/properties/bulk",
+            params={"format": fmt},
+            content=iter_file(args.file),
+            headers={"Content-Type": content_type},
+            timeout=None
+        )
+        response.raise_for_status()
+    except httpx.HTTPError as e:
+        print(f"Error: {e}")
+        exit(1)
+    
+    result = response.json()
+    print(f"Imported: {result['imported']}")
+    print(f"Failed:   {result['failed']}")
+    for error in result["errors"][:20]:
+        print(f"  row {error['row']}: {error['error']}")
+    if result["failed"] > 20:
+        print(f"  ... {result['failed'] - 20} more")
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"Result saved to: {args.output}")
+    
+    if result["failed"]:
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
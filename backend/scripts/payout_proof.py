@@ -0,0 +1,46 @@
+"""
+Domira Backend - Payout Proof Lookup
+
+Looks up a holder's claim (amount, leaf index and Merkle proof) in a payout
+manifest written by the rental distribution script with --merkle-dir.
+
+Usage:
+    python -m scripts.payout_proof --manifest payouts/prop-001_2026-01 --wallet 0x...
+"""
+import argparse
+import json
+
+from app.services.merkle import PayoutManifest
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Look up a wallet's Merkle payout proof"
+    )
+    parser.add_argument(
+        "--manifest",
+        required=True,
+        help="Manifest prefix (path without .root.json/.tree.bin/.leaves.csv)"
+    )
+    parser.add_argument(
+        "--wallet",
+        required=True,
+        help="Wallet address to look up"
+    )
+    
+    args = parser.parse_args()
+    
+    manifest = PayoutManifest(args.manifest)
+    try:
+        claim = manifest.claim(args.wallet)
+    finally:
+        manifest.close()
+    
+    if claim is None:
+        print(f"Error: Wallet {args.wallet} has no payout in this manifest")
+        exit(1)
+    print(json.dumps(claim, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,174 +6,387 @@ It deducts management fees and generates a distribution report.
 
 Usage:
     python -m scripts.rental_distribution --property-id <id> --period 2026-01
+    python -m scripts.rental_distribution --all-properties --period 2026-01..2026-12 --output summary.json
+    python -m scripts.rental_distribution --property-id <id> --format jsonl --output report.jsonl --quiet
 """
 import argparse
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from typing import Optional
 import json
+import os
+import re
+import sys
+import time
 
+import numpy as np
 
-# Mock data for demonstration
-MOCK_PROPERTIES = {
-    "prop-001": {
-        "name": "Stationsplein Apartments",
-        "token_id": 0,
-        "total_fractions": 1000,
-        "monthly_rent": 12500.00,  # EUR
-        "management_fee_percent": 15.0
-    },
-    "prop-002": {
-        "name": "Weerwater Residences",
-        "token_id": 1,
-        "total_fractions": 500,
-        "monthly_rent": 8000.00,
-        "management_fee_percent": 12.0
-    }
-}
-
-# Mock token holders (would come from on-chain data)
-MOCK_HOLDERS = {
-    0: [  # token_id 0
-        {"wallet": "0x1234...abcd", "fractions": 200},
-        {"wallet": "0x5678...efgh", "fractions": 150},
-        {"wallet": "0x9abc...ijkl", "fractions": 100},
-        {"wallet": "0xdef0...mnop", "fractions": 50},
-        {"wallet": "0x1111...pool", "fractions": 500},  # Liquidity pool
-    ],
-    1: [  # token_id 1
-        {"wallet": "0x2222...aaaa", "fractions": 100},
-        {"wallet": "0x3333...bbbb", "fractions": 100},
-        {"wallet": "0x4444...cccc", "fractions": 75},
-        {"wallet": "0x5555...dddd", "fractions": 225},
-    ]
-}
-
-
-def calculate_distribution(
+from app.services.distribution import (
+    MOCK_PROPERTIES,
+    attach_distributions,
+    compute_distribution,
+    iter_distribution_rows,
+    snapshot_store,
+)
+from app.services.merkle import PayoutMerkleTree
+
+# Characters that force quoting/escaping of a wallet in CSV or JSON output
+_NEEDS_QUOTING = re.compile(r'[",\\\x00-\x1f\x7f-\uffff]')
+
+
+_loaded_transfer_files: set[str] = set()
+
+
+def load_transfer_history(path: Optional[str]):
+    """Replay a transfer history CSV into the snapshot store (also used as pool initializer)"""
+    if path and path not in _loaded_transfer_files:
+        snapshot_store.load_csv(path)
+        _loaded_transfer_files.add(path)
+
+
+def write_distribution_stream(summary: dict, rows: dict, out, fmt: str = "jsonl") -> int:
+    """
+    Stream payout rows to an open text file as JSONL or CSV.
+    
+    JSONL starts with a single {"type": "summary", ...} record; CSV starts with
+    "# key: value" comment lines followed by the column header. Returns the
+    number of holder rows written.
+    """
+    total_fractions = summary["distribution_summary"]["total_fractions"]
+    financial = summary["financial_summary"]
+    
+    if fmt == "jsonl":
+        out.write(json.dumps({"type": "summary", **summary}, separators=(",", ":")) + "\n")
+    elif fmt == "csv":
+        out.write(f"# property_id: {summary['property_id']}\n")
+        out.write(f"# period: {summary['period']}\n")
+        out.write(f"# net_distributable_income: {financial['net_distributable_income']:.2f}\n")
+        out.write(f"# total_distributed: {summary['distribution_summary']['total_distributed']:.2f}\n")
+        out.write(f"# holder_count: {summary['distribution_summary']['holder_count']}\n")
+        out.write("wallet_address,fractions,percentage,amount\n")
+    else:
+        raise ValueError(f"Unsupported stream format '{fmt}'")
+    
+    written = 0
+    for chunk in iter_distribution_rows(rows, total_fractions):
+        # Wallet addresses are plain hex in practice; only escape when a chunk needs it
+        if _NEEDS_QUOTING.search("".join(row[0] for row in chunk)):
+            chunk = [(json.dumps(w)[1:-1] if fmt == "jsonl" else _csv_field(w), n, p, c) for w, n, p, c in chunk]
+        if fmt == "jsonl":
+            out.writelines([
+                f'{{"wallet_address":"{w}","fractions":{n},"percentage":{p:.4f},"amount":{c / 100:.2f}}}\n'
+                for w, n, p, c in chunk
+            ])
+        else:
+            out.writelines([f"{w},{n},{p:.4f},{c / 100:.2f}\n" for w, n, p, c in chunk])
+        written += len(chunk)
+    return written
+
+
+def write_payout_manifest(summary: dict, rows: dict, merkle_dir: str) -> Optional[dict]:
+    """
+    Build the Merkle payout tree for a distribution and write its manifest files
+    to merkle_dir as <property_id>_<period>.{root.json,tree.bin,leaves.csv}.
+    
+    Holders whose payout rounds to zero cents get no leaf; when nobody is paid
+    there is nothing to publish and None is returned.
+    """
+    paying = np.flatnonzero(rows["amounts"])
+    if not len(paying):
+        return None
+    tree = PayoutMerkleTree(
+        summary["token_id"],
+        summary["period"],
+        [rows["wallets"][i] for i in paying.tolist()],
+        rows["amounts"][paying].tolist()
+    )
+    os.makedirs(merkle_dir, exist_ok=True)
+    return tree.write(os.path.join(merkle_dir, f"{summary['property_id']}_{summary['period']}"))
+
+
+def _csv_field(value: str) -> str:
+    """Quote a CSV field only when it needs it"""
+    if _NEEDS_QUOTING.search(value):
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+
+def generate_report(
     property_id: str,
     period: str,
-    gross_rent: Optional[float] = None
+    output_file: Optional[str] = None,
+    gross_rent: Optional[float] = None,
+    fmt: str = "json",
+    quiet: bool = False,
+    merkle_dir: Optional[str] = None
+):
+    """Generate and optionally save distribution report"""
+    if fmt != "json":
+        return stream_report(property_id, period, output_file, gross_rent, fmt, quiet, merkle_dir)
+    
+    report, rows = compute_distribution(property_id, period, gross_rent)
+    manifest = write_payout_manifest(report, rows, merkle_dir) if merkle_dir else None
+    attach_distributions(report, rows)
+    
+    if not quiet:
+        print_report_summary(report)
+        for dist in report["distributions"]:
+            print(f"  {dist['wallet_address']}: {dist['fractions']} fractions ({dist['percentage']:.1f}%) → €{dist['amount']:,.2f}")
+        print_report_footer(report)
+        if manifest:
+            print_payout_root(manifest)
+    
+    # Save to file if requested
+    if output_file:
+        with open(output_file, "w") as f:
+            json.dump(report, f, indent=2)
+        if not quiet:
+            print(f"Report saved to: {output_file}")
+    
+    return report
+
+
+def stream_report(
+    property_id: str,
+    period: str,
+    output_file: Optional[str] = None,
+    gross_rent: Optional[float] = None,
+    fmt: str = "jsonl",
+    quiet: bool = False,
+    merkle_dir: Optional[str] = None
 ) -> dict:
     """
-    Calculate rental distribution for a property.
+    Stream a distribution report as JSONL or CSV to output_file (or stdout).
     
-    Args:
-        property_id: Property identifier
-        period: Distribution period (YYYY-MM format)
-        gross_rent: Override monthly rent (optional)
-    
-    Returns:
-        Distribution report with breakdown per holder
+    Holder rows are never collected into one list, and the console only gets
+    the compact summary, so memory and runtime don't grow with console output.
     """
-    if property_id not in MOCK_PROPERTIES:
-        raise ValueError(f"Property {property_id} not found")
+    summary, rows = compute_distribution(property_id, period, gross_rent)
+    manifest = write_payout_manifest(summary, rows, merkle_dir) if merkle_dir else None
     
-    prop = MOCK_PROPERTIES[property_id]
-    token_id = prop["token_id"]
+    if output_file:
+        with open(output_file, "w", newline="") as f:
+            write_distribution_stream(summary, rows, f, fmt)
+    else:
+        write_distribution_stream(summary, rows, sys.stdout, fmt)
     
-    # Get gross rental income
-    gross_income = gross_rent or prop["monthly_rent"]
+    if not quiet:
+        # Keep stdout clean for the stream itself when no file was given
+        console = sys.stdout if output_file else sys.stderr
+        print_report_summary(summary, file=console)
+        print_report_footer(summary, file=console)
+        if manifest:
+            print_payout_root(manifest, file=console)
+        if output_file:
+            print(f"Report saved to: {output_file}", file=console)
     
-    # Calculate management fee
-    management_fee = gross_income * (prop["management_fee_percent"] / 100)
+    return summary
+
+
+def print_report_summary(report: dict, file=None):
+    """Print the report header and financial summary"""
+    print("\n" + "=" * 60, file=file)
+    print(f"RENTAL DISTRIBUTION REPORT", file=file)
+    print(f"Property: {report['property_name']}", file=file)
+    print(f"Period: {report['period']}", file=file)
+    print("=" * 60, file=file)
     
-    # Net income for distribution
-    net_income = gross_income - management_fee
+    summary = report["financial_summary"]
+    print(f"\nGross Rental Income:    €{summary['gross_rental_income']:,.2f}", file=file)
+    print(f"Management Fee ({summary['management_fee_percent']}%): -€{summary['management_fee_amount']:,.2f}", file=file)
+    print(f"Net Distributable:      €{summary['net_distributable_income']:,.2f}", file=file)
+    print(f"Income per Fraction:    €{summary['income_per_fraction']:.4f}", file=file)
     
-    # Income per fraction
-    income_per_fraction = net_income / prop["total_fractions"]
+    print(f"\nDistributions ({report['distribution_summary']['holder_count']} holders):", file=file)
+    print("-" * 60, file=file)
+
+
+def print_report_footer(report: dict, file=None):
+    """Print the distributed total closing a report"""
+    print("-" * 60, file=file)
+    print(f"Total Distributed: €{report['distribution_summary']['total_distributed']:,.2f}", file=file)
+    print("=" * 60 + "\n", file=file)
+
+
+def print_payout_root(manifest: dict, file=None):
+    """Print the Merkle payout root to publish on-chain"""
+    print(f"Payout Root: {manifest['root']} ({manifest['leaf_count']} claims)", file=file)
+
+
+def parse_periods(spec: str) -> list[str]:
+    """
+    Expand a period spec into a list of YYYY-MM periods.
     
-    # Get holders and calculate distributions
-    holders = MOCK_HOLDERS.get(token_id, [])
-    distributions = []
+    Accepts a single period ("2026-01") or an inclusive range ("2026-01..2026-12").
+    """
+    start, _, end = spec.partition("..")
+    try:
+        first = datetime.strptime(start, "%Y-%m")
+        last = datetime.strptime(end or start, "%Y-%m")
+    except ValueError:
+        raise ValueError(f"Invalid period '{spec}', expected YYYY-MM or YYYY-MM..YYYY-MM")
+    if last < first:
+        raise ValueError(f"Period range '{spec}' ends before it starts")
+    
+    periods = []
+    year, month = first.year, first.month
+    while (year, month) <= (last.year, last.month):
+        periods.append(f"{year:04d}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return periods
+
+
+def run_distribution_job(job: tuple) -> dict:
+    """
+    Calculate one (property, period) distribution and return its summary.
     
-    for holder in holders:
-        amount = holder["fractions"] * income_per_fraction
-        distributions.append({
-            "wallet_address": holder["wallet"],
-            "fractions": holder["fractions"],
-            "percentage": (holder["fractions"] / prop["total_fractions"]) * 100,
-            "amount": round(amount, 2)
-        })
+    Runs inside a worker process; only the compact summary travels back to the
+    parent, the full report is written to output_dir when one is given.
+    """
+    property_id, period, gross_rent, output_dir, fmt, merkle_dir = job
+    start = time.perf_counter()
+    try:
+        report, rows = compute_distribution(property_id, period, gross_rent)
+    except ValueError as e:
+        return {"property_id": property_id, "period": period, "status": "error", "error": str(e)}
     
-    # Sort by amount descending
-    distributions.sort(key=lambda x: x["amount"], reverse=True)
+    report_file = None
+    if output_dir:
+        report_file = os.path.join(output_dir, f"{property_id}_{period}.{fmt}")
+        with open(report_file, "w", newline="") as f:
+            if fmt == "json":
+                json.dump(attach_distributions(report, rows), f)
+            else:
+                write_distribution_stream(report, rows, f, fmt)
+    
+    manifest = write_payout_manifest(report, rows, merkle_dir) if merkle_dir else None
+    payout_root = manifest["root"] if manifest else None
     
     return {
         "property_id": property_id,
-        "property_name": prop["name"],
-        "token_id": token_id,
+        "property_name": report["property_name"],
         "period": period,
-        "generated_at": datetime.utcnow().isoformat(),
-        "financial_summary": {
-            "gross_rental_income": round(gross_income, 2),
-            "management_fee_percent": prop["management_fee_percent"],
-            "management_fee_amount": round(management_fee, 2),
-            "net_distributable_income": round(net_income, 2),
-            "income_per_fraction": round(income_per_fraction, 4)
-        },
-        "distribution_summary": {
-            "total_fractions": prop["total_fractions"],
-            "holder_count": len(distributions),
-            "total_distributed": round(sum(d["amount"] for d in distributions), 2)
-        },
-        "distributions": distributions
+        "status": "ok",
+        "net_distributable_income": report["financial_summary"]["net_distributable_income"],
+        "total_distributed": report["distribution_summary"]["total_distributed"],
+        "holder_count": report["distribution_summary"]["holder_count"],
+        "report_file": report_file,
+        "payout_root": payout_root,
+        "seconds": round(time.perf_counter() - start, 6)
     }
 
 
-def generate_report(property_id: str, period: str, output_file: Optional[str] = None):
-    """Generate and optionally save distribution report"""
-    report = calculate_distribution(property_id, period)
+def run_batch(
+    property_ids: list[str],
+    periods: list[str],
+    gross_rent: Optional[float] = None,
+    workers: Optional[int] = None,
+    output_dir: Optional[str] = None,
+    fmt: str = "json",
+    transfers_file: Optional[str] = None,
+    merkle_dir: Optional[str] = None
+) -> dict:
+    """
+    Fan distribution jobs for every (property, period) pair out over a process pool
+    and consolidate the per-job summaries into one report.
+    """
+    jobs = [(p, period, gross_rent, output_dir, fmt, merkle_dir) for p in property_ids for period in periods]
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
     
-    # Print summary
+    start = time.perf_counter()
+    if workers <= 1:
+        results = [run_distribution_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=load_transfer_history,
+            initargs=(transfers_file,)
+        ) as pool:
+            results = list(pool.map(run_distribution_job, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+    wall_seconds = time.perf_counter() - start
+    
+    ok = [r for r in results if r["status"] == "ok"]
+    return {
+        "generated_at": datetime.utcnow().isoformat(),
+        "job_count": len(jobs),
+        "failed_count": len(results) - len(ok),
+        "workers": workers,
+        "wall_seconds": round(wall_seconds, 6),
+        "total_distributed": round(sum(r["total_distributed"] for r in ok), 2),
+        "jobs": results
+    }
+
+
+def print_batch_summary(summary: dict):
+    """Print a per-job timing table for a batch run"""
     print("\n" + "=" * 60)
-    print(f"RENTAL DISTRIBUTION REPORT")
-    print(f"Property: {report['property_name']}")
-    print(f"Period: {report['period']}")
+    print(f"RENTAL DISTRIBUTION BATCH ({summary['job_count']} jobs, {summary['workers']} workers)")
     print("=" * 60)
-    
-    summary = report["financial_summary"]
-    print(f"\nGross Rental Income:    €{summary['gross_rental_income']:,.2f}")
-    print(f"Management Fee ({summary['management_fee_percent']}%): -€{summary['management_fee_amount']:,.2f}")
-    print(f"Net Distributable:      €{summary['net_distributable_income']:,.2f}")
-    print(f"Income per Fraction:    €{summary['income_per_fraction']:.4f}")
-    
-    print(f"\nDistributions ({report['distribution_summary']['holder_count']} holders):")
+    for job in summary["jobs"]:
+        if job["status"] == "ok":
+            print(f"  {job['property_id']} {job['period']}: €{job['total_distributed']:,.2f} "
+                  f"to {job['holder_count']} holders in {job['seconds'] * 1000:.1f} ms")
+        else:
+            print(f"  {job['property_id']} {job['period']}: ERROR {job['error']}")
     print("-" * 60)
-    
-    for dist in report["distributions"]:
-        print(f"  {dist['wallet_address']}: {dist['fractions']} fractions ({dist['percentage']:.1f}%) → €{dist['amount']:,.2f}")
-    
-    print("-" * 60)
-    print(f"Total Distributed: €{report['distribution_summary']['total_distributed']:,.2f}")
+    print(f"Total Distributed: €{summary['total_distributed']:,.2f}")
+    print(f"Failed Jobs: {summary['failed_count']}")
+    print(f"Wall Time: {summary['wall_seconds']:.3f} s")
     print("=" * 60 + "\n")
-    
-    # Save to file if requested
-    if output_file:
-        with open(output_file, "w") as f:
-            json.dump(report, f, indent=2)
-        print(f"Report saved to: {output_file}")
-    
-    return report
 
 
 def main():
     parser = argparse.ArgumentParser(
         description="Calculate monthly rental distributions for Domira properties"
     )
-    parser.add_argument(
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument(
         "--property-id",
-        required=True,
         help="Property ID (e.g., prop-001)"
     )
+    target.add_argument(
+        "--all-properties",
+        action="store_true",
+        help="Run distributions for every property"
+    )
     parser.add_argument(
         "--period",
         default=datetime.now().strftime("%Y-%m"),
-        help="Distribution period in YYYY-MM format"
+        help="Distribution period in YYYY-MM format, or a range like 2026-01..2026-12"
     )
     parser.add_argument(
         "--output",
-        help="Output JSON file path"
+        help="Output JSON file path (consolidated summary for multi-job runs)"
+    )
+    parser.add_argument(
+        "--output-dir",
+        help="Directory for per-job report files in multi-job runs"
+    )
+    parser.add_argument(
+        "--format",
+        choices=["json", "jsonl", "csv"],
+        default="json",
+        help="Report format; jsonl and csv stream holder rows instead of building the report in memory"
+    )
+    parser.add_argument(
+        "--merkle-dir",
+        help="Write a Merkle payout manifest (root, tree, leaves) per distribution to this directory"
+    )
+    parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="Suppress console output"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Worker processes for multi-job runs (default: CPU count)"
+    )
+    parser.add_argument(
+        "--transfers",
+        help="CSV of token_id,timestamp,from,to,amount transfers for time-weighted holder snapshots"
     )
     parser.add_argument(
         "--gross-rent",
@@ -184,11 +397,41 @@ def main():
     args = parser.parse_args()
     
     try:
-        generate_report(
-            property_id=args.property_id,
-            period=args.period,
-            output_file=args.output
+        load_transfer_history(args.transfers)
+        periods = parse_periods(args.period)
+        property_ids = list(MOCK_PROPERTIES) if args.all_properties else [args.property_id]
+        
+        if len(property_ids) == 1 and len(periods) == 1:
+            generate_report(
+                property_id=property_ids[0],
+                period=periods[0],
+                output_file=args.output,
+                gross_rent=args.gross_rent,
+                fmt=args.format,
+                quiet=args.quiet,
+                merkle_dir=args.merkle_dir
+            )
+            return
+        
+        summary = run_batch(
+            property_ids,
+            periods,
+            gross_rent=args.gross_rent,
+            workers=args.workers,
+            output_dir=args.output_dir,
+            fmt=args.format,
+            transfers_file=args.transfers,
+            merkle_dir=args.merkle_dir
         )
+        if not args.quiet:
+            print_batch_summary(summary)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(summary, f, indent=2)
+            if not args.quiet:
+                print(f"Summary saved to: {args.output}")
+        if summary["failed_count"]:
+            exit(1)
     except ValueError as e:
         print(f"Error: {e}")
         exit(1)
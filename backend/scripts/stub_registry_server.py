@@ -0,0 +1,113 @@
+"""
+Domira Backend - Stub Kadaster/BAG/PDOK Server
+
+Serves the three registries from one local HTTP server with injectable
+latency, failures and malformed answers, for exercising the concurrent
+passport fan-out without real registry access.
+
+Usage:
+    python -m scripts.stub_registry_server --port 8081 --latency kadaster=0.8 --fail pdok --invalid bag
+    # then run the API with
+    KADASTER_API_URL=http://localhost:8081/kadaster BAG_API_URL=http://localhost:8081/bag \
+    PDOK_API_URL=http://localhost:8081/pdok uvicorn app.main:app
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+import argparse
+import json
+import time
+
+from app.services.property_passport import generate_property_passport
+from app.services.registry_providers import BAGProvider, KadasterProvider, PDOKProvider
+
+PROVIDER_FIELDS = {
+    KadasterProvider.name: KadasterProvider.fields,
+    BAGProvider.name: BAGProvider.fields,
+    PDOKProvider.name: PDOKProvider.fields,
+}
+
+
+def make_handler(latency: dict[str, float], failing: set[str], invalid: Optional[set[str]] = None):
+    """Build a request handler with the given per-registry latency, failures and null-field answers"""
+    invalid = invalid or set()
+    
+    class RegistryHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            registry = url.path.strip("/")
+            if registry not in PROVIDER_FIELDS:
+                self.send_error(404, "Unknown registry")
+                return
+            
+            time.sleep(latency.get(registry, 0.0))
+            if registry in failing:
+                self.send_error(503, f"{registry} unavailable")
+                return
+            
+            query = {k: v[0] for k, v in parse_qs(url.query).items()}
+            passport = generate_property_passport(
+                query.get("address", ""),
+                query.get("postal_code"),
+                query.get("city", "Almere")
+            ).model_dump()
+            if registry in invalid:
+                body = json.dumps({f: None for f in PROVIDER_FIELDS[registry]}).encode()
+            else:
+                body = json.dumps({f: passport[f] for f in PROVIDER_FIELDS[registry]}).encode()
+            
+            try:
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # client gave up after its timeout
+        
+        def log_message(self, format, *args):
+            pass
+    
+    return RegistryHandler
+
+
+def parse_latency(values: list[str]) -> dict[str, float]:
+    """Parse name=seconds pairs"""
+    latency = {}
+    for value in values:
+        name, _, seconds = value.partition("=")
+        latency[name] = float(seconds)
+    return latency
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub Dutch registry server")
+    parser.add_argument("--port", type=int, default=8081, help="Port to listen on")
+    parser.add_argument(
+        "--latency",
+        action="append",
+        default=[],
+        help="Injected latency per registry, e.g. kadaster=0.8 (repeatable)"
+    )
+    parser.add_argument(
+        "--fail",
+        action="append",
+        default=[],
+        help="Registry that answers 503 (repeatable)"
+    )
+    parser.add_argument(
+        "--invalid",
+        action="append",
+        default=[],
+        help="Registry that answers 200 with every field null (repeatable)"
+    )
+    args = parser.parse_args()
+    
+    handler = make_handler(parse_latency(args.latency), set(args.fail), set(args.invalid))
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), handler)
+    print(f"Stub registries on http://127.0.0.1:{args.port}/{{kadaster,bag,pdok}}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Domira Backend - LRU/TTL Cache Tests
+Eviction order, per-entry expiry and counters, on a controlled clock
+"""
+import pytest
+
+from app.services import cache
+from app.services.cache import LRUTTLCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+    
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(cache, "time", clock)
+    return clock
+
+
+def test_entries_expire_after_their_ttl(clock):
+    lru = LRUTTLCache(max_entries=10, ttl_seconds=60)
+    lru.set("a", 1)
+    
+    clock.now += 59
+    assert lru.get("a") == 1
+    clock.now += 1
+    assert lru.get("a") is None
+    
+    assert len(lru) == 0
+    assert lru.stats()["expirations"] == 1
+
+
+def test_set_refreshes_the_ttl(clock):
+    lru = LRUTTLCache(max_entries=10, ttl_seconds=60)
+    lru.set("a", 1)
+    clock.now += 50
+    lru.set("a", 2)
+    clock.now += 50
+    
+    assert lru.get("a") == 2
+
+
+def test_without_ttl_entries_never_expire(clock):
+    lru = LRUTTLCache(max_entries=10, ttl_seconds=None)
+    lru.set("a", 1)
+    clock.now += 10**9
+    
+    assert lru.get("a") == 1
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    lru = LRUTTLCache(max_entries=2, ttl_seconds=60)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    lru.get("a")  # b is now the least recently used
+    lru.set("c", 3)
+    
+    assert lru.get("b") is None
+    assert (lru.get("a"), lru.get("c")) == (1, 3)
+    assert lru.stats()["evictions"] == 1
+
+
+def test_values_skip_expired_entries(clock):
+    lru = LRUTTLCache(max_entries=10, ttl_seconds=60)
+    lru.set("old", 1)
+    clock.now += 30
+    lru.set("new", 2)
+    clock.now += 30
+    
+    assert lru.values() == [2]
+
+
+def test_stats_count_hits_and_misses(clock):
+    lru = LRUTTLCache(max_entries=10, ttl_seconds=60)
+    lru.set("a", 1)
+    lru.get("a")
+    lru.get("a")
+    lru.get("b")
+    
+    stats = lru.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (2, 1, 1)
+    assert stats["hit_ratio"] == pytest.approx(2 / 3)
@@ -0,0 +1,224 @@
+"""
+Domira Backend - Multi-Worker Coherence Tests
+Several worker processes import the app with one shared COHERENCE_JOURNAL (as
+`uvicorn --workers N` would); writes through one worker must be visible on
+the others on their next request, and ETags must mean the same content on
+every worker
+"""
+import multiprocessing as mp
+import os
+import time
+
+import pytest
+
+API = "/api/v1"
+WORKERS = 3
+
+
+def worker(journal: str, conn):
+    """Serve (method, path, json, headers) commands from the parent through the app in this process"""
+    os.environ["COHERENCE_JOURNAL"] = journal
+    from fastapi.testclient import TestClient
+    from app.main import app
+    
+    with TestClient(app) as client:
+        conn.send("ready")
+        while True:
+            command = conn.recv()
+            if command is None:
+                break
+            method, path, body, headers = command
+            response = client.request(method, path, json=body, headers=headers)
+            conn.send((response.status_code, response.headers.get("etag"), response.json() if response.content else None))
+
+
+class Workers:
+    def __init__(self, count: int, journal: str):
+        ctx = mp.get_context("spawn")
+        self.conns = []
+        self.procs = []
+        for _ in range(count):
+            parent, child = ctx.Pipe()
+            proc = ctx.Process(target=worker, args=(journal, child), daemon=True)
+            proc.start()
+            self.conns.append(parent)
+            self.procs.append(proc)
+        for conn in self.conns:
+            assert conn.recv() == "ready"
+    
+    def request(self, i: int, method: str, path: str, body=None, headers=None) -> tuple[int, str, object]:
+        """(status, etag, json body) of one request through worker i"""
+        self.conns[i].send((method, path, body, headers))
+        return self.conns[i].recv()
+    
+    def call(self, i: int, method: str, path: str, body=None) -> tuple[int, object]:
+        status, _, body = self.request(i, method, path, body)
+        return status, body
+    
+    def close(self):
+        for conn in self.conns:
+            conn.send(None)
+        for proc in self.procs:
+            proc.join(timeout=10)
+
+
+@pytest.fixture(scope="module")
+def journal(tmp_path_factory) -> str:
+    return str(tmp_path_factory.mktemp("coherence") / "journal.jsonl")
+
+
+@pytest.fixture(scope="module")
+def workers(journal):
+    workers = Workers(WORKERS, journal)
+    yield workers
+    workers.close()
+
+
+def wait_visible(workers: Workers, writer: int, path: str, check, timeout: float = 5.0):
+    """Poll every other worker until check(status, body) holds"""
+    start = time.perf_counter()
+    for i in range(len(workers.conns)):
+        if i == writer:
+            continue
+        while True:
+            status, body = workers.call(i, "GET", path)
+            if check(status, body):
+                break
+            assert time.perf_counter() - start < timeout, f"worker {i}: GET {path} still stale: {status} {body}"
+            time.sleep(0.001)
+
+
+def held(portfolio: dict) -> int:
+    return sum(h["fractions_held"] for h in portfolio["holdings"])
+
+
+def create_property(workers: Workers, i: int, name: str) -> dict:
+    status, prop = workers.call(i, "POST", f"{API}/properties/", {
+        "name": name, "description": "x", "address": f"{name} 1",
+        "asking_price": 1_000_000, "total_fractions": 1000, "price_per_fraction": 1000, "expected_yield": 5.0
+    })
+    assert status == 201, prop
+    return prop
+
+
+def test_writes_are_visible_on_every_worker(workers):
+    prop = create_property(workers, 0, "Marktplein")
+    wait_visible(workers, 0, f"{API}/properties/{prop['id']}", lambda s, b: s == 200)
+    
+    last = WORKERS - 1
+    status, listing = workers.call(last, "POST", f"{API}/marketplace/listings", {
+        "property_id": prop["id"], "fractions": 100, "price_per_fraction": 1100
+    })
+    assert status == 201, listing
+    wait_visible(workers, last, f"{API}/marketplace/listings/{listing['id']}", lambda s, b: s == 200)
+    
+    status, buyer = workers.call(1, "POST", f"{API}/users/", {
+        "email": "buyer@example.com", "full_name": "Coherence Buyer", "wallet_address": "0x" + "d4" * 20
+    })
+    assert status == 201, buyer
+    wait_visible(workers, 1, f"{API}/users/{buyer['id']}", lambda s, b: s == 200)
+    
+    # Fill on worker 0: listing, buyer portfolio and trade stats everywhere
+    status, fill = workers.call(0, "POST", f"{API}/marketplace/buy", {
+        "listing_id": listing["id"], "fractions": 40, "buyer_id": buyer["id"]
+    })
+    assert status == 200, fill
+    wait_visible(workers, 0, f"{API}/marketplace/listings/{listing['id']}", lambda s, b: b["fractions"] == 60)
+    wait_visible(workers, 0, f"{API}/users/{buyer['id']}/portfolio", lambda s, b: s == 200 and held(b) == 40)
+    wait_visible(workers, 0, f"{API}/marketplace/{prop['id']}/stats", lambda s, b: b["trade_count"] == 1)
+    
+    # The writer keeps exactly one copy of its own fill (non-idempotent events are not replayed)
+    status, portfolio = workers.call(0, "GET", f"{API}/users/{buyer['id']}/portfolio")
+    assert held(portfolio) == 40, portfolio
+
+
+def test_rent_change_invalidates_cached_distributions(workers):
+    period = f"{API}/properties/prop-001/distributions/2026-01"
+    for i in range(WORKERS):
+        workers.call(i, "GET", period)  # warm every worker's distribution cache
+    
+    status, body = workers.call(1, "PATCH", f"{API}/properties/prop-001/rent?monthly_rent=20000")
+    assert status == 200, body
+    wait_visible(workers, 1, period, lambda s, b: b["gross_rental_income"] == 20000)
+
+
+def test_woz_revaluation_reaches_every_worker(workers):
+    prop = create_property(workers, 0, "Stadhuisplein")
+    _, passport = workers.call(0, "GET", f"{API}/properties/{prop['id']}/passport")
+    year = passport["woz_year"] + 1
+    
+    status, body = workers.call(0, "POST", f"{API}/properties/woz-revaluation?woz_year={year}")
+    assert status == 200, body
+    wait_visible(workers, 0, f"{API}/properties/{prop['id']}/passport", lambda s, b: b["woz_year"] == year)
+
+
+def test_etags_agree_across_workers(workers):
+    path = f"{API}/properties/?fields=name"
+    create_property(workers, 0, "Grote Markt")
+    
+    etags = {workers.request(i, "GET", path)[1] for i in range(WORKERS)}
+    assert len(etags) == 1, etags
+    
+    prop = create_property(workers, 0, "Kleine Markt")
+    etag = workers.request(0, "GET", f"{API}/properties/{prop['id']}")[1]
+    for i in range(1, WORKERS):
+        status, entity_etag, _ = workers.request(i, "GET", f"{API}/properties/{prop['id']}", headers={"If-None-Match": etag})
+        assert (status, entity_etag) == (304, etag)
+
+
+def test_no_stale_304_from_another_worker(tmp_path):
+    # Fresh journal: worker A writes twice, then twice more; B must not treat A's first ETag as current
+    pair = Workers(2, str(tmp_path / "journal.jsonl"))
+    try:
+        path = f"{API}/properties/?fields=name"
+        create_property(pair, 0, "Havenplein")
+        create_property(pair, 0, "Havenkade")
+        status, etag, rows = pair.request(0, "GET", path)
+        assert status == 200 and len(rows) == 2
+        
+        create_property(pair, 0, "Havenstraat")
+        create_property(pair, 0, "Havenweg")
+        status, new_etag, new_rows = pair.request(1, "GET", path, headers={"If-None-Match": etag})
+        assert status == 200, "worker 1 answered 304 for content that changed"
+        assert new_etag != etag and len(new_rows) == 4
+        assert pair.request(0, "GET", path)[1] == new_etag
+    finally:
+        pair.close()
+
+
+def test_late_worker_replays_the_journal(workers, journal):
+    status, buyer = workers.call(0, "POST", f"{API}/users/", {
+        "email": "late@example.com", "full_name": "Late", "wallet_address": "0x" + "e5" * 20
+    })
+    prop = create_property(workers, 0, "Vismarkt")
+    _, listing = workers.call(0, "POST", f"{API}/marketplace/listings", {
+        "property_id": prop["id"], "fractions": 10, "price_per_fraction": 1000
+    })
+    workers.call(0, "POST", f"{API}/marketplace/buy", {"listing_id": listing["id"], "fractions": 10, "buyer_id": buyer["id"]})
+    _, etag, _ = workers.request(0, "GET", f"{API}/properties/?fields=name")
+    
+    # A worker started now (or restarted) rebuilds the same state and the same versions
+    late = Workers(1, journal)
+    try:
+        status, portfolio = late.call(0, "GET", f"{API}/users/{buyer['id']}/portfolio")
+        assert status == 200 and held(portfolio) == 10, portfolio
+        status, _, _ = late.request(0, "GET", f"{API}/properties/?fields=name", headers={"If-None-Match": etag})
+        assert status == 304
+    finally:
+        late.close()
+
+
+def test_etags_change_across_restarts_without_a_journal():
+    journal_free = Workers(1, "")
+    try:
+        path = f"{API}/properties/?fields=name"
+        _, first, _ = journal_free.request(0, "GET", path)
+    finally:
+        journal_free.close()
+    
+    restarted = Workers(1, "")
+    try:
+        status, second, _ = restarted.request(0, "GET", path, headers={"If-None-Match": first})
+    finally:
+        restarted.close()
+    assert status == 200 and second != first
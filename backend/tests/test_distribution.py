@@ -0,0 +1,124 @@
+"""
+Domira Backend - Rental Distribution Tests
+The exact-cent split, the distribution cache and rent changes through the API
+"""
+import uuid
+
+from fastapi.testclient import TestClient
+import numpy as np
+import pytest
+
+from app.main import app
+from app.services import rate_limit
+from app.services.distribution import (
+    allocate_cents, distribution_cache, record_holder_transfer, register_properties, set_monthly_rent
+)
+
+API = "/api/v1"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(rate_limit.settings, "rate_limit_enabled", False)  # many writes from one test client
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_allocate_cents_conserves_and_rounds_to_the_nearest_cent(seed):
+    rng = np.random.default_rng(seed)
+    weights = rng.integers(0, 10_000, size=1_000)
+    total_weight = int(weights.sum()) + int(rng.integers(0, 10_000))  # part of the supply may be unheld
+    net_cents = int(rng.integers(1, 10**9))
+    
+    amounts = allocate_cents(weights, net_cents, total_weight)
+    
+    assert int(amounts.sum()) == net_cents * int(weights.sum()) // total_weight
+    exact_floor = weights.astype(object) * net_cents // total_weight
+    assert all(0 <= int(a) - f <= 1 for a, f in zip(amounts, exact_floor))
+
+
+def test_allocate_cents_pays_everything_when_fully_held():
+    amounts = allocate_cents(np.array([200, 150, 100, 50, 500]), 1_062_500, 1000)
+    
+    assert amounts.tolist() == [212_500, 159_375, 106_250, 53_125, 531_250]
+
+
+def test_allocate_cents_gives_leftover_cents_to_the_largest_remainders_then_earliest():
+    assert allocate_cents(np.array([1, 1, 1]), 100, 3).tolist() == [34, 33, 33]
+    assert allocate_cents(np.array([1, 2]), 100, 3).tolist() == [33, 67]
+
+
+def test_allocate_cents_is_exact_when_products_overflow_int64():
+    weights = np.array([2**40, 3, 2**40 + 7])
+    net_cents = 2**40
+    
+    amounts = allocate_cents(weights, net_cents, int(weights.sum()))
+    
+    assert int(amounts.sum()) == net_cents
+    assert [int(a) for a in amounts] == [2**39 - 2, 1, 2**39 + 1]
+
+
+@pytest.mark.parametrize("weights, total_weight", [([5, -1], 10), ([6, 6], 10), ([1], 0)])
+def test_allocate_cents_rejects_inconsistent_weights(weights, total_weight):
+    with pytest.raises(ValueError):
+        allocate_cents(np.array(weights), 100, total_weight)
+
+
+@pytest.mark.parametrize("monthly_rent", ["0", "-5", "nan", "inf"])
+def test_invalid_rent_is_rejected(client, monthly_rent):
+    period = f"{API}/properties/prop-001/distributions/2026-01"
+    before = client.get(period).json()["gross_rental_income"]
+    
+    response = client.patch(f"{API}/properties/prop-001/rent?monthly_rent={monthly_rent}")
+    
+    assert response.status_code == 422
+    assert client.get(period).json()["gross_rental_income"] == before
+
+
+@pytest.fixture
+def cached_property() -> str:
+    """A fresh distributable property with one holder since before 2026-01"""
+    property_id = f"cache-test-{uuid.uuid4()}"
+    register_properties([{
+        "id": property_id, "name": "Cache Test", "token_id": None,
+        "total_fractions": 100, "asking_price": 1_200_000, "expected_yield": 10.0
+    }])
+    set_monthly_rent(property_id, 1000.0)
+    record_holder_transfer(property_id, None, "0xfirst", 100, 0, 0)
+    return property_id
+
+
+def test_cached_distribution_is_reused_until_something_changes(cached_property):
+    entry = distribution_cache.get(cached_property, "2026-01")
+    
+    assert distribution_cache.get(cached_property, "2026-01") is entry
+
+
+def test_rent_change_invalidates_the_cached_distribution(cached_property):
+    before = distribution_cache.get(cached_property, "2026-01")
+    
+    set_monthly_rent(cached_property, 2000.0)
+    after = distribution_cache.get(cached_property, "2026-01")
+    
+    assert after is not before
+    assert after["summary"]["financial_summary"]["gross_rental_income"] == 2000.0
+
+
+def test_holding_change_invalidates_the_cached_distribution(cached_property):
+    before = distribution_cache.get(cached_property, "2026-01")
+    
+    record_holder_transfer(cached_property, "0xfirst", "0xsecond", 40, 40, 0)
+    after = distribution_cache.get(cached_property, "2026-01")
+    
+    assert after is not before
+    assert set(after["wallet_index"]) == {"0xfirst", "0xsecond"}
+
+
+def test_rent_patch_is_served_by_the_distribution_endpoint(client):
+    period = f"{API}/properties/prop-002/distributions/2026-01"
+    client.get(period)
+    
+    assert client.patch(f"{API}/properties/prop-002/rent?monthly_rent=9000").status_code == 200
+    
+    assert client.get(period).json()["gross_rental_income"] == 9000
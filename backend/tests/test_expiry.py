@@ -0,0 +1,105 @@
+"""
+Domira Backend - Listing Expiry Tests
+The deadline heap behind listing expiry, and the sweep through the API
+"""
+from datetime import datetime, timedelta
+import time
+
+from fastapi.testclient import TestClient
+import pytest
+
+from app.api.marketplace import expire_due_listings
+from app.main import app
+from app.services import rate_limit
+from app.services.expiry import ExpiryQueue
+
+API = "/api/v1"
+
+
+def test_due_keys_pop_in_deadline_order():
+    queue = ExpiryQueue()
+    for key, deadline in [("c", 30.0), ("a", 10.0), ("d", 40.0), ("b", 20.0)]:
+        queue.schedule(key, deadline)
+    
+    assert queue.pop_due(25.0) == ["a", "b"]
+    assert queue.pop_due(25.0) == []
+    assert len(queue) == 2
+
+
+def test_cancelled_and_rescheduled_keys():
+    queue = ExpiryQueue()
+    queue.schedule("cancelled", 10.0)
+    queue.schedule("moved", 10.0)
+    queue.schedule("kept", 15.0)
+    queue.cancel("cancelled")
+    queue.schedule("moved", 50.0)
+    
+    assert queue.pop_due(20.0) == ["kept"]
+    assert queue.pop_due(60.0) == ["moved"]
+
+
+def test_heap_rebuild_after_mass_cancellation_keeps_live_keys():
+    queue = ExpiryQueue()
+    for i in range(5_000):
+        queue.schedule(f"k{i}", float(i))
+    for i in range(0, 5_000, 2):
+        queue.cancel(f"k{i}")
+    
+    due = queue.pop_due(100.0)
+    
+    assert due == [f"k{i}" for i in range(1, 101, 2)]
+    assert len(queue) == 2_500 - 50
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(rate_limit.settings, "rate_limit_enabled", False)  # many writes from one test client
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def property_id(client) -> str:
+    return client.post(f"{API}/properties/", json={
+        "name": "Lumiere", "description": "x", "address": "Lumiere 1",
+        "asking_price": 1_000_000, "total_fractions": 1000, "price_per_fraction": 1000, "expected_yield": 5.0
+    }).json()["id"]
+
+
+def create_listing(client: TestClient, property_id: str, expires_in: timedelta) -> dict:
+    response = client.post(f"{API}/marketplace/listings", json={
+        "property_id": property_id,
+        "fractions": 10,
+        "price_per_fraction": 1000,
+        "expires_at": (datetime.utcnow() + expires_in).isoformat()
+    })
+    assert response.status_code == 201, response.json()
+    return response.json()
+
+
+def status_of(client: TestClient, listing: dict) -> str:
+    return client.get(f"{API}/marketplace/listings/{listing['id']}").json()["status"]
+
+
+def test_sweep_expires_only_listings_past_their_deadline(client, property_id):
+    soon = create_listing(client, property_id, timedelta(hours=1))
+    later = create_listing(client, property_id, timedelta(hours=3))
+    cancelled = create_listing(client, property_id, timedelta(hours=1))
+    client.delete(f"{API}/marketplace/listings/{cancelled['id']}")
+    
+    expire_due_listings(now=time.time() + 2 * 3600)
+    
+    assert status_of(client, soon) == "expired"
+    assert status_of(client, later) == "active"
+    assert status_of(client, cancelled) == "cancelled"
+    active = {listing["id"] for listing in client.get(f"{API}/marketplace/listings").json()}
+    assert soon["id"] not in active and later["id"] in active
+
+
+def test_listing_deadline_must_be_in_the_future(client, property_id):
+    response = client.post(f"{API}/marketplace/listings", json={
+        "property_id": property_id, "fractions": 10, "price_per_fraction": 1000,
+        "expires_at": (datetime.utcnow() - timedelta(minutes=1)).isoformat()
+    })
+    
+    assert response.status_code == 400
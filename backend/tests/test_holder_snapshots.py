@@ -0,0 +1,83 @@
+"""
+Domira Backend - Holder Snapshot Tests
+Time-weighted holdings over a period from a transfer history
+"""
+import pytest
+
+from app.services.distribution import compute_distribution, record_holder_transfer, register_properties
+from app.services.holder_snapshots import ZERO_ADDRESS, HolderSnapshotStore, period_bounds
+
+START, END = period_bounds("2026-01")
+SECONDS = END - START
+TOKEN = 7
+
+
+def weights_by_wallet(store: HolderSnapshotStore, period: str = "2026-01") -> dict:
+    wallets, weights, _ = store.time_weighted_holdings(TOKEN, period)
+    return dict(zip(wallets, weights.tolist()))
+
+
+def test_mid_month_transfer_is_weighted_by_time_held():
+    store = HolderSnapshotStore()
+    transfer_at = START + SECONDS // 4
+    store.add_transfers(TOKEN, [
+        (START - 86_400, ZERO_ADDRESS, "0xseller", 400),
+        (transfer_at, "0xseller", "0xbuyer", 100)
+    ])
+    
+    weights = weights_by_wallet(store)
+    
+    assert weights["0xbuyer"] == 100 * (END - transfer_at)
+    assert weights["0xseller"] == 400 * SECONDS - 100 * (END - transfer_at)
+    assert sum(weights.values()) == 400 * SECONDS  # supply held over the period is conserved
+
+
+def test_transfers_outside_the_period():
+    store = HolderSnapshotStore()
+    store.add_transfers(TOKEN, [
+        (START - 1, ZERO_ADDRESS, "0xearly", 10),
+        (END, ZERO_ADDRESS, "0xlate", 10)
+    ])
+    
+    assert weights_by_wallet(store) == {"0xearly": 10 * SECONDS}
+    assert weights_by_wallet(store, "2026-02")["0xlate"] == 10 * (period_bounds("2026-02")[1] - END)
+
+
+def test_late_batches_are_put_back_in_time_order():
+    store = HolderSnapshotStore()
+    store.add_transfers(TOKEN, [(START + 100, ZERO_ADDRESS, "0xa", 10)])
+    store.add_transfers(TOKEN, [(START + 50, ZERO_ADDRESS, "0xb", 5), (START + 10, ZERO_ADDRESS, "0xc", 1)])
+    
+    assert weights_by_wallet(store) == {
+        "0xa": 10 * (SECONDS - 100),
+        "0xb": 5 * (SECONDS - 50),
+        "0xc": SECONDS - 10
+    }
+
+
+def test_history_built_one_transfer_at_a_time():
+    store = HolderSnapshotStore()
+    for i in range(1_000):  # well past the initial buffer capacity
+        store.add_transfers(TOKEN, [(START + i, ZERO_ADDRESS, f"0x{i % 10}", 1)])
+    
+    weights = weights_by_wallet(store)
+    
+    assert len(weights) == 10
+    assert sum(weights.values()) == sum(SECONDS - i for i in range(1_000))
+
+
+def test_distribution_pays_a_mid_month_buyer_pro_rata():
+    register_properties([{
+        "id": "snapshot-test", "name": "Snapshot Test", "token_id": None,
+        "total_fractions": 1000, "asking_price": 1_200_000, "expected_yield": 10.0
+    }])
+    record_holder_transfer("snapshot-test", None, "0xseller", 1000, 0, START - 1)
+    record_holder_transfer("snapshot-test", "0xseller", "0xbuyer", 500, 500, START + SECONDS // 2)
+    
+    summary, rows = compute_distribution("snapshot-test", "2026-01")
+    amounts = dict(zip(rows["wallets"], rows["amounts"].tolist()))
+    
+    net_cents = round(summary["financial_summary"]["net_distributable_income"] * 100)
+    assert sum(amounts.values()) == net_cents
+    assert amounts["0xbuyer"] == pytest.approx(net_cents / 4, abs=1)
+    assert amounts["0xseller"] == pytest.approx(net_cents * 3 / 4, abs=1)
@@ -0,0 +1,87 @@
+"""
+Domira Backend - Marketplace Tests
+Buy orders against the per-wallet holding cap (the contract's _checkMaxHolding)
+"""
+from fastapi.testclient import TestClient
+import pytest
+
+from app.main import app
+from app.services import rate_limit
+
+API = "/api/v1"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(rate_limit.settings, "rate_limit_enabled", False)  # many writes from one test client
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def listing(client) -> dict:
+    """500 of a 1000-fraction property for sale; the cap is 200 per wallet"""
+    prop = client.post(f"{API}/properties/", json={
+        "name": "Weerwater", "description": "x", "address": "Weerwater 1",
+        "asking_price": 1_000_000, "total_fractions": 1000, "price_per_fraction": 1000, "expected_yield": 5.0
+    }).json()
+    return client.post(f"{API}/marketplace/listings", json={
+        "property_id": prop["id"], "fractions": 500, "price_per_fraction": 1000
+    }).json()
+
+
+def create_user(client: TestClient, email: str, wallet=None) -> str:
+    return client.post(f"{API}/users/", json={"email": email, "full_name": "Buyer", "wallet_address": wallet}).json()["id"]
+
+
+def buy(client: TestClient, listing: dict, buyer_id, fractions: int):
+    body = {"listing_id": listing["id"], "fractions": fractions}
+    if buyer_id is not None:
+        body["buyer_id"] = buyer_id
+    return client.post(f"{API}/marketplace/buy", json=body)
+
+
+def remaining(client: TestClient, listing: dict) -> int:
+    return client.get(f"{API}/marketplace/listings/{listing['id']}").json()["fractions"]
+
+
+def test_buy_is_capped_per_wallet(client, listing):
+    buyer = create_user(client, "capped@example.com", "0x" + "11" * 20)
+    
+    assert buy(client, listing, buyer, 150).status_code == 200
+    response = buy(client, listing, buyer, 51)
+    
+    assert response.status_code == 400
+    assert "Exceeds max holding" in response.json()["detail"]
+    assert remaining(client, listing) == 350
+
+
+def test_users_sharing_a_wallet_share_the_cap(client, listing):
+    first = create_user(client, "first-buyer@example.com", "0x" + "22" * 20)
+    second = create_user(client, "second-buyer@example.com", "0x" + "22" * 20)
+    
+    assert buy(client, listing, first, 150).status_code == 200
+    assert buy(client, listing, second, 100).status_code == 400
+    assert buy(client, listing, second, 50).status_code == 200
+
+
+def test_changing_wallet_moves_the_balance(client, listing):
+    old_wallet, new_wallet = "0x" + "33" * 20, "0x" + "44" * 20
+    mover = create_user(client, "mover@example.com", old_wallet)
+    stayer = create_user(client, "stayer@example.com", old_wallet)
+    assert buy(client, listing, mover, 200).status_code == 200
+    assert buy(client, listing, stayer, 1).status_code == 400
+    
+    assert client.patch(f"{API}/users/{mover}/wallet?wallet_address={new_wallet}").status_code == 200
+    
+    assert buy(client, listing, stayer, 200).status_code == 200
+    assert buy(client, listing, mover, 1).status_code == 400
+
+
+@pytest.mark.parametrize("buyer, status", [(None, 422), ("no-such-user", 404), ("walletless", 400)])
+def test_buys_without_a_wallet_are_rejected(client, listing, buyer, status):
+    if buyer == "walletless":
+        buyer = create_user(client, "walletless@example.com")
+    
+    assert buy(client, listing, buyer, 10).status_code == status
+    assert remaining(client, listing) == 500
@@ -0,0 +1,68 @@
+"""
+Domira Backend - Merkle Payout Manifest Tests
+Proofs from in-memory trees and written manifests verify against the root
+"""
+import numpy as np
+import pytest
+
+from app.services.merkle import PayoutManifest, PayoutMerkleTree, leaf_hash, verify_proof
+from scripts.rental_distribution import write_payout_manifest
+
+TOKEN = 3
+PERIOD = "2026-01"
+
+
+def payouts(count: int) -> tuple[list[str], list[int]]:
+    return [f"0x{i + 1:040x}" for i in range(count)], [1_000 + i for i in range(count)]
+
+
+@pytest.mark.parametrize("count", [1, 2, 3, 5, 8, 9])
+def test_every_leaf_verifies(count):
+    wallets, amounts = payouts(count)
+    tree = PayoutMerkleTree(TOKEN, PERIOD, wallets, amounts)
+    
+    for wallet, amount in zip(wallets, amounts):
+        assert verify_proof(leaf_hash(wallet, TOKEN, PERIOD, amount), tree.proof(wallet), tree.root)
+
+
+def test_tampered_claims_do_not_verify():
+    wallets, amounts = payouts(5)
+    tree = PayoutMerkleTree(TOKEN, PERIOD, wallets, amounts)
+    proof = tree.proof(wallets[2])
+    
+    assert not verify_proof(leaf_hash(wallets[2], TOKEN, PERIOD, amounts[2] + 1), proof, tree.root)
+    assert not verify_proof(leaf_hash(wallets[3], TOKEN, PERIOD, amounts[2]), proof, tree.root)
+    assert not verify_proof(leaf_hash(wallets[2], TOKEN, "2026-02", amounts[2]), proof, tree.root)
+
+
+def test_duplicate_wallets_are_rejected():
+    with pytest.raises(ValueError):
+        PayoutMerkleTree(TOKEN, PERIOD, ["0xa", "0xa"], [1, 2])
+
+
+def test_written_manifest_serves_the_same_proofs(tmp_path):
+    wallets, amounts = payouts(7)
+    tree = PayoutMerkleTree(TOKEN, PERIOD, wallets, amounts)
+    manifest = tree.write(str(tmp_path / "payouts"))
+    
+    reader = PayoutManifest(str(tmp_path / "payouts"))
+    try:
+        claim = reader.claim(wallets[4])
+        missing = reader.claim("0x" + "ff" * 20)
+    finally:
+        reader.close()
+    
+    assert manifest["total_amount_cents"] == sum(amounts)
+    assert claim["amount_cents"] == amounts[4]
+    proof = [bytes.fromhex(node[2:]) for node in claim["proof"]]
+    assert proof == tree.proof(wallets[4])
+    assert verify_proof(leaf_hash(wallets[4], TOKEN, PERIOD, amounts[4]), proof, bytes.fromhex(claim["root"][2:]))
+    assert missing is None
+
+
+def test_no_manifest_when_nobody_is_paid(tmp_path):
+    summary = {"property_id": "prop-x", "token_id": TOKEN, "period": PERIOD}
+    rows = {"wallets": ["0xa", "0xb"], "amounts": np.zeros(2, dtype=np.int64)}
+    
+    assert write_payout_manifest(summary, rows, str(tmp_path)) is None
+    assert list(tmp_path.iterdir()) == []
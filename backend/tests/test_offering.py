@@ -0,0 +1,132 @@
+"""
+Domira Backend - Primary Offering Tests
+Opening, allocating and minting a property's primary offering through the API
+"""
+from fastapi.testclient import TestClient
+import pytest
+
+from app.api.users import update_user_kyc_status
+from app.main import app
+from app.models.schemas import KYCStatus
+from app.services import rate_limit
+
+API = "/api/v1"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(rate_limit.settings, "rate_limit_enabled", False)  # many writes from one test client
+    with TestClient(app) as client:
+        yield client
+
+
+def create_property(client: TestClient, token_id=None) -> dict:
+    prop = client.post(f"{API}/properties/", json={
+        "name": "Esplanade", "description": "x", "address": "Esplanade 1",
+        "asking_price": 1_000_000, "total_fractions": 1000, "price_per_fraction": 1000, "expected_yield": 5.0
+    }).json()
+    if token_id is not None:
+        assert client.patch(f"{API}/properties/{prop['id']}/token?token_id={token_id}").status_code == 200
+    return prop
+
+
+def verified_user(client: TestClient, email: str, wallet: str) -> str:
+    user = client.post(f"{API}/users/", json={"email": email, "full_name": "Subscriber"}).json()
+    assert client.patch(f"{API}/users/{user['id']}/wallet?wallet_address={wallet}").status_code == 200
+    update_user_kyc_status(user["id"], KYCStatus.VERIFIED)
+    return user["id"]
+
+
+def test_offering_requires_a_token_id(client):
+    prop = create_property(client)
+    
+    response = client.post(f"{API}/properties/{prop['id']}/offering", json={})
+    
+    assert response.status_code == 409
+
+
+def test_users_sharing_a_wallet_share_its_cap(client):
+    prop = create_property(client, token_id=41)
+    shared = "0x" + "a1" * 20
+    first = verified_user(client, "first@example.com", shared)
+    second = verified_user(client, "second@example.com", "0x" + "A1" * 20)  # same wallet, checksum case
+    other = verified_user(client, "other@example.com", "0x" + "b2" * 20)
+    
+    assert client.post(f"{API}/properties/{prop['id']}/offering", json={"fractions": 600}).status_code == 201
+    for user_id in (first, second, other):
+        response = client.post(f"{API}/properties/{prop['id']}/offering/subscriptions", json={
+            "user_id": user_id, "fractions": 200
+        })
+        assert response.status_code == 200, response.json()
+    report = client.post(f"{API}/properties/{prop['id']}/offering/close").json()
+    
+    allocated = {
+        user_id: client.get(f"{API}/properties/{prop['id']}/offering/allocations/{user_id}").json()["allocated"]
+        for user_id in (first, second, other)
+    }
+    assert allocated[first] + allocated[second] == 200  # 20% of 1000, once for the wallet
+    assert allocated[other] == 200
+    assert report["capped_wallets"] == 1
+
+
+def test_failed_mint_is_kept_pending_and_retried(client, monkeypatch):
+    from app.api import properties
+    from app.web3.contract import MintBatchError
+    
+    sent = []
+    
+    async def flaky_mint_batch(token_id, allocations):
+        # The node drops the connection after the first transaction of the first batch
+        if not sent:
+            sent.append(allocations[0])
+            raise MintBatchError("connection reset", ["0x01"])
+        sent.extend(allocations)
+        return [f"0x{i + 2:02x}" for i in range(len(allocations))]
+    
+    monkeypatch.setattr(properties, "mint_batch", flaky_mint_batch)
+    prop = create_property(client, token_id=42)
+    subscribers = [verified_user(client, f"mint{i}@example.com", f"0x{i:040x}") for i in range(1, 4)]
+    client.post(f"{API}/properties/{prop['id']}/offering", json={"fractions": 300})
+    for user_id in subscribers:
+        client.post(f"{API}/properties/{prop['id']}/offering/subscriptions", json={"user_id": user_id, "fractions": 100})
+    
+    response = client.post(f"{API}/properties/{prop['id']}/offering/close")
+    assert response.status_code == 502
+    offering = client.get(f"{API}/properties/{prop['id']}/offering").json()
+    assert (offering["status"], offering["mint_transactions"], offering["mint_pending"]) == ("closed", 1, 2)
+    assert client.post(f"{API}/properties/{prop['id']}/offering", json={}).status_code == 409
+    
+    offering = client.post(f"{API}/properties/{prop['id']}/offering/mint").json()
+    assert (offering["mint_transactions"], offering["mint_pending"]) == (3, 0)
+    assert [amount for _, amount in sent] == [100, 100, 100]
+    assert sorted(wallet for wallet, _ in sent) == sorted(f"0x{i:040x}" for i in range(1, 4))
+
+
+def test_offering_closes_and_reopens_without_a_contract(client):
+    prop = create_property(client, token_id=43)
+    user_id = verified_user(client, "mock@example.com", "0x" + "c3" * 20)
+    client.post(f"{API}/properties/{prop['id']}/offering", json={"fractions": 100})
+    client.post(f"{API}/properties/{prop['id']}/offering/subscriptions", json={"user_id": user_id, "fractions": 50})
+    
+    offering = client.post(f"{API}/properties/{prop['id']}/offering/close").json()
+    
+    assert (offering["mint_transactions"], offering["mint_pending"]) == (1, 0)
+    assert client.post(f"{API}/properties/{prop['id']}/offering", json={"fractions": 50}).status_code == 201
+
+
+def test_existing_wallet_balance_counts_against_the_cap(client):
+    prop = create_property(client, token_id=44)
+    holder = verified_user(client, "holder@example.com", "0x" + "d5" * 20)
+    listing = client.post(f"{API}/marketplace/listings", json={
+        "property_id": prop["id"], "fractions": 150, "price_per_fraction": 1000
+    }).json()
+    assert client.post(f"{API}/marketplace/buy", json={
+        "listing_id": listing["id"], "fractions": 150, "buyer_id": holder
+    }).status_code == 200
+    
+    client.post(f"{API}/properties/{prop['id']}/offering", json={"fractions": 500})
+    client.post(f"{API}/properties/{prop['id']}/offering/subscriptions", json={"user_id": holder, "fractions": 500})
+    client.post(f"{API}/properties/{prop['id']}/offering/close")
+    
+    allocation = client.get(f"{API}/properties/{prop['id']}/offering/allocations/{holder}").json()
+    assert allocation["allocated"] == 50
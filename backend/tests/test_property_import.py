@@ -0,0 +1,99 @@
+"""
+Domira Backend - Bulk Property Import Tests
+CSV/JSONL parsing and per-row results of POST /properties/bulk
+"""
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+import pytest
+
+from app.main import app
+from app.services import property_import, rate_limit
+from app.services.property_import import iter_text_lines
+
+API = "/api/v1"
+HEADER = "name,description,address,asking_price,total_fractions,price_per_fraction,expected_yield"
+
+
+def row(name: str, **overrides) -> dict:
+    return {
+        "name": name, "description": "Imported", "address": f"{name} 1",
+        "asking_price": 1_000_000, "total_fractions": 1000, "price_per_fraction": 1000, "expected_yield": 5.0,
+        **overrides
+    }
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(rate_limit.settings, "rate_limit_enabled", False)  # many writes from one test client
+    with TestClient(app) as client:
+        yield client
+
+
+def errors_by_row(result: dict) -> dict:
+    return {error["row"]: error["error"] for error in result["errors"]}
+
+
+def test_lines_are_split_across_chunks():
+    async def chunks():
+        for chunk in [b"first,li", b"ne\r\nsecond", b"\n", b"third"]:
+            yield chunk
+    
+    async def run():
+        return [line async for line in iter_text_lines(chunks())]
+    
+    assert asyncio.run(run()) == ["first,line", "second", "third"]
+
+
+def test_csv_import_reports_each_failed_row(client):
+    body = "\n".join([
+        HEADER,
+        "Csv Ok,Fine,Csv Ok 1,1000000,1000,1000,5.0",
+        "Too Few,Columns,1000000",
+        "Bad Price,Fine,Bad Price 1,lots,1000,1000,5.0",
+        '"Multi Line","First line\nsecond line",Multi Line 1,1000000,1000,1000,5.0',
+        '"Unterminated,Oops,1,1,1,1,1'
+    ])
+    
+    response = client.post(f"{API}/properties/bulk?format=csv", content=body.encode())
+    result = response.json()
+    
+    assert (result["imported"], result["failed"]) == (2, 3)
+    errors = errors_by_row(result)
+    assert errors[2] == "Expected 7 columns, got 3"
+    assert errors[3].startswith("asking_price")
+    assert errors[5] == "Unterminated quoted field"
+    descriptions = {client.get(f"{API}/properties/{pid}").json()["description"] for pid in result["property_ids"]}
+    assert descriptions == {"Fine", "First line\nsecond line"}
+
+
+def test_jsonl_import_reports_each_failed_row(client):
+    missing_name = row("Missing")
+    del missing_name["name"]
+    lines = [json.dumps(row("Jsonl Ok")), "", "{not json", json.dumps([1, 2]), json.dumps(missing_name)]
+    
+    result = client.post(f"{API}/properties/bulk?format=jsonl", content="\n".join(lines).encode()).json()
+    
+    assert (result["imported"], result["failed"]) == (1, 3)
+    errors = errors_by_row(result)
+    assert errors[2].startswith("Invalid JSON")  # blank lines are not rows
+    assert errors[3] == "Row is not a JSON object"
+    assert errors[4].startswith("name")
+
+
+def test_failed_passport_lookup_fails_only_that_row(client, monkeypatch):
+    lookup = property_import.fetch_property_passport
+    
+    async def flaky_lookup(address, city=None):
+        if address.startswith("Unreachable"):
+            raise RuntimeError("registry down")
+        return await lookup(address=address, city=city)
+    
+    monkeypatch.setattr(property_import, "fetch_property_passport", flaky_lookup)
+    lines = [json.dumps(row("Reachable")), json.dumps(row("Unreachable"))]
+    
+    result = client.post(f"{API}/properties/bulk?format=jsonl", content="\n".join(lines).encode()).json()
+    
+    assert result["imported"] == 1
+    assert result["errors"] == [{"row": 2, "error": "Passport lookup failed: registry down"}]
@@ -0,0 +1,44 @@
+"""
+Domira Backend - Admission Control Tests
+Per-client buckets behind a proxy: clients are told apart by the hop the
+trusted proxy appended, not by the proxy's address or spoofable entries
+"""
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+import pytest
+
+from app.services import rate_limit
+from app.services.rate_limit import RateLimit
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """App with one write route allowing a burst of 2 per client, behind one proxy hop"""
+    monkeypatch.setattr(rate_limit.settings, "trusted_proxy_hops", 1)
+    limit = RateLimit("test", client_rate=0.001, client_burst=2, route_rate=1000, route_burst=1000)
+    app = FastAPI()
+    
+    @app.post("/write", dependencies=[Depends(limit)])
+    def write():
+        return {}
+    
+    return TestClient(app)
+
+
+def post(client: TestClient, forwarded_for: str) -> int:
+    return client.post("/write", headers={"X-Forwarded-For": forwarded_for}).status_code
+
+
+def test_clients_behind_the_proxy_get_their_own_buckets(client):
+    assert [post(client, "203.0.113.1") for _ in range(3)] == [200, 200, 429]
+    assert post(client, "203.0.113.2") == 200
+
+
+def test_client_supplied_entries_are_ignored(client):
+    # The client prepends a fresh address each time; the proxy's hop stays the same
+    statuses = [post(client, f"10.0.0.{i}, 203.0.113.3") for i in range(3)]
+    assert statuses == [200, 200, 429]
+
+
+def test_requests_without_the_proxy_hop_use_the_peer_address(client):
+    assert [client.post("/write").status_code for _ in range(3)] == [200, 200, 429]
@@ -0,0 +1,157 @@
+"""
+Domira Backend - Registry Provider Tests
+Passport fan-out against the stub Kadaster/BAG/PDOK server with injected
+latency, failures and malformed answers
+"""
+from http.server import ThreadingHTTPServer
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services.property_passport import generate_property_passport, normalize_passport_key
+from app.services.registry_providers import (
+    BAGProvider, KadasterProvider, PDOKProvider, close_http_client, fetch_property_passport, registry_passport_cache
+)
+from scripts.stub_registry_server import make_handler
+
+ADDRESS = "Stationsplein 1"
+CITY = "Almere"
+
+
+@pytest.fixture
+def stub_registries():
+    """Start a stub server configured per test; yields a start(latency, failing, invalid) -> base URL function"""
+    servers = []
+    
+    def start(latency=None, failing=(), invalid=()):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(latency or {}, set(failing), set(invalid)))
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+    
+    registry_passport_cache.clear()
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+    registry_passport_cache.clear()
+
+
+def providers(base_url: str, timeout: float = 1.0):
+    return [
+        KadasterProvider(f"{base_url}/kadaster", timeout),
+        BAGProvider(f"{base_url}/bag", timeout),
+        PDOKProvider(f"{base_url}/pdok", timeout),
+    ]
+
+
+def fetch(provider_list):
+    """Run one passport lookup on a fresh event loop (the shared client is closed afterwards)"""
+    async def run():
+        try:
+            start = time.perf_counter()
+            passport = await fetch_property_passport(ADDRESS, city=CITY, providers=provider_list)
+            return passport, time.perf_counter() - start
+        finally:
+            await close_http_client()
+    return asyncio.run(run())
+
+
+def is_cached() -> bool:
+    return registry_passport_cache.get(normalize_passport_key(ADDRESS, None, CITY)) is not None
+
+
+def test_all_sources_answer(stub_registries):
+    base_url = stub_registries()
+    
+    passport, _ = fetch(providers(base_url))
+    
+    assert passport == generate_property_passport(ADDRESS, None, CITY)
+    assert is_cached()
+
+
+def test_sources_are_fetched_concurrently(stub_registries):
+    base_url = stub_registries(latency={"kadaster": 0.3, "bag": 0.3, "pdok": 0.3})
+    
+    _, elapsed = fetch(providers(base_url))
+    
+    assert elapsed < 0.75  # one source's latency, not the sum of three
+    assert is_cached()
+
+
+def test_slow_source_is_bounded_by_its_timeout(stub_registries):
+    base_url = stub_registries(latency={"kadaster": 2.0})
+    
+    passport, elapsed = fetch(providers(base_url, timeout=0.3))
+    
+    assert elapsed < 1.0
+    assert passport.cadastral_number == generate_property_passport(ADDRESS, None, CITY).cadastral_number
+    assert not is_cached()
+
+
+def test_failing_source_falls_back(stub_registries):
+    base_url = stub_registries(failing={"pdok"})
+    
+    passport, _ = fetch(providers(base_url))
+    
+    assert passport.woz_value == generate_property_passport(ADDRESS, None, CITY).woz_value
+    assert not is_cached()
+
+
+@pytest.mark.parametrize("registry", ["kadaster", "bag", "pdok"])
+def test_invalid_fields_fall_back(stub_registries, registry):
+    base_url = stub_registries(invalid={registry})
+    
+    passport, _ = fetch(providers(base_url))
+    
+    assert passport == generate_property_passport(ADDRESS, None, CITY)
+    assert not is_cached()
+
+
+def test_invalid_types_are_coerced_or_rejected(stub_registries):
+    async def run(data: dict):
+        provider = BAGProvider("http://unused", 1.0)
+        
+        async def fetch_stub(client, address, postal_code, city):
+            return provider.parse(data)
+        
+        provider.fetch = fetch_stub
+        registry_passport_cache.clear()
+        try:
+            return await fetch_property_passport(ADDRESS, city=CITY, providers=[provider])
+        finally:
+            await close_http_client()
+    
+    fallback = generate_property_passport(ADDRESS, None, CITY)
+    assert asyncio.run(run({"building_year": "1998"})).building_year == 1998
+    assert asyncio.run(run({"building_year": "unknown"})).building_year == fallback.building_year
+    assert asyncio.run(run({"floor_area": None})).floor_area == fallback.floor_area
+
+
+def test_create_property_survives_invalid_registry(stub_registries, monkeypatch):
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.services import registry_providers
+    
+    base_url = stub_registries(invalid={"bag"})
+    monkeypatch.setattr(registry_providers.settings, "kadaster_api_url", f"{base_url}/kadaster")
+    monkeypatch.setattr(registry_providers.settings, "bag_api_url", f"{base_url}/bag")
+    monkeypatch.setattr(registry_providers.settings, "pdok_api_url", f"{base_url}/pdok")
+    
+    with TestClient(app) as client:
+        response = client.post("/api/v1/properties/", json={
+            "name": "Stationsplein Apartments",
+            "description": "Apartments next to Almere Centrum station",
+            "address": ADDRESS,
+            "city": CITY,
+            "asking_price": 2_500_000,
+            "total_fractions": 1000,
+            "price_per_fraction": 2500,
+            "expected_yield": 5.2
+        })
+    
+    assert response.status_code == 201
+    assert response.json()["passport"]["building_year"] == generate_property_passport(ADDRESS, None, CITY).building_year
@@ -0,0 +1,83 @@
+"""
+Domira Backend - Trade Tape Tests
+Rolling OHLC/VWAP windows over fills, and the /stats endpoint
+"""
+from fastapi.testclient import TestClient
+import pytest
+
+from app.main import app
+from app.services import rate_limit
+from app.services.trade_tape import TradeTape
+
+API = "/api/v1"
+HOUR = 3600
+NOW = 1_800_000_000.0  # a fixed "now", aligned to the hour
+
+
+def test_windows_hold_only_recent_fills():
+    tape = TradeTape()
+    tape.record("p", 100.0, 10, timestamp=NOW - 3 * 24 * HOUR)  # in 7d only
+    tape.record("p", 120.0, 5, timestamp=NOW - 2 * HOUR)         # in 24h and 7d
+    tape.record("p", 90.0, 10, timestamp=NOW - 30 * 60)          # everywhere
+    tape.record("p", 110.0, 5, timestamp=NOW - 60)
+    
+    stats = tape.stats("p", now=NOW)
+    windows = stats["windows"]
+    
+    assert windows["1h"] == {"open": 90.0, "high": 110.0, "low": 90.0, "close": 110.0, "volume": 15, "vwap": 96.6667, "trades": 2}
+    assert (windows["24h"]["open"], windows["24h"]["high"], windows["24h"]["trades"]) == (120.0, 120.0, 3)
+    assert (windows["7d"]["open"], windows["7d"]["volume"], windows["7d"]["trades"]) == (100.0, 30, 4)
+    assert stats["vwap"] == round((1000 + 600 + 900 + 550) / 30, 4)
+    assert (stats["trade_count"], stats["last_price"]) == (4, 110.0)
+
+
+def test_old_fills_roll_out_even_when_their_ring_slot_is_reused():
+    tape = TradeTape()
+    tape.record("p", 100.0, 1, timestamp=NOW - 7 * 24 * HOUR)  # the slot NOW maps to in every ring, one lap earlier
+    
+    assert tape.stats("p", now=NOW)["windows"] == {"1h": None, "24h": None, "7d": None}
+    
+    tape.record("p", 200.0, 1, timestamp=NOW)
+    assert tape.stats("p", now=NOW)["windows"]["7d"]["trades"] == 1
+
+
+def test_property_without_fills_has_empty_stats():
+    stats = TradeTape().stats("p", now=NOW)
+    
+    assert (stats["trade_count"], stats["vwap"], stats["windows"]["24h"]) == (0, None, None)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(rate_limit.settings, "rate_limit_enabled", False)  # many writes from one test client
+    with TestClient(app) as client:
+        yield client
+
+
+def test_stats_endpoint_reflects_fills(client):
+    prop = client.post(f"{API}/properties/", json={
+        "name": "Tape", "description": "x", "address": "Tape 1",
+        "asking_price": 1_000_000, "total_fractions": 1000, "price_per_fraction": 1000, "expected_yield": 5.0
+    }).json()
+    buyer = client.post(f"{API}/users/", json={
+        "email": "tape@example.com", "full_name": "Tape Buyer", "wallet_address": "0x" + "7a" * 20
+    }).json()
+    assert client.get(f"{API}/marketplace/{prop['id']}/stats").json()["trade_count"] == 0
+    
+    for price, fractions in [(1000, 30), (1200, 10)]:
+        listing = client.post(f"{API}/marketplace/listings", json={
+            "property_id": prop["id"], "fractions": fractions, "price_per_fraction": price
+        }).json()
+        response = client.post(f"{API}/marketplace/buy", json={
+            "listing_id": listing["id"], "fractions": fractions, "buyer_id": buyer["id"]
+        })
+        assert response.status_code == 200, response.json()
+    stats = client.get(f"{API}/marketplace/{prop['id']}/stats").json()
+    
+    assert (stats["trade_count"], stats["volume"], stats["last_price"]) == (2, 40, 1200)
+    assert stats["vwap"] == 1050
+    assert stats["windows"]["1h"]["high"] == 1200 and stats["windows"]["1h"]["low"] == 1000
+
+
+def test_stats_for_an_unknown_property_is_404(client):
+    assert client.get(f"{API}/marketplace/no-such-property/stats").status_code == 404
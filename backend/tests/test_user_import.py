@@ -0,0 +1,100 @@
+"""
+Domira Backend - Bulk User Onboarding Tests
+Streamed JSON array parsing and per-row results of POST /users/bulk
+"""
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+import pytest
+
+from app.main import app
+from app.services import rate_limit
+from app.services.user_import import import_users, iter_json_array
+
+API = "/api/v1"
+
+
+def parse(body: bytes, chunk_size: int) -> list:
+    async def chunks():
+        for i in range(0, len(body), chunk_size):
+            yield body[i:i + chunk_size]
+    
+    async def run():
+        return [row async for row in iter_json_array(chunks())]
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 16])
+def test_rows_are_the_same_however_the_body_is_chunked(chunk_size):
+    body = json.dumps([{"email": "a@example.com", "n": 12345}, {"email": "b@example.com"}, 3]).encode()
+    
+    assert parse(body, chunk_size) == [
+        (1, {"email": "a@example.com", "n": 12345}),
+        (2, {"email": "b@example.com"}),
+        (3, "Row is not a JSON object")
+    ]
+
+
+def test_malformed_row_ends_the_stream_with_an_error():
+    rows = parse(b'[{"email": "a@example.com"}, {"email": oops}, {"email": "c@example.com"}]', 1 << 16)
+    
+    assert rows[0] == (1, {"email": "a@example.com"})
+    assert rows[1][0] == 2 and rows[1][1].startswith("Invalid JSON")
+    assert len(rows) == 2
+
+
+def test_unclosed_array_reports_the_missing_end():
+    assert parse(b'[{"email": "a@example.com"}', 4)[-1] == (2, "Unexpected end of body: the JSON array is not closed")
+
+
+def test_valid_rows_are_inserted_in_chunks():
+    inserted = []
+    
+    async def run():
+        async def elements():
+            for i in range(5):
+                yield i + 1, {"email": f"chunk{i}@example.com", "full_name": "Chunk"}
+        return await import_users(elements(), [], insert=lambda rows, ids, now: inserted.append(len(rows)), chunk_size=2)
+    result = asyncio.run(run())
+    
+    assert inserted == [2, 2, 1]
+    assert result["imported"] == 5 and [u["row"] for u in result["users"]] == [1, 2, 3, 4, 5]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(rate_limit.settings, "rate_limit_enabled", False)  # many writes from one test client
+    with TestClient(app) as client:
+        yield client
+
+
+def test_bulk_endpoint_reports_each_failed_row(client):
+    existing_wallet = "0x" + "ab" * 20
+    client.post(f"{API}/users/", json={"email": "taken@example.com", "full_name": "Taken", "wallet_address": existing_wallet})
+    
+    rows = [
+        {"email": "bulk-ok@example.com", "full_name": "Ok"},
+        {"email": "no-name@example.com"},
+        {"email": "TAKEN@example.com", "full_name": "Taken Again"},
+        {"email": "bulk-wallet@example.com", "full_name": "Wallet", "wallet_address": "0x" + "AB" * 20},
+        {"email": "bulk-ok@example.com", "full_name": "Repeated In Batch"},
+        "not an object",
+        {"email": "bulk-ok-2@example.com", "full_name": "Ok Too"}
+    ]
+    result = client.post(f"{API}/users/bulk", content=json.dumps(rows)).json()
+    
+    assert (result["imported"], result["failed"]) == (2, 5)
+    assert [user["row"] for user in result["users"]] == [1, 7]
+    errors = {error["row"]: error["error"] for error in result["errors"]}
+    assert set(errors) == {2, 3, 4, 5, 6}
+    assert "full_name" in errors[2]
+    assert errors[3].startswith("Duplicate email") and errors[5].startswith("Duplicate email")
+    assert errors[4].startswith("Duplicate wallet")
+    assert errors[6] == "Row is not a JSON object"
+    for user in result["users"]:
+        assert client.get(f"{API}/users/{user['id']}").status_code == 200
+
+
+def test_bulk_endpoint_rejects_a_body_that_is_not_an_array(client):
+    assert client.post(f"{API}/users/bulk", content=b'{"email": "a@example.com"}').status_code == 400
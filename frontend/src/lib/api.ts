@@ -149,7 +149,7 @@ export const marketplaceApi = {
             body: JSON.stringify(data),
         }),
 
-    buy: (data: { listing_id: string; fractions: number }) =>
+    buy: (data: { listing_id: string; fractions: number; buyer_id: string }) =>
         fetchApi<{ message: string; fractions_bought: number; total_cost: number }>(
             '/marketplace/buy',
             {